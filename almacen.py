@@ -0,0 +1,178 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from carga import HOJAS, compactar_corte, leer_corte, texto_clave
+
+# ========== INSTANTÁNEAS EN DISCO ==========
+
+# Cada corte procesado se guarda como un directorio <huella>/ con un Parquet por hoja
+DIR_INSTANTANEAS = os.environ.get(
+    "SED_DIR_INSTANTANEAS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "instantaneas")
+)
+
+ARCHIVO_META = "meta.json"
+
+# Versión del formato de las hojas: se sube cada vez que cambian las columnas o los tipos que produce
+# `leer_corte`; una instantánea de otra versión se trata como inexistente y el libro se vuelve a procesar
+VERSION_INSTANTANEA = 2
+
+
+def huella_contenido(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _ruta(huella):
+    return os.path.join(DIR_INSTANTANEAS, huella)
+
+
+def _leer_meta(huella):
+    try:
+        with open(os.path.join(_ruta(huella), ARCHIVO_META), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def existe_instantanea(huella):
+    meta = _leer_meta(huella)
+    return meta is not None and meta.get("version") == VERSION_INSTANTANEA
+
+
+def preparar_para_parquet(df):
+    # Parquet no admite columnas object con tipos mezclados (ej. claves numéricas y texto)
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if df[col].dtype == object:
+            tipo = pd.api.types.infer_dtype(df[col], skipna=True)
+            if tipo.startswith("mixed"):
+                df[col] = df[col].map(texto_clave, na_action="ignore")
+    return df
+
+
+def normalizar_tipos(corte):
+    # Los mismos tipos que devuelve una instantánea al leerla (p. ej. texto como `str`, claves mezcladas
+    # como texto): un corte recién procesado y uno leído de disco son idénticos
+    import pyarrow as pa
+
+    return compactar_corte({
+        clave: pa.Table.from_pandas(preparar_para_parquet(df), preserve_index=False).to_pandas()
+        for clave, df in corte.items()
+    })
+
+
+def guardar_instantanea(huella, corte, nombre="", rango=None):
+    os.makedirs(DIR_INSTANTANEAS, exist_ok=True)
+    destino = _ruta(huella)
+    if existe_instantanea(huella):
+        return destino
+
+    # Escritura en un directorio temporal y renombrado atómico, por si dos sesiones coinciden
+    temporal = tempfile.mkdtemp(prefix=f".{huella[:12]}-", dir=DIR_INSTANTANEAS)
+    try:
+        for clave, df in corte.items():
+            preparar_para_parquet(df).to_parquet(os.path.join(temporal, f"{clave}.parquet"), index=False)
+
+        meta = {
+            "version": VERSION_INSTANTANEA,
+            "huella": huella,
+            "nombre": nombre,
+            "creado": time.time(),
+            "hojas": {clave: len(df) for clave, df in corte.items()},
+            "rango": rango or {},
+        }
+        with open(os.path.join(temporal, ARCHIVO_META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # Una instantánea de otra versión se reemplaza
+        if os.path.isdir(destino):
+            eliminar_instantanea(huella)
+        os.replace(temporal, destino)
+    except OSError:
+        # Otra sesión publicó la misma huella primero
+        shutil.rmtree(temporal, ignore_errors=True)
+        if not existe_instantanea(huella):
+            raise
+    return destino
+
+
+def cargar_instantanea(huella):
+    if not existe_instantanea(huella):
+        return None
+    ruta = _ruta(huella)
+    try:
+        # Las instantáneas previas a los tipos compactos se compactan al leerlas
+        return compactar_corte({
+            clave: pd.read_parquet(os.path.join(ruta, f"{clave}.parquet"))
+            for clave in HOJAS
+        })
+    except (OSError, ValueError):
+        # Instantánea incompleta o corrupta: se descarta y se vuelve a procesar el Excel
+        eliminar_instantanea(huella)
+        return None
+
+
+def obtener_corte(contenido, nombre="", huella=None):
+    # Punto único de entrada: instantánea si existe, si no se procesa el libro y se guarda
+    huella = huella or huella_contenido(contenido)
+    corte = cargar_instantanea(huella)
+    if corte is None:
+        rango = {}
+        corte = normalizar_tipos(leer_corte(io.BytesIO(contenido), rango=rango))
+        guardar_instantanea(huella, corte, nombre=nombre, rango=rango)
+    return corte
+
+
+def rango_instantanea(huella):
+    # Filas con datos y filas / columnas fantasma omitidas por hoja al procesar el libro
+    if not existe_instantanea(huella):
+        return {}
+    return _leer_meta(huella).get("rango", {})
+
+
+# ========== ADMINISTRACIÓN ==========
+
+def listar_instantaneas():
+    filas = []
+    if os.path.isdir(DIR_INSTANTANEAS):
+        for huella in os.listdir(DIR_INSTANTANEAS):
+            # También las de versiones anteriores, para poder depurarlas
+            ruta = _ruta(huella)
+            meta = None if huella.startswith(".") else _leer_meta(huella)
+            if meta is None:
+                continue
+            tamano = sum(e.stat().st_size for e in os.scandir(ruta) if e.is_file())
+            filas.append({
+                "Huella": huella,
+                "Archivo": meta.get("nombre", ""),
+                "Creado": pd.Timestamp(meta.get("creado", 0), unit="s"),
+                "Tamaño (MB)": round(tamano / 1024 ** 2, 2),
+            })
+
+    columnas = ["Huella", "Archivo", "Creado", "Tamaño (MB)"]
+    return pd.DataFrame(filas, columns=columnas).sort_values("Creado", ascending=False, ignore_index=True)
+
+
+def eliminar_instantanea(huella):
+    shutil.rmtree(_ruta(huella), ignore_errors=True)
+
+
+def podar_instantaneas(dias=None, conservar=None):
+    # Elimina las instantáneas más antiguas que `dias` y/o deja solo las `conservar` más recientes
+    lista = listar_instantaneas()
+    eliminar = pd.Series(False, index=lista.index)
+    if dias is not None:
+        eliminar |= lista["Creado"] < pd.Timestamp(time.time() - dias * 86400, unit="s")
+    if conservar is not None:
+        eliminar |= lista.index >= conservar
+
+    for huella in lista.loc[eliminar, "Huella"]:
+        eliminar_instantanea(huella)
+    return int(eliminar.sum())
@@ -0,0 +1,84 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# ========== ARRANQUE EN FRÍO ==========
+# La pantalla de bienvenida no importa plotly ni openpyxl: se cargan al necesitarlos o en segundo
+# plano en cuanto se eligen los primeros cortes. Se mide el tiempo desde el inicio del proceso hasta
+# que termina la primera ejecución del script (la primera pantalla que recibe el navegador).
+
+MODULOS_DIFERIDOS = ["plotly.express", "openpyxl"]
+
+_candado = threading.Lock()
+_primera_pantalla = None
+_calentamiento = {"iniciado": False, "segundos": None}
+
+
+def _inicio_proceso():
+    # Linux: momento de inicio del proceso según /proc; en otros sistemas, al importar este módulo
+    try:
+        with open("/proc/self/stat") as f:
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            encendido = float(f.read().split()[0])
+        return time.time() - (encendido - ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+
+INICIO_PROCESO = _inicio_proceso()
+
+
+def registrar_primera_pantalla():
+    # Segundos desde el inicio del proceso; solo la primera ejecución del proceso los registra
+    # (una línea en stderr, para los registros del contenedor)
+    global _primera_pantalla
+    with _candado:
+        if _primera_pantalla is not None:
+            return None
+        _primera_pantalla = round(time.time() - INICIO_PROCESO, 3)
+    diferidos = [m for m in MODULOS_DIFERIDOS if m in sys.modules]
+    print(
+        f"[arranque] primera pantalla a {_primera_pantalla:.2f} s del inicio del proceso"
+        f" (módulos diferidos ya cargados: {', '.join(diferidos) or 'ninguno'})",
+        file=sys.stderr
+    )
+    return _primera_pantalla
+
+
+def primera_pantalla():
+    return _primera_pantalla
+
+
+def calentar_en_segundo_plano():
+    # Una sola vez por proceso; la primera gráfica ya no paga la importación ni la preparación de plotly
+    with _candado:
+        if _calentamiento["iniciado"]:
+            return
+        _calentamiento["iniciado"] = True
+    threading.Thread(target=_calentar, name="calentar_modulos", daemon=True).start()
+
+
+def _calentar():
+    inicio = time.perf_counter()
+    for modulo in MODULOS_DIFERIDOS:
+        importlib.import_module(modulo)
+
+    # La primera figura de cada tipo prepara la plantilla y los validadores de sus trazas
+    import pandas as pd
+    import plotly.express as px
+    datos = pd.DataFrame({"x": ["a", "b"], "y": [1.0, 2.0], "inicio": pd.to_datetime(["2024-01-01", "2024-02-01"])})
+    px.bar(datos, x="x", y="y", color="x", text_auto=True).to_plotly_json()
+    px.line(datos, x="x", y="y", markers=True).to_plotly_json()
+    px.timeline(datos, x_start="inicio", x_end="inicio", y="x").to_plotly_json()
+    _calentamiento["segundos"] = round(time.perf_counter() - inicio, 3)
+
+
+def estadisticas_arranque():
+    return {
+        "Primera pantalla (s)": _primera_pantalla,
+        "Calentamiento (s)": _calentamiento["segundos"],
+        "Módulos diferidos cargados": ", ".join(m for m in MODULOS_DIFERIDOS if m in sys.modules) or "ninguno",
+    }
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ========== BENCHMARK DE ARRANQUE EN FRÍO ==========
+# Uso: python benchmarks/arranque.py --repeticiones 5 [--salida arranque.json]
+# Cada repetición es un proceso nuevo que ejecuta la pantalla de bienvenida de main.py con el
+# ejecutor de pruebas de Streamlit (sin servidor web) y reporta el tiempo desde el inicio del proceso
+# hasta el final de la primera ejecución, y qué módulos diferidos quedaron cargados.
+
+HIJO = """
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({main!r}, default_timeout=120)
+app.run()
+import arranque
+print(json.dumps({{
+    "primera_pantalla_s": arranque.primera_pantalla(),
+    "excepciones": [e.message for e in app.exception],
+    "modulos_diferidos": [m for m in arranque.MODULOS_DIFERIDOS if m in sys.modules],
+}}))
+"""
+
+
+def arranque(directorio):
+    # Directorios vacíos: sin catálogo, historial ni instantáneas, como un contenedor recién creado
+    entorno = dict(os.environ)
+    for variable in ("SED_DIR_CATALOGO", "SED_DIR_HISTORIAL", "SED_DIR_INSTANTANEAS"):
+        entorno[variable] = os.path.join(directorio, variable.lower())
+    entorno.pop("SED_DEPURACION", None)
+
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-c", HIJO.format(raiz=RAIZ, main=os.path.join(RAIZ, "main.py"))],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True
+    )
+    total = time.perf_counter() - inicio
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado["proceso_s"] = round(total, 3)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío de la app hasta la primera pantalla.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    args = parser.parse_args(argv)
+
+    corridas = []
+    for _ in range(args.repeticiones):
+        with tempfile.TemporaryDirectory() as directorio:
+            corridas.append(arranque(directorio))
+
+    primera = [c["primera_pantalla_s"] for c in corridas]
+    resultado = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "primera_pantalla": {
+            "mediana_s": round(statistics.median(primera), 3),
+            "min_s": min(primera),
+            "max_s": max(primera),
+            "repeticiones": args.repeticiones,
+        },
+        "corridas": corridas,
+    }
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
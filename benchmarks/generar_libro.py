@@ -0,0 +1,146 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carga import FILA_ENCABEZADO, HOJAS, MESES  # noqa: E402
+
+# ========== LIBRO SED SINTÉTICO ==========
+# Misma estructura que espera main.py: encabezado en la fila 8 y las cinco hojas con sus columnas
+
+FUENTES = ["Estatal", "Federal", "Municipal", "Ingresos Propios", "Otros"]
+
+PALABRAS = (
+    "construcción rehabilitación escuela techo aula comunidad municipio obra equipamiento "
+    "salud agua drenaje camino programa apoyo familias beneficiarios infraestructura "
+    "desarrollo social seguridad capacitación servicio mantenimiento"
+).split()
+
+
+def _texto(r, palabras):
+    return " ".join(r.choice(PALABRAS) for _ in range(palabras)).capitalize() + "."
+
+
+def generar_libro(ruta, proyectos=100, metas=5, actividades=6, partidas=4, municipios=3,
+                  semilla=0, variacion=0.0, filas_vacias=0, fecha="31/03/2025", columnas_vacias=0):
+    # `variacion` es la fracción de proyectos con montos/textos alterados (para simular otro corte);
+    # `filas_vacias` / `columnas_vacias` agregan filas al final y columnas a la derecha con formato
+    # pero sin datos, como los libros exportados del SED
+    r = random.Random(semilla)
+    filas = {clave: [] for clave in HOJAS}
+
+    for q in range(proyectos):
+        clave_q = f"Q{q:05d}"
+        eje = f"Eje {q % 5 + 1}"
+        dep = f"DEP{q % 23:02d}"
+        cambia = r.random() < variacion
+
+        filas["datos"].append({
+            "Fecha": fecha, "Clave Q": clave_q, "Eje": eje, "Dep Siglas": dep,
+            "Nombre del Proyecto (Ejercicio Actual)": _texto(r, 6),
+            "Diagnóstico": _texto(r, 300) + (" " + _texto(r, 20) if cambia else ""),
+            "Objetivo General": _texto(r, 40),
+            "Descripción del Proyecto": _texto(r, 200),
+            "Descripción del Avance Actual": _texto(r, 60) if q % 3 else None,
+            "Alcance Anual": _texto(r, 30),
+        })
+
+        for m in range(metas):
+            clave_meta = f"{clave_q}-{m + 1:03d}"
+            descripcion = _texto(r, 15)
+            factor = 1.1 if cambia else 1.0
+
+            for mpio in range(municipios):
+                fila = {
+                    "Clave Q": clave_q, "ID Meta": m + 1, "Clave de Meta": clave_meta,
+                    "Descripción de la Meta": descripcion, "Unidad de Medida": r.choice(["Obra", "Acción", "Persona"]),
+                    "ID Mpio": mpio + 1, "Municipio": f"Municipio {mpio + 1:02d}", "Registro Presupuestal": "RP",
+                }
+                for fuente in FUENTES:
+                    fila[f"Cantidad {fuente}"] = r.randint(0, 20)
+                    fila[f"Monto {fuente}"] = round(r.random() * 500000 * factor, 2)
+                filas["metas"].append(fila)
+
+            for a in range(actividades):
+                inicio = datetime.date(2025, 1, 1) + datetime.timedelta(days=r.randint(0, 300))
+                fin = inicio + datetime.timedelta(days=r.randint(0, 60) + (15 if cambia else 0))
+                filas["cronograma"].append({
+                    "Clave Q": clave_q, "Dep Siglas": dep, "ID Meta": m + 1, "Clave de Meta": clave_meta,
+                    "Clave de Actividad /Hito": a + 1, "Tipo": r.choice(["Actividad", "Hito"]),
+                    "Fase Actividad / Hito": f"Fase {a % 3 + 1}", "Descripción": _texto(r, 8),
+                    "Fecha de Inicio": inicio.strftime("%d/%m/%Y"), "Fecha de Termino": fin.strftime("%d/%m/%Y"),
+                    "Monto Actividad / Hito": round(r.random() * 100000, 2),
+                })
+
+            for p in range(partidas):
+                montos = [round(r.random() * 50000 * factor, 2) for _ in MESES]
+                fila = {
+                    "Clave Q": clave_q, "ID Meta": m + 1, "Clave de Meta": clave_meta,
+                    "Partida": 2000 + 100 * p + r.randint(0, 9), "Monto Anual": round(sum(montos), 2),
+                }
+                fila.update({f"Monto {mes}": monto for mes, monto in zip(MESES, montos)})
+                filas["partidas"].append(fila)
+
+            programado = [r.randint(0, 5) for _ in MESES]
+            fila = {"Clave de Meta": clave_meta, "Cantidad": sum(programado)}
+            fila.update({f"Cumplimiento {mes}": valor for mes, valor in zip(MESES, programado)})
+            filas["cumplimiento"].append(fila)
+
+    libro = Workbook(write_only=True)
+    relleno = PatternFill("solid", fgColor="FFF2CC")
+    for clave, (nombre_hoja, columnas) in HOJAS.items():
+        hoja = libro.create_sheet(nombre_hoja)
+        hoja.append(["Secretaría de Finanzas - Reporte SED"])
+        for _ in range(FILA_ENCABEZADO - 2):
+            hoja.append([])
+        hoja.append(columnas + _formato(hoja, relleno, columnas_vacias))
+        for fila in filas[clave]:
+            hoja.append([fila.get(c) for c in columnas] + _formato(hoja, relleno, columnas_vacias))
+        for _ in range(filas_vacias):
+            hoja.append(_formato(hoja, relleno, len(columnas) + columnas_vacias))
+
+    libro.save(ruta)
+    return {clave: len(f) for clave, f in filas.items()}
+
+
+def _formato(hoja, relleno, n):
+    # Celdas vacías con relleno: amplían la dimensión de la hoja sin agregar datos
+    celdas = []
+    for _ in range(n):
+        celda = WriteOnlyCell(hoja)
+        celda.fill = relleno
+        celdas.append(celda)
+    return celdas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un libro SED sintético.")
+    parser.add_argument("ruta")
+    parser.add_argument("--proyectos", type=int, default=100)
+    parser.add_argument("--metas", type=int, default=5)
+    parser.add_argument("--actividades", type=int, default=6)
+    parser.add_argument("--partidas", type=int, default=4)
+    parser.add_argument("--municipios", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--variacion", type=float, default=0.0)
+    parser.add_argument("--filas-vacias", type=int, default=0)
+    parser.add_argument("--columnas-vacias", type=int, default=0)
+    parser.add_argument("--fecha", default="31/03/2025")
+    args = parser.parse_args(argv)
+
+    conteos = generar_libro(
+        args.ruta, args.proyectos, args.metas, args.actividades, args.partidas, args.municipios,
+        args.semilla, args.variacion, args.filas_vacias, args.fecha, args.columnas_vacias
+    )
+    print(conteos)
+
+
+if __name__ == "__main__":
+    main()
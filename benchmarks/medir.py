@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly  # noqa: E402
+import plotly.express as px  # noqa: E402
+from openpyxl import load_workbook  # noqa: E402
+
+from benchmarks.generar_libro import PALABRAS, generar_libro  # noqa: E402
+from busqueda import IndiceTexto, buscar  # noqa: E402
+from carga import HOJAS, agregar_totales, leer_corte, rango_legible  # noqa: E402
+from comparacion import (  # noqa: E402
+    ComparacionCortes, ResumenMetas, comparativo_partidas, cronograma_comparado,
+    cumplimiento_comparado, diferencias_cronograma, mensual_partidas
+)
+from corte import Corte  # noqa: E402
+from cubo_partidas import NIVELES, CuboPartidas  # noqa: E402
+from diferencias_texto import resaltar_diferencias  # noqa: E402
+from validacion import validar_corte  # noqa: E402
+
+# ========== BENCHMARK POR ETAPA ==========
+# Uso: python benchmarks/medir.py --proyectos 500 --salida bench_output.json
+# Resultado en JSON (una entrada por etapa) para comparar entre versiones.
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, {
+        "mediana_s": round(statistics.median(tiempos), 6),
+        "min_s": round(min(tiempos), 6),
+        "max_s": round(max(tiempos), 6),
+        "repeticiones": repeticiones,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def correr(parametros, repeticiones, muestra, directorio):
+    ruta_antes = os.path.join(directorio, "antes.xlsx")
+    ruta_ahora = os.path.join(directorio, "ahora.xlsx")
+    conteos = generar_libro(ruta_antes, semilla=1, **parametros)
+    generar_libro(ruta_ahora, semilla=1, variacion=0.2, fecha="30/06/2025", **parametros)
+
+    etapas = {}
+
+    # --- Carga de hojas (la etapa dominante en la app) ---
+    rango = {}
+    hojas_antes, etapas["carga_libro"] = medir(lambda: leer_corte(ruta_antes, rango=rango), repeticiones)
+    hojas_ahora = leer_corte(ruta_ahora)
+
+    # Abrir el libro (cadenas compartidas incluidas) sin leer hojas, y leerlo abriéndolo una vez por hoja:
+    # lo que costaría repartir la carga en segundo plano con una tarea por hoja (carga_paralela.py)
+    _, etapas["apertura_libro"] = medir(
+        lambda: load_workbook(ruta_antes, read_only=True, data_only=True).close(), repeticiones
+    )
+    _, etapas["carga_libro_por_hoja"] = medir(
+        lambda: [leer_corte(ruta_antes, hojas=[clave]) for clave in HOJAS], repeticiones
+    )
+
+    _, etapas["agregar_totales"] = medir(lambda: agregar_totales(hojas_antes["metas"]), repeticiones)
+
+    # --- Índice por Clave Q / Clave de Meta y filtrado ---
+    corte_antes, etapas["indexado_corte"] = medir(lambda: Corte(hojas_antes, huella="antes"), repeticiones)
+    corte_ahora = Corte(hojas_ahora, huella="ahora")
+
+    rng = np.random.default_rng(0)
+    claves_q = rng.choice(corte_ahora["datos"]["Clave Q"].dropna().unique(), size=muestra)
+    metas = corte_ahora["metas"]
+    pares = [
+        (q, corte_ahora.filas("metas", q)["Clave de Meta"].iloc[0]) for q in claves_q
+    ]
+
+    def filtrado_mascara():
+        for q, meta in pares:
+            por_q = metas[metas["Clave Q"] == q]
+            por_q[por_q["Clave de Meta"] == meta]
+
+    def filtrado_indice():
+        for q, meta in pares:
+            corte_ahora.filas("metas", q)
+            corte_ahora.filas("metas", q, meta)
+
+    _, etapas["filtrado_mascara"] = medir(filtrado_mascara, repeticiones)
+    _, etapas["filtrado_indice"] = medir(filtrado_indice, repeticiones)
+
+    # --- Diferencias de texto (Datos Generales) ---
+    textos = [
+        (corte_antes.filas("datos", q)["Diagnóstico"].iloc[0], corte_ahora.filas("datos", q)["Diagnóstico"].iloc[0])
+        for q in claves_q
+    ]
+    for modo in ["palabra", "caracter"]:
+        _, etapas[f"diff_texto_{modo}"] = medir(
+            lambda: [resaltar_diferencias(a, b, modo) for a, b in textos], repeticiones
+        )
+
+    # --- Agregaciones por municipio y partida ---
+    resumen, etapas["resumen_metas"] = medir(
+        lambda: ResumenMetas(corte_antes["metas"], corte_ahora["metas"]), repeticiones
+    )
+
+    def agregaciones():
+        for q, meta in pares:
+            resumen.totales(q, meta)
+            resumen.municipios(q, meta, formato=True)
+            partidas_antes = corte_antes.filas("partidas", q, meta)
+            partidas_ahora = corte_ahora.filas("partidas", q, meta)
+            comparativo_partidas(partidas_antes, partidas_ahora)
+            mensual_partidas(partidas_antes, partidas_ahora)
+
+    _, etapas["agregacion_municipio_partida"] = medir(agregaciones, repeticiones)
+
+    # --- Cubo de partidas: construcción única y consultas por nivel ---
+    cubo, etapas["cubo_partidas"] = medir(lambda: CuboPartidas(corte_antes, corte_ahora), repeticiones)
+
+    def consultas_cubo():
+        for q, meta in pares:
+            ubicacion = cubo.ubicacion(q)
+            for nivel in NIVELES:
+                valor = (q, meta) if nivel == "Meta" else ubicacion[nivel]
+                cubo.por_partida(nivel, valor)
+                cubo.mensual(nivel, valor)
+
+    _, etapas["consultas_cubo"] = medir(consultas_cubo, repeticiones)
+
+    # --- Construcción y serialización de figuras (como st.plotly_chart) ---
+    def figuras():
+        for q, meta in pares:
+            comparado, orden_y = cronograma_comparado(
+                corte_antes.filas("cronograma", q, meta), corte_ahora.filas("cronograma", q, meta)
+            )
+            fig = px.timeline(comparado, x_start="Fecha de Inicio", x_end="Fecha de Termino",
+                              y="Actividad", color="Versión")
+            fig.update_yaxes(categoryorder="array", categoryarray=orden_y)
+            fig.to_json()
+
+            mensual = mensual_partidas(corte_antes.filas("partidas", q, meta), corte_ahora.filas("partidas", q, meta))
+            px.bar(mensual, x="Mes", y=["Antes", "Ahora"], barmode="group").to_json()
+
+            _, _, serie = cumplimiento_comparado(
+                corte_antes.filas("cumplimiento", clave_meta=meta), corte_ahora.filas("cumplimiento", clave_meta=meta)
+            )
+            px.bar(serie, x="Mes", y="Valor", color="Versión", barmode="group").to_json()
+
+    _, etapas["figuras"] = medir(figuras, repeticiones)
+
+    # --- Cronograma emparejado por actividad (todo el corte en una pasada) ---
+    _, etapas["diferencias_cronograma"] = medir(
+        lambda: diferencias_cronograma(corte_antes["cronograma"], corte_ahora["cronograma"]), repeticiones
+    )
+
+    # --- Búsqueda de texto: índice por corte y consultas sobre ambos ---
+    indice_antes, etapas["indice_busqueda"] = medir(lambda: IndiceTexto(corte_antes), repeticiones)
+    indices = {"Antes": indice_antes, "Ahora": IndiceTexto(corte_ahora)}
+    consultas = [" ".join(rng.choice(PALABRAS, size=k)) for k in (1, 2, 3) for _ in range(muestra // 3 + 1)]
+    _, etapas["consultas_busqueda"] = medir(lambda: [buscar(indices, c) for c in consultas], repeticiones)
+
+    # --- Validación de consistencia de todo el corte ---
+    _, etapas["validacion"] = medir(lambda: validar_corte(corte_ahora), repeticiones)
+
+    # --- Cambios de todo el portafolio ---
+    _, etapas["comparacion_portafolio"] = medir(lambda: ComparacionCortes(corte_antes, corte_ahora), repeticiones)
+
+    memoria = {
+        version: {hoja: round(b / 1024 ** 2, 3) for hoja, b in corte.memoria().items()}
+        for version, corte in (("antes", corte_antes), ("ahora", corte_ahora))
+    }
+    return conteos, etapas, memoria, rango
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide cada etapa de la app con libros SED sintéticos.")
+    parser.add_argument("--proyectos", type=int, default=200)
+    parser.add_argument("--metas", type=int, default=5)
+    parser.add_argument("--actividades", type=int, default=6)
+    parser.add_argument("--partidas", type=int, default=4)
+    parser.add_argument("--municipios", type=int, default=3)
+    parser.add_argument("--filas-vacias", type=int, default=0, help="Filas con formato sin datos al final de cada hoja")
+    parser.add_argument("--columnas-vacias", type=int, default=0, help="Columnas con formato sin datos a la derecha")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--muestra", type=int, default=20, help="Claves Q consultadas en las etapas por proyecto")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    args = parser.parse_args(argv)
+
+    parametros = {
+        "proyectos": args.proyectos, "metas": args.metas, "actividades": args.actividades,
+        "partidas": args.partidas, "municipios": args.municipios,
+        "filas_vacias": args.filas_vacias, "columnas_vacias": args.columnas_vacias,
+    }
+
+    with tempfile.TemporaryDirectory() as directorio:
+        filas, etapas, memoria, rango = correr(parametros, args.repeticiones, args.muestra, directorio)
+
+    resultado = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "entorno": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plotly": plotly.__version__,
+        },
+        "parametros": parametros,
+        "filas": filas,
+        "etapas": etapas,
+        "memoria_mb": memoria,
+        "rango": {hoja: rango_legible(r) for hoja, r in rango.items()},
+    }
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
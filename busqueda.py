@@ -0,0 +1,156 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+# ========== BÚSQUEDA DE TEXTO ==========
+# Índice invertido por corte sobre los textos de proyectos y metas: sin acentos ni mayúsculas,
+# puntaje BM25 y coincidencia por prefijo (buscar "escuel" encuentra "escuelas")
+
+CAMPOS_PROYECTO = ["Nombre del Proyecto (Ejercicio Actual)", "Diagnóstico", "Objetivo General", "Descripción del Proyecto"]
+CAMPO_META = "Descripción de la Meta"
+
+# Una coincidencia en las claves, el nombre o la meta pesa más que una en los textos largos
+PESOS = {
+    "Clave Q": 3.0,
+    "Clave de Meta": 3.0,
+    "Nombre del Proyecto (Ejercicio Actual)": 3.0,
+    "Diagnóstico": 1.0,
+    "Objetivo General": 1.5,
+    "Descripción del Proyecto": 1.0,
+    CAMPO_META: 2.0,
+}
+
+PALABRAS_VACIAS = {
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los", "o", "para", "por", "que", "se",
+    "su", "sus", "un", "una", "y",
+}
+
+# Parámetros de BM25
+K1 = 1.2
+B = 0.75
+
+# Términos del vocabulario que se prueban por cada palabra incompleta, y cuánto pesan frente a la exacta
+LIMITE_PREFIJO = 50
+PESO_PREFIJO = 0.7
+
+PALABRA = r"[a-z0-9]+"
+
+COLUMNAS_RESULTADOS = ["Clave Q", "Clave de Meta", "Proyecto", "Meta", "Corte", "Palabras", "Puntaje"]
+
+
+def normalizar(textos):
+    # Serie de textos -> minúsculas sin acentos (ñ -> n)
+    return (
+        pd.Series(textos, dtype=object).fillna("").astype(str)
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii").str.lower()
+    )
+
+
+def palabras(texto):
+    # Palabras de una consulta, con la misma normalización que el índice y sin repetir
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii").lower()
+    return [p for p in dict.fromkeys(re.findall(PALABRA, texto)) if p not in PALABRAS_VACIAS]
+
+
+class IndiceTexto:
+    # Un documento por proyecto (Datos Generales) y uno por meta. Las listas de aparición se guardan
+    # contiguas por término (docs / frecuencias en arreglos), así una consulta solo suma rebanadas.
+
+    def __init__(self, corte):
+        datos = corte["datos"].astype({"Clave Q": object}).dropna(subset=["Clave Q"]).drop_duplicates("Clave Q")
+        metas = (
+            corte["metas"][["Clave Q", "Clave de Meta", CAMPO_META]].astype(object)
+            .dropna(subset=["Clave Q", "Clave de Meta"]).drop_duplicates(["Clave Q", "Clave de Meta"])
+        )
+        nombres = datos.set_index("Clave Q")[CAMPOS_PROYECTO[0]]
+
+        self.documentos = pd.concat([
+            pd.DataFrame({"Clave Q": datos["Clave Q"], "Clave de Meta": None, "Meta": None}),
+            pd.DataFrame({"Clave Q": metas["Clave Q"], "Clave de Meta": metas["Clave de Meta"], "Meta": metas[CAMPO_META]}),
+        ], ignore_index=True)
+        self.documentos["Proyecto"] = self.documentos["Clave Q"].map(nombres)
+
+        # --- (documento, término, peso) de todos los campos ---
+        partes = [
+            self._apariciones(np.arange(len(datos)), datos[campo], PESOS[campo])
+            for campo in ["Clave Q"] + CAMPOS_PROYECTO
+        ] + [
+            self._apariciones(len(datos) + np.arange(len(metas)), metas[campo], PESOS[campo])
+            for campo in ["Clave de Meta", CAMPO_META]
+        ]
+        apariciones = pd.concat(partes, ignore_index=True)
+
+        frecuencias = apariciones.groupby(["Término", "Documento"], sort=True)["Peso"].sum().reset_index()
+        codigos, self._terminos = pd.factorize(frecuencias["Término"], sort=True)
+        self._terminos = list(self._terminos)
+        self._inicios = np.searchsorted(codigos, np.arange(len(self._terminos) + 1))
+        self._docs = frecuencias["Documento"].to_numpy(np.int32)
+        self._frecuencias = frecuencias["Peso"].to_numpy(np.float32)
+
+        longitudes = np.bincount(self._docs, weights=self._frecuencias, minlength=len(self.documentos))
+        self._normas = K1 * (1 - B + B * longitudes / max(longitudes.mean(), 1e-9))
+        apariciones_termino = np.diff(self._inicios)
+        self._idf = np.log1p((len(self.documentos) - apariciones_termino + 0.5) / (apariciones_termino + 0.5))
+
+    @staticmethod
+    def _apariciones(documentos, textos, peso):
+        tabla = pd.DataFrame({"Documento": documentos, "Término": normalizar(textos.to_numpy()).str.findall(PALABRA).to_numpy()})
+        tabla = tabla.explode("Término").dropna(subset=["Término"])
+        tabla = tabla[~tabla["Término"].isin(PALABRAS_VACIAS)]
+        return tabla.assign(Peso=peso)
+
+    def _terminos_de(self, palabra):
+        # Posiciones del vocabulario: la palabra exacta y las que empiezan con ella
+        inicio = bisect_left(self._terminos, palabra)
+        fin = bisect_left(self._terminos, palabra + "{", lo=inicio)
+        return range(inicio, min(fin, inicio + LIMITE_PREFIJO))
+
+    def buscar(self, consulta, limite=20):
+        # Documentos ordenados por palabras de la consulta encontradas y luego por puntaje BM25
+        n = len(self.documentos)
+        puntaje = np.zeros(n)
+        encontradas = np.zeros(n, dtype=np.int32)
+        consulta = palabras(consulta)
+
+        for palabra in consulta:
+            presentes = np.zeros(n, dtype=bool)
+            for t in self._terminos_de(palabra):
+                docs = self._docs[self._inicios[t]:self._inicios[t + 1]]
+                tf = self._frecuencias[self._inicios[t]:self._inicios[t + 1]]
+                peso = 1.0 if self._terminos[t] == palabra else PESO_PREFIJO
+                puntaje[docs] += peso * self._idf[t] * tf * (K1 + 1) / (tf + self._normas[docs])
+                presentes[docs] = True
+            encontradas += presentes
+
+        candidatos = np.flatnonzero(encontradas)
+        orden = np.lexsort((-puntaje[candidatos], -encontradas[candidatos]))[:limite]
+        elegidos = candidatos[orden]
+        return self.documentos.iloc[elegidos].assign(
+            Palabras=encontradas[elegidos], Puntaje=puntaje[elegidos].round(2)
+        ).reset_index(drop=True)
+
+
+def buscar(indices, consulta, limite=20):
+    # Consulta en varios cortes ({"Antes": IndiceTexto, "Ahora": IndiceTexto}); cada proyecto / meta
+    # aparece una vez con su mejor puntaje y los cortes donde se encontró
+    unidos = {}
+    # Los textos del último corte tienen prioridad para mostrar
+    for version, indice in reversed(list(indices.items())):
+        for fila in indice.buscar(consulta, limite).to_dict("records"):
+            llave = (fila["Clave Q"], fila["Clave de Meta"])
+            if llave not in unidos:
+                unidos[llave] = {**fila, "Corte": [version]}
+                continue
+            previo = unidos[llave]
+            previo["Corte"].insert(0, version)
+            previo["Palabras"] = max(previo["Palabras"], fila["Palabras"])
+            previo["Puntaje"] = max(previo["Puntaje"], fila["Puntaje"])
+
+    tabla = pd.DataFrame(
+        [{**fila, "Corte": ", ".join(fila["Corte"])} for fila in unidos.values()], columns=COLUMNAS_RESULTADOS
+    )
+    tabla = tabla.sort_values(["Palabras", "Puntaje"], ascending=False, kind="mergesort")
+    return tabla.head(limite).reset_index(drop=True)
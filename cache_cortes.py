@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ========== CACHÉ DE CORTES EN MEMORIA ==========
+
+# Presupuesto total de los cortes indexados que se mantienen en memoria (todas las sesiones)
+PRESUPUESTO_MB = float(os.environ.get("SED_CACHE_CORTES_MB", "2048"))
+
+
+class CacheCortes:
+    # LRU por huella con tope en bytes, compartida por todas las sesiones del proceso.
+    # Dos sesiones que suben los mismos bytes reciben el mismo objeto; si llegan a la vez,
+    # solo una lo carga y la otra espera el resultado.
+
+    def __init__(self, presupuesto_bytes, medir, compartido=None):
+        self.presupuesto = int(presupuesto_bytes)
+        self._medir = medir
+        # `compartido(valor)`: entradas que no ocupan memoria propia (cortes mapeados del catálogo);
+        # su tamaño se muestra aparte y no cuenta en el presupuesto
+        self._compartido = compartido
+        self._mapeados = {}
+        self._entradas = OrderedDict()
+        self._derivados = OrderedDict()
+        self._cargando = {}
+        self._candado = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, huella, cargar):
+        return self._obtener(self._entradas, huella, cargar, self._medir)
+
+    def derivado(self, huellas, nombre, cargar, medir):
+        # Objeto calculado de uno o más cortes de la caché (comparación, resumen, índice...): cuenta en el
+        # mismo presupuesto y se descarta junto con el primero de sus cortes que salga
+        return self._obtener(self._derivados, (nombre, *huellas), cargar, medir, huellas=tuple(huellas))
+
+    def _obtener(self, entradas, llave, cargar, medir, huellas=None):
+        with self._candado:
+            if llave in entradas:
+                return self._acierto(entradas, llave, huellas)
+            candado_carga = self._cargando.setdefault(llave, threading.Lock())
+
+        with candado_carga:
+            with self._candado:
+                if llave in entradas:
+                    return self._acierto(entradas, llave, huellas)
+            try:
+                valor = cargar()
+                tamano = medir(valor)
+            finally:
+                with self._candado:
+                    self._cargando.pop(llave, None)
+
+            with self._candado:
+                if huellas is None:
+                    self.fallos += 1
+                    if self._compartido is not None and self._compartido(valor):
+                        self._mapeados[llave] = tamano
+                        tamano = 0
+                elif not all(huella in self._entradas for huella in huellas):
+                    # Sin sus cortes en la caché no habría con qué descartarlo: se usa sin guardarlo
+                    return valor
+                entradas[llave] = (valor, tamano)
+                self.bytes += tamano
+                self._desalojar()
+        return valor
+
+    def contiene(self, huella):
+        with self._candado:
+            return huella in self._entradas
+
+    def _acierto(self, entradas, llave, huellas):
+        entradas.move_to_end(llave)
+        if huellas is None:
+            self.aciertos += 1
+        else:
+            # Usar un derivado también es usar sus cortes
+            for huella in huellas:
+                self._entradas.move_to_end(huella)
+        return entradas[llave][0]
+
+    def _desalojar(self):
+        # Los dos más recientes (el par que se está comparando) se conservan aunque excedan el presupuesto
+        while self.bytes > self.presupuesto and len(self._entradas) > 2:
+            huella, (_, tamano) = self._entradas.popitem(last=False)
+            self.bytes -= tamano
+            self.desalojos += 1
+            self._mapeados.pop(huella, None)
+            for llave in [llave for llave in self._derivados if huella in llave[1:]]:
+                self.bytes -= self._derivados.pop(llave)[1]
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                "Tamaño (MB)": round(self.bytes / 1024 ** 2, 2),
+                "Presupuesto (MB)": round(self.presupuesto / 1024 ** 2, 2),
+                "Entradas": len(self._entradas),
+                "Mapeados (MB)": round(sum(self._mapeados.values()) / 1024 ** 2, 2),
+                "Derivados": len(self._derivados),
+                "Derivados (MB)": round(sum(t for _, t in self._derivados.values()) / 1024 ** 2, 2),
+                "Aciertos": self.aciertos,
+                "Fallos": self.fallos,
+                "Desalojos": self.desalojos,
+            }
+
+
+def tamano_objeto(valor, vistos=None):
+    # Bytes aproximados de un objeto derivado: tablas y arreglos por su contenido, y los atributos,
+    # diccionarios y listas que los contienen (cada objeto se cuenta una vez)
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Index):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            tamano_objeto(k, vistos) + tamano_objeto(v, vistos) for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set)):
+        return sys.getsizeof(valor) + sum(tamano_objeto(v, vistos) for v in valor)
+    if hasattr(valor, "__dict__"):
+        return sys.getsizeof(valor) + tamano_objeto(vars(valor), vistos)
+    return sys.getsizeof(valor)
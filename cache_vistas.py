@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from comparacion import formato_moneda
+
+# ========== CACHÉ DE VISTAS RENDERIZADAS ==========
+# Figuras y tablas ya formateadas de cada vista por (par de cortes, Clave Q, Clave de Meta, vista),
+# en una LRU con tope en bytes compartida por todas las sesiones (la misma `CacheCortes`).
+# Cambiar de meta o de subsección y volver es un acierto: no se recalcula ni se reconstruye la figura.
+
+PRESUPUESTO_VISTAS_MB = float(os.environ.get("SED_CACHE_VISTAS_MB", "256"))
+
+# Tamaño aproximado de lo que no es figura ni tabla (textos cortos, números)
+TAMANO_MINIMO = 64
+
+
+def tamano_salida(valor):
+    # Bytes de una salida: las figuras cuentan lo que se envía al navegador (su JSON)
+    if valor is None:
+        return 0
+    if isinstance(valor, dict):
+        return sum(tamano_salida(v) for v in valor.values())
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if hasattr(valor, "to_plotly_json"):
+        import plotly.io as pio
+        return len(pio.to_json(valor, validate=False))
+    return TAMANO_MINIMO
+
+
+def _sin_puntos(traza):
+    # Una traza sin ningún punto no dibuja nada
+    ejes = [traza[p] for p in ("x", "y") if p in traza and traza[p] is not None]
+    return bool(ejes) and all(len(valores) == 0 for valores in ejes)
+
+
+def recortar_figura(figura):
+    # Solo viaja al navegador lo que se dibuja: sin trazas ocultas o vacías, sin `customdata` ni
+    # `hovertext` que la plantilla de la etiqueta no usa, y con fechas sin hora cuando todas caen a
+    # medianoche (inicio de las barras del Gantt). Los números ya viajan como arreglos binarios.
+    trazas = []
+    for traza in figura.data:
+        if traza.visible is False or _sin_puntos(traza):
+            continue
+        plantilla = (traza["hovertemplate"] if "hovertemplate" in traza else None) or ""
+        for propiedad in ("customdata", "hovertext"):
+            if propiedad not in traza or traza[propiedad] is None:
+                continue
+            # Sin plantilla, plotly muestra `hovertext` en la etiqueta; `customdata` solo se ve a través de ella
+            if f"%{{{propiedad}" not in plantilla and (plantilla or propiedad == "customdata"):
+                traza[propiedad] = None
+        for propiedad in ("x", "base"):
+            valores = traza[propiedad] if propiedad in traza else None
+            if isinstance(valores, np.ndarray) and np.issubdtype(valores.dtype, np.datetime64):
+                dias = valores.astype("datetime64[D]")
+                if (dias == valores).all():
+                    traza[propiedad] = np.datetime_as_string(dias)
+        trazas.append(traza)
+    if len(trazas) < len(figura.data):
+        figura.data = trazas
+    return figura
+
+
+def formatear_tabla(tabla, monedas=(), fechas=()):
+    # Copia con las columnas de montos como moneda y las fechas como dd/mm/aaaa (texto listo para mostrar)
+    tabla = tabla.copy()
+    for col in monedas:
+        tabla[col] = formato_moneda(tabla[col])
+    for col in fechas:
+        tabla[col] = tabla[col].dt.strftime("%d/%m/%Y")
+    return tabla
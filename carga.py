@@ -0,0 +1,274 @@
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+# ========== DEFINICIÓN DE HOJAS ==========
+
+# Los reportes SED traen el encabezado en la fila 8 (header=7 en pandas)
+FILA_ENCABEZADO = 8
+
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+]
+
+COLUMNAS_DATOS = [
+    "Fecha", "Clave Q", "Nombre del Proyecto (Ejercicio Actual)", "Eje", "Dep Siglas",
+    "Diagnóstico", "Objetivo General", "Descripción del Proyecto",
+    "Descripción del Avance Actual", "Alcance Anual"
+]
+
+COLUMNAS_METAS = [
+    "Clave Q", "ID Meta", "Clave de Meta", "Descripción de la Meta", "Unidad de Medida",
+    "ID Mpio", "Municipio", "Registro Presupuestal", "Cantidad Estatal", "Monto Estatal",
+    "Cantidad Federal", "Monto Federal", "Cantidad Municipal", "Monto Municipal",
+    "Cantidad Ingresos Propios", "Monto Ingresos Propios", "Cantidad Otros", "Monto Otros"
+]
+
+COLUMNAS_CRONOGRAMA = [
+    "Clave Q", "Dep Siglas", "ID Meta", "Clave de Meta", "Clave de Actividad /Hito", "Tipo",
+    "Fase Actividad / Hito", "Descripción", "Fecha de Inicio", "Fecha de Termino",
+    "Monto Actividad / Hito"
+]
+
+# Agregada al cargar: texto original de las fechas del cronograma que no se pudieron interpretar
+COLUMNA_FECHAS_INVALIDAS = "Fechas Inválidas"
+
+# Formato de las fechas capturadas como texto en los reportes SED
+FORMATO_FECHA = "%d/%m/%Y"
+
+COLUMNAS_PARTIDAS = [
+    "Clave Q", "ID Meta", "Clave de Meta", "Partida", "Monto Anual"
+] + [f"Monto {mes}" for mes in MESES]
+
+COLUMNAS_CUMPLIMIENTO = ["Clave de Meta", "Cantidad"] + [f"Cumplimiento {mes}" for mes in MESES]
+
+# Clave interna -> (nombre de la hoja en el libro, columnas requeridas)
+HOJAS = {
+    "datos": ("Datos Generales", COLUMNAS_DATOS),
+    "metas": ("Sección de Metas", COLUMNAS_METAS),
+    "cronograma": ("Sección de Metas-Cronograma", COLUMNAS_CRONOGRAMA),
+    "partidas": ("Sección de Metas-Partidas", COLUMNAS_PARTIDAS),
+    "cumplimiento": ("Sección de Metas-Cumplimiento", COLUMNAS_CUMPLIMIENTO),
+}
+
+# Columnas que identifican una fila con datos en cada hoja
+LLAVES_HOJAS = {
+    "datos": ["Clave Q"],
+    "metas": ["Clave Q", "Clave de Meta"],
+    "cronograma": ["Clave Q", "Clave de Meta"],
+    "partidas": ["Clave Q", "Clave de Meta"],
+    "cumplimiento": ["Clave de Meta"],
+}
+
+# Los libros SED traen formato hasta filas muy lejanas: tras esta cantidad de filas seguidas
+# sin llaves se da la hoja por terminada
+FILAS_VACIAS_FIN = 500
+
+# Textos que pd.read_excel lee como faltantes por defecto (`na_values`); openpyxl los entrega como texto
+TEXTOS_FALTANTES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>",
+    "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+
+# Tipos compactos por hoja: claves y catálogos repetidos como categoría, IDs como enteros
+# pequeños y cantidades en float32. Los montos se quedan en float64 (centavos exactos en totales).
+CANTIDADES_METAS = [c for c in COLUMNAS_METAS if c.startswith("Cantidad ")]
+
+ESQUEMAS = {
+    "datos": {"Eje": "categoria", "Dep Siglas": "categoria"},
+    "metas": {
+        "Clave Q": "categoria", "ID Meta": "entero", "Clave de Meta": "categoria",
+        "Descripción de la Meta": "categoria", "Unidad de Medida": "categoria", "ID Mpio": "entero",
+        "Municipio": "categoria", "Registro Presupuestal": "categoria",
+        **dict.fromkeys(CANTIDADES_METAS, "float32"),
+    },
+    "cronograma": {
+        "Clave Q": "categoria", "Dep Siglas": "categoria", "ID Meta": "entero", "Clave de Meta": "categoria",
+        "Clave de Actividad /Hito": "entero", "Tipo": "categoria", "Fase Actividad / Hito": "categoria",
+    },
+    "partidas": {"Clave Q": "categoria", "ID Meta": "entero", "Clave de Meta": "categoria", "Partida": "entero"},
+    "cumplimiento": dict.fromkeys(COLUMNAS_CUMPLIMIENTO[1:], "float32"),
+}
+
+
+# ========== LECTURA DEL LIBRO ==========
+
+def leer_corte(archivo, hojas=None, rango=None):
+    # Abre el libro una sola vez (modo solo lectura) y extrae todas las hojas requeridas.
+    # Si se pasa `rango` (dict), se llena con las filas y columnas fantasma omitidas por hoja.
+    hojas = list(HOJAS) if hojas is None else hojas
+    if hasattr(archivo, "seek"):
+        archivo.seek(0)
+
+    # openpyxl se importa al leer el primer libro, no al arrancar la app
+    from openpyxl import load_workbook
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        corte = {}
+        for clave in hojas:
+            nombre_hoja, columnas = HOJAS[clave]
+            corte[clave], rango_hoja = leer_hoja(libro[nombre_hoja], columnas, LLAVES_HOJAS.get(clave))
+            if rango is not None:
+                rango[clave] = rango_hoja
+    finally:
+        libro.close()
+
+    return normalizar_corte(corte)
+
+
+def leer_hoja(hoja, columnas, llaves=None):
+    # Devuelve (DataFrame, rango): solo se recorre el rango con datos de la hoja, no el que marca su formato
+    encabezado = next(hoja.iter_rows(min_row=FILA_ENCABEZADO, max_row=FILA_ENCABEZADO, values_only=True), ())
+
+    # Posición de cada columna requerida (primera aparición, igual que pandas)
+    posiciones = {}
+    for i, nombre in enumerate(encabezado):
+        if nombre is not None and nombre in columnas and nombre not in posiciones:
+            posiciones[nombre] = i
+    nombres = [c for c in columnas if c in posiciones]
+    indices = [posiciones[c] for c in nombres]
+    llaves = [nombres.index(c) for c in (llaves or []) if c in posiciones] or list(range(len(nombres)))
+
+    # Las celdas a la derecha de la última columna requerida no se leen
+    ultima_columna = max(indices, default=-1) + 1
+    filas = hoja.iter_rows(min_row=FILA_ENCABEZADO + 1, max_col=max(ultima_columna, 1), values_only=True)
+
+    tomar, tomar_llaves = _selector(indices), _selector(llaves)
+    registros = []
+    ultima_con_datos = 0
+    sin_llaves = 0
+    detenida = False
+    for fila in filas:
+        actual = tomar(fila)
+        registros.append(actual)
+        if actual.count(None) < len(actual):
+            ultima_con_datos = len(registros)
+        if tomar_llaves(actual).count(None) == len(llaves):
+            sin_llaves += 1
+            if sin_llaves >= FILAS_VACIAS_FIN:
+                detenida = True
+                break
+        else:
+            sin_llaves = 0
+    total = len(registros)
+
+    # Igual que pd.read_excel: descartar filas vacías al final de la hoja
+    df = pd.DataFrame(registros[:ultima_con_datos], columns=nombres)
+    texto = [c for c in df.columns if pd.api.types.is_string_dtype(df[c].dtype)]
+    for c in texto:
+        df[c] = df[c].mask(df[c].isin(TEXTOS_FALTANTES))
+    df = df.infer_objects().fillna(np.nan)
+
+    # Columnas completamente vacías como float (NaN), igual que pd.read_excel
+    vacias = [c for c in df.columns if pd.api.types.is_string_dtype(df[c].dtype) and df[c].isna().all()]
+
+    # Filas y columnas que el formato declara (dimensión de la hoja) pero no tienen datos;
+    # si el libro no declara dimensión, solo se cuentan las filas recorridas: si la lectura se detuvo
+    # antes del final, el conteo es una cota inferior
+    filas_declaradas = max((hoja.max_row or 0) - FILA_ENCABEZADO, total)
+    ultimo_encabezado = max((i + 1 for i, nombre in enumerate(encabezado) if nombre is not None), default=0)
+    rango = {
+        "Filas": ultima_con_datos,
+        "Filas fantasma": filas_declaradas - ultima_con_datos,
+        "Filas fantasma (cota inferior)": detenida and filas_declaradas == total,
+        "Columnas fantasma": max(hoja.max_column or 0, len(encabezado)) - ultimo_encabezado,
+    }
+    return df.astype({c: "float64" for c in vacias}), rango
+
+
+def rango_legible(rango):
+    # Rango de una hoja para mostrarlo: las filas fantasma contadas solo hasta donde se detuvo la lectura
+    # se muestran como mínimo ("≥500")
+    legible = {clave: valor for clave, valor in rango.items() if clave != "Filas fantasma (cota inferior)"}
+    if rango.get("Filas fantasma (cota inferior)"):
+        legible["Filas fantasma"] = f"≥{rango['Filas fantasma']}"
+    return legible
+
+
+def _selector(posiciones):
+    # Tupla con los valores de `posiciones` (itemgetter devuelve un escalar si es una sola)
+    if len(posiciones) == 1:
+        i = posiciones[0]
+        return lambda fila: (fila[i],)
+    return itemgetter(*posiciones) if posiciones else (lambda fila: ())
+
+
+def texto_clave(valor):
+    # Forma única de una clave capturada como número o como texto: 123, 123.0 y "123" -> "123"
+    if isinstance(valor, (float, np.floating)) and float(valor).is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def a_fechas(valores):
+    # Fechas dd/mm/aaaa en una sola pasada; solo las filas que no tienen ese formato se vuelven a
+    # interpretar: primero como ISO (aaaa-mm-dd) y el resto, valor por valor, con el día primero
+    fechas = pd.to_datetime(valores, format=FORMATO_FECHA, errors="coerce")
+    pendientes = valores.notna() & fechas.isna()
+    if pendientes.any():
+        fechas[pendientes] = pd.to_datetime(valores[pendientes], format="ISO8601", errors="coerce")
+        pendientes &= fechas.isna()
+    if pendientes.any():
+        fechas[pendientes] = valores[pendientes].map(lambda v: pd.to_datetime(v, dayfirst=True, errors="coerce"))
+    return fechas
+
+
+def normalizar_corte(corte):
+    if "cronograma" in corte:
+        crono = corte["cronograma"]
+        invalidas = pd.Series(np.nan, index=crono.index, dtype=object)
+        for col in ["Fecha de Inicio", "Fecha de Termino"]:
+            if col in crono.columns:
+                originales = crono[col]
+                crono[col] = a_fechas(crono[col])
+
+                # Valores capturados que no son fecha: quedan como NaT, pero se conserva el texto original
+                for i in crono.index[originales.notna() & crono[col].isna()]:
+                    texto = f"{col}: {originales[i]}"
+                    invalidas[i] = texto if pd.isna(invalidas[i]) else f"{invalidas[i]}; {texto}"
+        crono[COLUMNA_FECHAS_INVALIDAS] = invalidas
+
+    if "cumplimiento" in corte:
+        corte["cumplimiento"] = corte["cumplimiento"].dropna(subset=["Clave de Meta"])
+
+    return compactar_corte(corte)
+
+
+def compactar_corte(corte):
+    # Aplica ESQUEMAS; no cambia valores, solo tipos (seguro de aplicar más de una vez)
+    return {clave: compactar_hoja(df, ESQUEMAS.get(clave, {})) for clave, df in corte.items()}
+
+
+def compactar_hoja(df, esquema):
+    tipos = {}
+    for col, tipo in esquema.items():
+        if col not in df.columns:
+            continue
+        serie = df[col]
+        if tipo == "categoria":
+            # Solo texto: una columna con claves numéricas y texto mezclados se deja como está
+            if not isinstance(serie.dtype, pd.CategoricalDtype) and pd.api.types.infer_dtype(serie, skipna=True) == "string":
+                tipos[col] = "category"
+        elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            if tipo == "float32":
+                tipos[col] = "float32"
+            elif pd.api.types.is_integer_dtype(serie):
+                tipos[col] = pd.to_numeric(serie, downcast="integer").dtype
+    return df.astype(tipos) if tipos else df
+
+
+def memoria_hojas(hojas):
+    # Bytes ocupados por hoja, incluido el contenido de las columnas de texto
+    return {clave: int(df.memory_usage(deep=True).sum()) for clave, df in hojas.items()}
+
+
+def agregar_totales(df):
+    # Agrega las dos columnas sobre el mismo DataFrame (sin copiarlo); los totales se
+    # excluyen de la suma para que volver a llamarla no los cuente dos veces
+    for total, prefijo in (("Cantidad Total", "Cantidad"), ("Monto Total", "Monto")):
+        columnas = [c for c in df.columns if prefijo in c and c not in ("Cantidad Total", "Monto Total")]
+        df[total] = df[columnas].sum(axis=1, skipna=True).astype("float64")
+    return df
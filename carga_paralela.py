@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import uuid
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ProcessPoolExecutor, wait
+
+from almacen import guardar_instantanea, normalizar_tipos
+from carga import HOJAS, leer_corte
+
+# ========== CARGA DE LIBROS EN SEGUNDO PLANO ==========
+
+# Dos tareas por libro; SED_PROCESOS_CARGA lo limita en servidores con poca memoria
+PROCESOS = int(os.environ.get("SED_PROCESOS_CARGA", min(os.cpu_count() or 1, 4)))
+
+# Datos Generales sola y primero: con ella ya se pueden usar los selectores de Eje / Dependencia / Clave Q.
+# Las demás hojas van juntas: abrir el libro (las cadenas compartidas) cuesta casi lo que leer una hoja,
+# así que una tarea por hoja pagaría esa apertura cinco veces (`apertura_libro` en benchmarks/medir.py)
+GRUPOS_HOJAS = [["datos"], [clave for clave in HOJAS if clave != "datos"]]
+
+# Las sesiones de Streamlit corren en hilos del mismo proceso: el cambio de __main__ es de uno a la vez
+_candado_principal = threading.Lock()
+
+
+def _leer_hojas(ruta, claves):
+    # Cada proceso abre el libro desde el archivo temporal y lee sus hojas; devuelve {clave: (hoja, rango)}
+    rango = {}
+    corte = leer_corte(ruta, hojas=claves, rango=rango)
+    return {clave: (corte[clave], rango[clave]) for clave in claves}
+
+
+@contextmanager
+def _sin_script_principal():
+    # Streamlit registra el script de la app como __main__ y los procesos nuevos (forkserver / spawn)
+    # lo volverían a ejecutar al arrancar; mientras se crean, __main__ apunta a este módulo. Si Streamlit
+    # lo reemplazó entretanto (otra sesión empezó una ejecución), se deja el suyo
+    with _candado_principal:
+        principal = sys.modules["__main__"]
+        propio = sys.modules[__name__]
+        sys.modules["__main__"] = propio
+        try:
+            yield
+        finally:
+            if sys.modules.get("__main__") is propio:
+                sys.modules["__main__"] = principal
+
+
+class _Sesion:
+    # Testigo de una sesión: al descartarla Streamlit, sus cargas sin recoger se sueltan
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+
+
+class CargaParalela:
+    # Hojas de los libros subidos repartidas en un grupo de procesos compartido por todas las sesiones.
+    # El grupo atiende en orden de envío, así que Datos Generales de todos los libros sale primero.
+
+    def __init__(self, procesos=PROCESOS):
+        # Sin "fork": el servidor tiene varios hilos y un proceso bifurcado heredaría sus candados tomados.
+        # El servidor de forkserver importa este módulo (pandas, openpyxl) una vez para todos los procesos
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            contexto = multiprocessing.get_context("forkserver")
+            contexto.set_forkserver_preload([__name__])
+        else:
+            contexto = multiprocessing.get_context("spawn")
+        self._grupo = ProcessPoolExecutor(max_workers=procesos, mp_context=contexto)
+        self._cargas = {}
+        self._interes = {}
+        self._candado = threading.Lock()
+
+    def sesion(self):
+        sesion = _Sesion()
+        weakref.finalize(sesion, self.soltar, sesion.id)
+        return sesion
+
+    def iniciar(self, libros, sesion):
+        # `libros`: [(huella, contenido, nombre)] que la sesión espera ahora; los que ya están en curso no se
+        # vuelven a enviar, y los que la sesión esperaba antes y ya no (subió otro libro) se sueltan.
+        # El libro se escribe una vez a un archivo temporal; cada tarea recibe solo la ruta
+        with self._candado, _sin_script_principal():
+            huellas = {huella for huella, _, _ in libros}
+            for huella in self._interes.get(sesion.id, set()) - huellas:
+                self._soltar_carga(huella, sesion.id)
+            self._interes[sesion.id] = huellas
+
+            nuevos = [(huella, contenido, nombre) for huella, contenido, nombre in libros if huella not in self._cargas]
+            for huella, contenido, nombre in nuevos:
+                with tempfile.NamedTemporaryFile(prefix=f"sed-{huella[:12]}-", suffix=".xlsx", delete=False) as f:
+                    f.write(contenido)
+                self._cargas[huella] = {"nombre": nombre, "ruta": f.name, "tareas": [], "sesiones": set()}
+            for huella in huellas:
+                if huella in self._cargas:
+                    self._cargas[huella]["sesiones"].add(sesion.id)
+            for claves in GRUPOS_HOJAS:
+                for huella, _, _ in nuevos:
+                    carga = self._cargas[huella]
+                    carga["tareas"].append((claves, self._grupo.submit(_leer_hojas, carga["ruta"], claves)))
+
+    def soltar(self, id_sesion):
+        # La sesión terminó: sus cargas que nadie más espera se cancelan
+        with self._candado:
+            for huella in self._interes.pop(id_sesion, set()):
+                self._soltar_carga(huella, id_sesion)
+
+    def _soltar_carga(self, huella, id_sesion):
+        # Con el candado tomado. Las tareas que ya corren terminan solas y su resultado se descarta
+        carga = self._cargas.get(huella)
+        if carga is None:
+            return
+        carga["sesiones"].discard(id_sesion)
+        if carga["sesiones"]:
+            return
+        for _, futuro in carga["tareas"]:
+            futuro.cancel()
+        del self._cargas[huella]
+        _borrar(carga["ruta"])
+
+    def contiene(self, huella):
+        with self._candado:
+            return huella in self._cargas
+
+    def _tareas(self, huellas):
+        with self._candado:
+            return [tarea for h in huellas if h in self._cargas for tarea in self._cargas[h]["tareas"]]
+
+    def hoja(self, huella, clave):
+        # None si la carga ya no está (otra sesión la terminó y el corte está en la instantánea)
+        with self._candado:
+            carga = self._cargas.get(huella)
+            futuro = next((f for claves, f in carga["tareas"] if clave in claves), None) if carga else None
+        if futuro is None or futuro.cancelled():
+            return None
+        return futuro.result()[clave][0]
+
+    def progreso(self, huellas):
+        # (hojas listas, hojas en total) de las cargas en curso
+        tareas = self._tareas(huellas)
+        return sum(len(claves) for claves, f in tareas if f.done()), sum(len(claves) for claves, _ in tareas)
+
+    def esperar(self, huellas, segundos):
+        # Vuelve en cuanto termina alguna tarea (o al pasar `segundos`)
+        pendientes = [f for _, f in self._tareas(huellas) if not f.done()]
+        if pendientes:
+            wait(pendientes, timeout=segundos, return_when=FIRST_COMPLETED)
+
+    def terminar(self, huella):
+        # Espera las hojas restantes, guarda la instantánea y libera la carga (también si falló);
+        # None si la huella no se está cargando
+        with self._candado:
+            carga = self._cargas.get(huella)
+        if carga is None:
+            return None
+        try:
+            resultados = {}
+            for _, futuro in carga["tareas"]:
+                try:
+                    resultados.update(futuro.result())
+                except CancelledError:
+                    # Se soltó mientras tanto (ninguna sesión la esperaba): quien llama procesa el libro
+                    return None
+            hojas = normalizar_tipos({clave: hoja for clave, (hoja, _) in resultados.items()})
+            rango = {clave: rango for clave, (_, rango) in resultados.items()}
+            guardar_instantanea(huella, hojas, nombre=carga["nombre"], rango=rango)
+            return {clave: hojas[clave] for clave in HOJAS}
+        finally:
+            with self._candado:
+                if self._cargas.get(huella) is carga:
+                    del self._cargas[huella]
+            _borrar(carga["ruta"])
+
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
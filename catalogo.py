@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from almacen import huella_contenido, obtener_corte, preparar_para_parquet
+from carga import HOJAS
+from corte import Corte
+from historial import fecha_corte
+
+# ========== CATÁLOGO DE CORTES PUBLICADOS ==========
+# Uso: python catalogo.py publicar RUTA.xlsx [--etiqueta TEXTO] | listar | retirar HUELLA
+#
+# Un corte se publica una vez como <huella>/<hoja>.arrow (Arrow IPC sin compresión, ya ordenado e
+# indexado). Al abrirlo, los archivos se mapean en memoria: las columnas de texto y las numéricas
+# quedan como vistas de solo lectura sobre el mapa, así que todas las sesiones (y procesos) leen las
+# mismas páginas del caché del sistema operativo en lugar de una copia propia del corte.
+# Las columnas de texto solo son vistas con pandas 3 (dtype `str` respaldado por Arrow); con pandas 2
+# se convierten a object al abrir y cada sesión guarda su copia.
+
+DIR_CATALOGO = os.environ.get(
+    "SED_DIR_CATALOGO",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogo")
+)
+
+ARCHIVO_META = "meta.json"
+
+# Cambiar la versión si cambia el formato de las hojas publicadas: los cortes de otra versión
+# dejan de listarse y se vuelven a publicar
+VERSION_CATALOGO = 1
+
+
+def _ruta(huella):
+    return os.path.join(DIR_CATALOGO, huella)
+
+
+def _leer_meta(huella):
+    try:
+        with open(os.path.join(_ruta(huella), ARCHIVO_META), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publicado(huella):
+    meta = _leer_meta(huella)
+    return meta is not None and meta.get("version") == VERSION_CATALOGO
+
+
+def _tabla_arrow(df):
+    # pyarrow se importa al publicar o abrir un corte; listar el catálogo solo lee meta.json
+    import pyarrow as pa
+
+    df = preparar_para_parquet(df)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    # Los NaN de las columnas float se guardan como valor y no como nulo: sin máscara de nulos,
+    # la columna se lee sin copiarla
+    for i, col in enumerate(df.columns):
+        if pd.api.types.is_float_dtype(df[col]) and not isinstance(df[col].dtype, pd.ArrowDtype):
+            tabla = tabla.set_column(i, tabla.field(i), pa.array(df[col].to_numpy(), from_pandas=False))
+    return tabla
+
+
+def publicar(contenido, nombre="", etiqueta=None):
+    import pyarrow as pa
+
+    os.makedirs(DIR_CATALOGO, exist_ok=True)
+    huella = huella_contenido(contenido)
+    if publicado(huella):
+        return huella
+
+    # Se publican las hojas del Corte indexado (ordenadas y con totales) para abrirlas tal cual
+    corte = Corte(obtener_corte(contenido, nombre=nombre, huella=huella), huella=huella)
+    if etiqueta is None:
+        fecha = fecha_corte(corte["datos"])
+        etiqueta = f"{fecha:%d/%m/%Y} · {nombre}" if fecha is not None else nombre
+
+    # Escritura en un directorio temporal y renombrado atómico, igual que las instantáneas
+    temporal = tempfile.mkdtemp(prefix=f".{huella[:12]}-", dir=DIR_CATALOGO)
+    try:
+        for clave in HOJAS:
+            with pa.OSFile(os.path.join(temporal, f"{clave}.arrow"), "wb") as f:
+                tabla = _tabla_arrow(corte[clave])
+                with pa.ipc.new_file(f, tabla.schema) as escritor:
+                    escritor.write_table(tabla)
+
+        meta = {
+            "version": VERSION_CATALOGO,
+            "huella": huella,
+            "etiqueta": etiqueta,
+            "nombre": nombre,
+            "publicado": time.time(),
+            "hojas": {clave: len(corte[clave]) for clave in HOJAS},
+        }
+        with open(os.path.join(temporal, ARCHIVO_META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # Un corte publicado con otra versión se reemplaza
+        if os.path.isdir(_ruta(huella)):
+            retirar(huella)
+        os.replace(temporal, _ruta(huella))
+    except OSError:
+        shutil.rmtree(temporal, ignore_errors=True)
+        if not publicado(huella):
+            raise
+    return huella
+
+
+def abrir(huella):
+    # Hojas del corte como vistas sobre los archivos mapeados; se pasan a `Corte(..., indexadas=True)`
+    import pyarrow as pa
+
+    if not publicado(huella):
+        raise ValueError(f"El corte {huella[:12]} no está publicado con la versión {VERSION_CATALOGO} del catálogo")
+    ruta = _ruta(huella)
+    hojas = {}
+    for clave in HOJAS:
+        tabla = pa.ipc.open_file(pa.memory_map(os.path.join(ruta, f"{clave}.arrow"))).read_all()
+        hojas[clave] = tabla.to_pandas(split_blocks=True)
+    return hojas
+
+
+def abrir_corte(huella):
+    return Corte(abrir(huella), huella=huella, indexadas=True, mapeado=True)
+
+
+def listar():
+    filas = []
+    if os.path.isdir(DIR_CATALOGO):
+        for huella in os.listdir(DIR_CATALOGO):
+            meta = _leer_meta(huella)
+            if huella.startswith(".") or meta is None or meta.get("version") != VERSION_CATALOGO:
+                continue
+            ruta = _ruta(huella)
+            tamano = sum(e.stat().st_size for e in os.scandir(ruta) if e.is_file())
+            filas.append({
+                "Huella": huella,
+                "Corte": meta.get("etiqueta") or meta.get("nombre", ""),
+                "Archivo": meta.get("nombre", ""),
+                "Publicado": pd.Timestamp(meta.get("publicado", 0), unit="s"),
+                "Tamaño (MB)": round(tamano / 1024 ** 2, 2),
+            })
+
+    columnas = ["Huella", "Corte", "Archivo", "Publicado", "Tamaño (MB)"]
+    return pd.DataFrame(filas, columns=columnas).sort_values("Publicado", ascending=False, ignore_index=True)
+
+
+def retirar(huella):
+    # Las sesiones que ya lo tienen abierto conservan su mapa hasta soltarlo
+    shutil.rmtree(_ruta(huella), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Administra el catálogo de cortes SED compartido por todas las sesiones.")
+    acciones = parser.add_subparsers(dest="accion", required=True)
+    publicar_ = acciones.add_parser("publicar", help="Publica un corte desde un archivo .xlsx")
+    publicar_.add_argument("ruta", help="Archivo .xlsx del corte")
+    publicar_.add_argument("--etiqueta", help="Nombre que se muestra en el selector (default: fecha del corte y archivo)")
+    acciones.add_parser("listar", help="Muestra los cortes publicados")
+    retirar_ = acciones.add_parser("retirar", help="Quita un corte del catálogo")
+    retirar_.add_argument("huella", help="Huella (o su inicio) del corte a retirar")
+    args = parser.parse_args(argv)
+
+    if args.accion == "publicar":
+        inicio = time.perf_counter()
+        with open(args.ruta, "rb") as f:
+            huella = publicar(f.read(), nombre=os.path.basename(args.ruta), etiqueta=args.etiqueta)
+        print(f"Publicado {huella[:12]} en {time.perf_counter() - inicio:,.1f} s -> {DIR_CATALOGO}", file=sys.stderr)
+    elif args.accion == "listar":
+        lista = listar()
+        lista["Huella"] = lista["Huella"].str[:12]
+        print(lista.to_string(index=False) if not lista.empty else "Catálogo vacío")
+    else:
+        coincidencias = [h for h in listar()["Huella"] if h.startswith(args.huella)]
+        if len(coincidencias) != 1:
+            parser.error(f"La huella {args.huella!r} coincide con {len(coincidencias)} cortes publicados")
+        retirar(coincidencias[0])
+        print(f"Retirado {coincidencias[0][:12]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+import numpy as np
+import pandas as pd
+
+from carga import COLUMNA_FECHAS_INVALIDAS, MESES, texto_clave
+
+# ========== DETECCIÓN DE CAMBIOS ENTRE CORTES ==========
+
+# Llave natural de cada fila por hoja; las filas con llave repetida se distinguen por ocurrencia
+LLAVES = {
+    "datos": ["Clave Q"],
+    "metas": ["Clave Q", "Clave de Meta", "Municipio"],
+    "cronograma": ["Clave Q", "Clave de Meta", "Clave de Actividad /Hito"],
+    "partidas": ["Clave Q", "Clave de Meta", "Partida"],
+    "cumplimiento": ["Clave de Meta"],
+}
+
+# Columnas que cambian en cada corte sin representar un cambio de programación
+EXCLUIDAS = {
+    "datos": ["Fecha"],
+    "cronograma": [COLUMNA_FECHAS_INVALIDAS],
+}
+
+ESTADOS = ["Agregado", "Eliminado", "Modificado", "Sin cambios"]
+
+
+def _normalizar(df):
+    # Mismos tipos en ambos cortes para que el hash de valores iguales coincida
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+        elif not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].astype("string")
+    return df
+
+
+def texto_llave(serie):
+    # Llave en la misma forma de texto en ambos cortes (`texto_clave`): una clave capturada como número
+    # en un corte y como texto en el otro (123, 123.0, "123") se empareja en lugar de romper la unión
+    codigos, unicos = pd.factorize(serie)
+    textos = np.array([texto_clave(valor) for valor in unicos] + [None], dtype=object)
+    return pd.array(textos[codigos], dtype="string")
+
+
+def _normalizar_llaves(df):
+    return pd.DataFrame({col: texto_llave(df[col]) for col in df.columns})
+
+
+def _orden_llave(serie):
+    # Las llaves de texto que son números se ordenan como números ("2" antes que "10"), antes que las demás
+    def orden(valor):
+        try:
+            return (0, float(valor), "")
+        except ValueError:
+            return (1, 0.0, valor)
+
+    categorias = sorted(serie.dropna().unique(), key=orden)
+    return pd.Series(pd.Categorical(serie, categories=categorias, ordered=True), index=serie.index)
+
+
+def _huellas(df, llaves, valores):
+    resultado = _normalizar_llaves(df[llaves])
+    resultado["_ocurrencia"] = resultado.groupby(llaves, dropna=False).cumcount()
+    resultado["_huella"] = pd.util.hash_pandas_object(
+        _normalizar(df[valores]), index=False
+    ).to_numpy()
+    return resultado
+
+
+def comparar_hoja(antes, ahora, hoja):
+    llaves = [c for c in LLAVES[hoja] if c in antes.columns and c in ahora.columns]
+    excluidas = set(llaves) | set(EXCLUIDAS.get(hoja, []))
+    valores = [c for c in ahora.columns if c in antes.columns and c not in excluidas]
+
+    unidas = _huellas(antes, llaves, valores).merge(
+        _huellas(ahora, llaves, valores),
+        on=llaves + ["_ocurrencia"], how="outer", suffixes=("_antes", "_ahora"), indicator=True
+    )
+
+    unidas["Estado"] = np.select(
+        [
+            unidas["_merge"] == "right_only",
+            unidas["_merge"] == "left_only",
+            unidas["_huella_antes"] != unidas["_huella_ahora"],
+        ],
+        ["Agregado", "Eliminado", "Modificado"],
+        default="Sin cambios",
+    )
+    return unidas[llaves + ["Estado"]]
+
+
+class ComparacionCortes:
+    # Clasificación fila por fila de todas las hojas de dos cortes
+
+    def __init__(self, corte_antes, corte_ahora):
+        self._proyectos = None
+        self.hojas = {
+            hoja: comparar_hoja(corte_antes[hoja], corte_ahora[hoja], hoja)
+            for hoja in LLAVES
+        }
+
+        # Cumplimiento no trae Clave Q: se asigna a partir de las metas de ambos cortes
+        metas_q = pd.concat([
+            _normalizar_llaves(corte["metas"][["Clave de Meta", "Clave Q"]])
+            for corte in (corte_antes, corte_ahora)
+        ]).dropna().drop_duplicates("Clave de Meta")
+        cumplimiento = self.hojas["cumplimiento"]
+        if "Clave de Meta" in cumplimiento.columns:
+            self.hojas["cumplimiento"] = cumplimiento.merge(metas_q, on="Clave de Meta", how="left")
+
+    def conteos(self):
+        # Hoja × estado
+        filas = {
+            hoja: df["Estado"].value_counts().reindex(ESTADOS, fill_value=0)
+            for hoja, df in self.hojas.items()
+        }
+        return pd.DataFrame(filas).T
+
+    def proyectos_con_cambios(self):
+        # Una fila por Clave Q con al menos un cambio, con el número de filas cambiadas por hoja.
+        # Se calcula una sola vez: el objeto se comparte entre ejecuciones y sesiones.
+        if self._proyectos is None:
+            self._proyectos = self._resumir_proyectos()
+        return self._proyectos
+
+    def _resumir_proyectos(self):
+        cambios = []
+        for hoja, df in self.hojas.items():
+            if "Clave Q" not in df.columns:
+                continue
+            cambiadas = df.loc[df["Estado"] != "Sin cambios", "Clave Q"].dropna()
+            cambios.append(cambiadas.value_counts().rename(hoja))
+
+        resumen = pd.concat(cambios, axis=1).fillna(0).astype(int)
+        resumen.index.name = "Clave Q"
+
+        datos = self.hojas["datos"].drop_duplicates("Clave Q").set_index("Clave Q")["Estado"]
+        estado = datos.reindex(resumen.index).map({
+            "Agregado": "Nuevo",
+            "Eliminado": "Solo en corte antes",
+        }).fillna("Modificado")
+        resumen.insert(0, "Proyecto", estado)
+        return resumen.sort_index()
+
+
+# ========== COMPARATIVOS POR PESTAÑA ==========
+# Lógica compartida por la app (main.py) y los reportes por lote (lote.py)
+
+CAMPOS_TEXTO = [
+    "Diagnóstico", "Objetivo General", "Descripción del Proyecto",
+    "Descripción del Avance Actual", "Alcance Anual"
+]
+
+CAMPOS_METAS_TEXTO = ["Descripción de la Meta", "Unidad de Medida"]
+
+COLUMNAS_TABLA_CRONOGRAMA = [
+    "Clave de Actividad /Hito", "Fase Actividad / Hito", "Descripción",
+    "Fecha de Inicio", "Fecha de Termino", "Monto Actividad / Hito"
+]
+
+MESES_MONTO = [f"Monto {mes}" for mes in MESES]
+MESES_CUMPLIMIENTO = [f"Cumplimiento {mes}" for mes in MESES]
+
+
+def formato_moneda(serie):
+    # Equivalente vectorizado de f"${x:,.2f}" (vacío para NaN)
+    valores = pd.to_numeric(serie, errors="coerce").astype("float64")
+    centavos = np.round(np.abs(valores.to_numpy()) * 100)
+    validos = ~np.isnan(centavos)
+    centavos = np.where(validos, centavos, 0).astype(np.int64)
+
+    enteros = pd.Series(centavos // 100, index=serie.index).astype(str).str.replace(
+        r"\B(?=(\d{3})+(?!\d))", ",", regex=True
+    )
+    decimales = pd.Series(centavos % 100, index=serie.index).astype(str).str.zfill(2)
+    signo = np.where((valores.to_numpy() < 0) & (centavos > 0), "-", "")
+
+    texto = "$" + signo + enteros + "." + decimales
+    return texto.where(validos, "")
+
+
+def comparar_textos(fila_antes, fila_ahora, campos):
+    # [(campo, valor antes, valor ahora, modificado)] a partir de la primera fila de cada corte
+    resultado = []
+    for campo in campos:
+        valor_antes = str(fila_antes[campo].values[0]) if not fila_antes.empty else ""
+        valor_ahora = str(fila_ahora[campo].values[0]) if not fila_ahora.empty else ""
+        resultado.append((campo, valor_antes, valor_ahora, valor_antes != valor_ahora))
+    return resultado
+
+
+COLUMNAS_MUNICIPIOS = [
+    "Municipio",
+    "Cantidad Total (Antes)", "Cantidad Total (Ahora)",
+    "Monto Total (Antes)", "Monto Total (Ahora)"
+]
+
+
+class ResumenMetas:
+    # Totales por meta y comparativo por municipio de todas las metas de un par de cortes,
+    # calculados con dos agrupaciones; cada meta solo toma su rebanada ya calculada
+
+    VALORES = ["Cantidad Total", "Monto Total"]
+
+    def __init__(self, metas_antes, metas_ahora):
+        unidas = pd.concat(
+            [metas_antes.assign(**{"Versión": "Antes"}), metas_ahora.assign(**{"Versión": "Ahora"})],
+            ignore_index=True
+        )
+
+        # --- Totales por meta ---
+        totales = _por_version(unidas, ["Clave Q", "Clave de Meta"], self.VALORES)
+        totales["Diferencia Cantidad"] = totales["Cantidad Total (Ahora)"] - totales["Cantidad Total (Antes)"]
+        totales["Diferencia Monto"] = totales["Monto Total (Ahora)"] - totales["Monto Total (Antes)"]
+        self._totales = totales.to_dict("index")
+
+        # --- Comparativo por municipio, con los montos ya formateados ---
+        municipios = _por_version(unidas, ["Clave Q", "Clave de Meta", "Municipio"], self.VALORES).reset_index()
+        municipios = municipios.sort_values(["Clave Q", "Clave de Meta", "Municipio"], ignore_index=True)
+        for col in ["Monto Total (Antes)", "Monto Total (Ahora)"]:
+            municipios[f"{col} $"] = formato_moneda(municipios[col])
+
+        self._municipios = municipios
+        self._rebanadas = {
+            llave: slice(int(pos[0]), int(pos[-1]) + 1)
+            for llave, pos in municipios.groupby(["Clave Q", "Clave de Meta"], sort=False, observed=True).indices.items()
+        }
+
+    def totales(self, clave_q, clave_meta):
+        vacio = dict.fromkeys([
+            "Cantidad Total (Antes)", "Cantidad Total (Ahora)", "Monto Total (Antes)", "Monto Total (Ahora)",
+            "Diferencia Cantidad", "Diferencia Monto"
+        ], 0.0)
+        return self._totales.get((clave_q, clave_meta), vacio)
+
+    def municipios(self, clave_q, clave_meta, formato=False):
+        rebanada = self._rebanadas.get((clave_q, clave_meta), slice(0, 0))
+        tabla = self._municipios.iloc[rebanada]
+        if formato:
+            tabla = tabla.drop(columns=["Monto Total (Antes)", "Monto Total (Ahora)"]).rename(
+                columns=lambda c: c.removesuffix(" $")
+            )
+        return tabla[COLUMNAS_MUNICIPIOS].reset_index(drop=True)
+
+    def municipios_proyectos(self, claves_q):
+        # Comparativo por municipio de todas las metas de varios proyectos (sin formato)
+        tabla = self._municipios[self._municipios["Clave Q"].isin(claves_q)]
+        return tabla[["Clave Q", "Clave de Meta"] + COLUMNAS_MUNICIPIOS].reset_index(drop=True)
+
+
+def _por_version(unidas, llaves, valores):
+    # Suma por llaves y versión en una sola agrupación, con columnas "<valor> (Antes|Ahora)"
+    suma = unidas.groupby(llaves + ["Versión"], observed=True)[valores].sum().unstack("Versión", fill_value=0)
+    suma = suma.reindex(columns=pd.MultiIndex.from_product([valores, ["Antes", "Ahora"]]), fill_value=0)
+    suma.columns = [f"{valor} ({version})" for valor, version in suma.columns]
+    return suma
+
+
+def cronograma_comparado(df_crono_antes_qm, df_crono_ahora_qm):
+    # Actividades de ambas versiones en una sola tabla para el Gantt, y el orden del eje Y
+    df_crono_comparado = pd.concat([
+        df_crono_antes_qm.assign(**{"Versión": "Antes"}),
+        df_crono_ahora_qm.assign(**{"Versión": "Ahora"}),
+    ], ignore_index=True)
+
+    # Convertir clave numérica
+    df_crono_comparado["Clave Num"] = pd.to_numeric(
+        df_crono_comparado["Clave de Actividad /Hito"], errors="coerce"
+    )
+
+    df_crono_comparado["Actividad"] = (
+        df_crono_comparado["Clave de Actividad /Hito"].astype(str) +
+        " - " + df_crono_comparado["Descripción"].astype(str) +
+        " (" + df_crono_comparado["Versión"] + ")"
+    )
+
+    orden_y = df_crono_comparado.sort_values("Clave Num")["Actividad"].tolist()
+
+    # Ajustar fechas iguales (inicio = término)
+    mismo_dia = (
+        df_crono_comparado["Fecha de Inicio"] == df_crono_comparado["Fecha de Termino"]
+    )
+    df_crono_comparado.loc[mismo_dia, "Fecha de Termino"] += pd.Timedelta(days=1)
+
+    return df_crono_comparado, orden_y
+
+
+def cronograma_por_fase(df_crono_antes_qm, df_crono_ahora_qm):
+    # Gantt compacto: una barra por fase y versión, del primer inicio al último término
+    unidas = pd.concat([
+        df_crono_antes_qm.assign(**{"Versión": "Antes"}),
+        df_crono_ahora_qm.assign(**{"Versión": "Ahora"}),
+    ], ignore_index=True)
+    unidas["Fase Actividad / Hito"] = unidas["Fase Actividad / Hito"].astype(object).fillna("Sin fase").astype(str)
+
+    fases = unidas.groupby(["Fase Actividad / Hito", "Versión"], sort=False).agg(**{
+        "Fecha de Inicio": ("Fecha de Inicio", "min"),
+        "Fecha de Termino": ("Fecha de Termino", "max"),
+        "Actividades": ("Clave de Actividad /Hito", "size"),
+        "Monto Actividad / Hito": ("Monto Actividad / Hito", "sum"),
+    }).reset_index()
+    fases["Fase"] = fases["Fase Actividad / Hito"] + " (" + fases["Versión"] + ")"
+
+    orden_y = fases.sort_values(["Fase Actividad / Hito", "Versión"], ascending=[True, False])["Fase"].tolist()
+
+    mismo_dia = fases["Fecha de Inicio"] == fases["Fecha de Termino"]
+    fases.loc[mismo_dia, "Fecha de Termino"] += pd.Timedelta(days=1)
+    return fases, orden_y
+
+
+LLAVES_ACTIVIDAD = ["Clave Q", "Clave de Meta", "Clave de Actividad /Hito"]
+CAMPOS_ACTIVIDAD = [
+    "Fase Actividad / Hito", "Descripción", "Fecha de Inicio", "Fecha de Termino", "Monto Actividad / Hito"
+]
+
+
+def diferencias_cronograma(df_crono_antes, df_crono_ahora):
+    # Empareja las actividades de ambos cortes por Clave de Actividad /Hito (y por proyecto y meta si
+    # vienen varios) y calcula desfases de fechas, cambio de duración y diferencia de monto
+    llaves = [c for c in LLAVES_ACTIVIDAD if c in df_crono_antes.columns and c in df_crono_ahora.columns]
+
+    def preparar(df):
+        # Llaves en forma de texto: una clave compactada a entero en un corte y texto en el otro ("2.1")
+        campos = df[CAMPOS_ACTIVIDAD].reset_index(drop=True)
+        campos = campos.astype({c: object for c in campos.columns if isinstance(campos[c].dtype, pd.CategoricalDtype)})
+        df = pd.concat([_normalizar_llaves(df[llaves]), campos], axis=1)
+        return df.assign(_ocurrencia=df.groupby(llaves, dropna=False).cumcount())
+
+    unidas = preparar(df_crono_antes).merge(
+        preparar(df_crono_ahora), on=llaves + ["_ocurrencia"], how="outer",
+        suffixes=(" (Antes)", " (Ahora)"), indicator=True
+    )
+
+    def par(campo):
+        return unidas[f"{campo} (Antes)"], unidas[f"{campo} (Ahora)"]
+
+    inicio_antes, inicio_ahora = par("Fecha de Inicio")
+    termino_antes, termino_ahora = par("Fecha de Termino")
+    monto_antes, monto_ahora = par("Monto Actividad / Hito")
+    duracion_antes = (termino_antes - inicio_antes).dt.days
+    duracion_ahora = (termino_ahora - inicio_ahora).dt.days
+
+    iguales = np.ones(len(unidas), dtype=bool)
+    for campo in CAMPOS_ACTIVIDAD:
+        antes, ahora = par(campo)
+        iguales &= ((antes == ahora) | (antes.isna() & ahora.isna())).to_numpy()
+
+    resultado = unidas[llaves].copy()
+    resultado["Estado"] = np.select(
+        [unidas["_merge"] == "right_only", unidas["_merge"] == "left_only", ~iguales],
+        ["Agregado", "Eliminado", "Modificado"],
+        default="Sin cambios",
+    )
+    resultado["Fase Actividad / Hito"] = par("Fase Actividad / Hito")[1].combine_first(par("Fase Actividad / Hito")[0])
+    resultado["Descripción"] = par("Descripción")[1].combine_first(par("Descripción")[0])
+    resultado["Inicio (Antes)"], resultado["Inicio (Ahora)"] = inicio_antes, inicio_ahora
+    resultado["Desfase Inicio (días)"] = (inicio_ahora - inicio_antes).dt.days
+    resultado["Término (Antes)"], resultado["Término (Ahora)"] = termino_antes, termino_ahora
+    resultado["Desfase Término (días)"] = (termino_ahora - termino_antes).dt.days
+    resultado["Duración Antes (días)"], resultado["Duración Ahora (días)"] = duracion_antes, duracion_ahora
+    resultado["Cambio Duración (días)"] = duracion_ahora - duracion_antes
+    resultado["Monto (Antes)"], resultado["Monto (Ahora)"] = monto_antes, monto_ahora
+    resultado["Diferencia Monto"] = monto_ahora.fillna(0) - monto_antes.fillna(0)
+    return resultado.sort_values(llaves, key=_orden_llave, ignore_index=True)
+
+
+def tabla_cronograma(df_crono_qm):
+    return df_crono_qm[COLUMNAS_TABLA_CRONOGRAMA].sort_values("Clave de Actividad /Hito")
+
+
+def comparativo_partidas(df_partidas_antes_qm, df_partidas_ahora_qm):
+    resumen_ahora = (
+        df_partidas_ahora_qm.groupby("Partida")["Monto Anual"].sum().reset_index()
+        .rename(columns={"Monto Anual": "Monto Anual (Ahora)"})
+    )
+    resumen_antes = (
+        df_partidas_antes_qm.groupby("Partida")["Monto Anual"].sum().reset_index()
+        .rename(columns={"Monto Anual": "Monto Anual (Antes)"})
+    )
+
+    df_comparativo = pd.merge(resumen_antes, resumen_ahora, on="Partida", how="outer").fillna(0)
+    df_comparativo["Diferencia"] = (
+        df_comparativo["Monto Anual (Ahora)"] - df_comparativo["Monto Anual (Antes)"]
+    )
+    return df_comparativo
+
+
+def mensual_partidas(df_partidas_antes_qm, df_partidas_ahora_qm):
+    return pd.DataFrame({
+        "Mes": MESES,
+        "Antes": df_partidas_antes_qm[MESES_MONTO].sum().values,
+        "Ahora": df_partidas_ahora_qm[MESES_MONTO].sum().values
+    })
+
+
+def cumplimiento_comparado(df_cump_antes, df_cump_ahora):
+    # Cantidad programada de cada versión y serie mensual en formato largo para la gráfica
+    cantidad_ahora = df_cump_ahora["Cantidad"].values[0] if not df_cump_ahora.empty else None
+    cantidad_antes = df_cump_antes["Cantidad"].values[0] if not df_cump_antes.empty else None
+
+    valores_ahora = (
+        df_cump_ahora.iloc[0][MESES_CUMPLIMIENTO].fillna(0).values if not df_cump_ahora.empty else [0] * 12
+    )
+    valores_antes = (
+        df_cump_antes.iloc[0][MESES_CUMPLIMIENTO].fillna(0).values if not df_cump_antes.empty else [0] * 12
+    )
+
+    df_cumplimiento = pd.DataFrame({
+        "Mes": MESES * 2,
+        "Valor": list(valores_antes) + list(valores_ahora),
+        "Versión": ["Antes"] * 12 + ["Ahora"] * 12
+    })
+    return cantidad_antes, cantidad_ahora, df_cumplimiento
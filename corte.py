@@ -0,0 +1,119 @@
+import numpy as np
+
+from carga import agregar_totales, memoria_hojas
+
+# ========== CORTE INDEXADO ==========
+
+COLUMNA_NOMBRE = "Nombre del Proyecto (Ejercicio Actual)"
+
+
+class Corte:
+    # Hojas de un corte ordenadas por Clave Q / Clave de Meta, con índices de rebanadas
+    # para que cada selección sea una búsqueda en diccionario y no un recorrido de la hoja.
+
+    def __init__(self, hojas, huella=None, indexadas=False, mapeado=False):
+        self.huella = huella
+        # `mapeado`: hojas sobre archivos mapeados en memoria (catálogo); sus páginas son del caché del
+        # sistema, compartidas entre procesos, y no memoria propia del proceso
+        self.mapeado = mapeado
+        self.hojas = {}
+        self._por_q = {}
+        self._por_meta = {}
+        self._memoria = None
+
+        # `indexadas`: hojas ya ordenadas y con totales (las del catálogo); se usan tal cual, sin copiarlas
+        for clave, df in hojas.items():
+            if clave == "metas" and not indexadas:
+                df = agregar_totales(df)
+            self.hojas[clave], self._por_q[clave], self._por_meta[clave] = _indexar(df, ordenada=indexadas)
+
+        self.jerarquia = construir_jerarquia(self.hojas["datos"])
+
+    def __getitem__(self, hoja):
+        return self.hojas[hoja]
+
+    def filas(self, hoja, clave_q=None, clave_meta=None):
+        df = self.hojas[hoja]
+        if clave_meta is not None:
+            llave = clave_meta if "Clave Q" not in df.columns else (clave_q, clave_meta)
+            rebanada = self._por_meta[hoja].get(llave)
+        elif clave_q is not None:
+            rebanada = self._por_q[hoja].get(clave_q)
+        else:
+            return df
+        return df.iloc[rebanada] if rebanada is not None else df.iloc[0:0]
+
+    def filas_proyectos(self, hoja, claves_q):
+        # Filas de varios proyectos en una sola selección, en el orden de `claves_q`
+        return self._tomar(hoja, [self._por_q[hoja].get(clave_q) for clave_q in claves_q])
+
+    def primeras_filas(self, hoja, claves_meta):
+        # Primera fila de cada meta en hojas sin Clave Q (cumplimiento)
+        rebanadas = [self._por_meta[hoja].get(clave_meta) for clave_meta in claves_meta]
+        return self._tomar(hoja, [slice(r.start, r.start + 1) for r in rebanadas if r is not None])
+
+    def _tomar(self, hoja, rebanadas):
+        posiciones = [np.arange(r.start, r.stop) for r in rebanadas if r is not None]
+        return self.hojas[hoja].iloc[np.concatenate(posiciones) if posiciones else []]
+
+    def memoria(self):
+        # Bytes por hoja del corte en memoria (lo que ocupa cada corte en la caché compartida);
+        # las hojas no cambian, así que se mide una sola vez
+        if self._memoria is None:
+            self._memoria = memoria_hojas(self.hojas)
+        return self._memoria
+
+
+def unir_jerarquias(*jerarquias):
+    # Eje → Dependencia → {etiqueta: Clave Q} con los proyectos de todos los cortes;
+    # los cortes posteriores tienen prioridad en la etiqueta del proyecto
+    union = {}
+    for jerarquia in jerarquias:
+        for eje, deps in jerarquia.items():
+            for dep, proyectos in deps.items():
+                destino = union.setdefault(eje, {}).setdefault(dep, {})
+                for etiqueta, clave_q in proyectos.items():
+                    for anterior in [e for e, q in destino.items() if q == clave_q]:
+                        del destino[anterior]
+                    destino[etiqueta] = clave_q
+    return union
+
+
+def _indexar(df, ordenada=False):
+    llaves = [c for c in ["Clave Q", "Clave de Meta"] if c in df.columns]
+    if not llaves:
+        return df, {}, {}
+
+    # Orden estable: las filas de cada grupo quedan contiguas y conservan su orden original
+    if not ordenada:
+        df = df.sort_values(llaves, kind="mergesort", na_position="last", ignore_index=True)
+
+    por_q = {}
+    if "Clave Q" in llaves:
+        por_q = _rebanadas(df.groupby("Clave Q", sort=False, observed=True).indices)
+
+    por_meta = {}
+    if "Clave de Meta" in llaves:
+        grupos = df.groupby(llaves if len(llaves) > 1 else llaves[0], sort=False, observed=True).indices
+        por_meta = _rebanadas(grupos)
+
+    return df, por_q, por_meta
+
+
+def _rebanadas(indices):
+    return {llave: slice(int(pos[0]), int(pos[-1]) + 1) for llave, pos in indices.items()}
+
+
+def construir_jerarquia(datos):
+    jerarquia = {}
+    validos = datos.dropna(subset=["Eje", "Dep Siglas", "Clave Q", COLUMNA_NOMBRE])
+    for eje, dep, clave_q, nombre in zip(
+        validos["Eje"], validos["Dep Siglas"], validos["Clave Q"], validos[COLUMNA_NOMBRE]
+    ):
+        jerarquia.setdefault(eje, {}).setdefault(dep, {})[f"{clave_q} - {nombre}"] = clave_q
+
+    # Dependencias sin proyectos con nombre siguen apareciendo en el selector
+    for eje, dep in datos[["Eje", "Dep Siglas"]].dropna().drop_duplicates().itertuples(index=False):
+        jerarquia.setdefault(eje, {}).setdefault(dep, {})
+
+    return jerarquia
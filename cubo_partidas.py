@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from carga import MESES
+
+# ========== CUBO DE PARTIDAS ==========
+
+NIVELES = ["Meta", "Clave Q", "Dependencia", "Eje"]
+
+# Nivel inmediato inferior de cada nivel, para el desglose
+DESGLOSE = {"Eje": "Dependencia", "Dependencia": "Clave Q", "Clave Q": "Meta"}
+
+COLUMNAS_MONTO = [f"Monto {mes}" for mes in MESES] + ["Monto Anual"]
+ANUAL = len(MESES)
+
+
+class CuboPartidas:
+    # Montos de ambos cortes en un arreglo celda × versión × (12 meses + anual). Cada celda es una
+    # combinación observada de Clave Q / Clave de Meta / Partida, y cada nivel (meta, proyecto,
+    # dependencia, eje) es un vector de códigos por celda: cualquier total es una suma con bincount.
+
+    def __init__(self, corte_antes, corte_ahora):
+        partes = []
+        for version, corte in enumerate((corte_antes, corte_ahora)):
+            df = corte["partidas"]
+            partes.append(pd.DataFrame({
+                "Clave Q": df["Clave Q"].astype(object),
+                "Clave de Meta": df["Clave de Meta"].astype(object),
+                "Partida": df["Partida"].astype(object),
+                "_version": version,
+                **{col: df[col].astype("float64") for col in COLUMNAS_MONTO},
+            }))
+        unidas = pd.concat(partes, ignore_index=True)
+        if pd.api.types.infer_dtype(unidas["Partida"], skipna=True).startswith("mixed"):
+            unidas["Partida"] = unidas["Partida"].where(unidas["Partida"].isna(), unidas["Partida"].astype(str))
+
+        # Una Partida en blanco es su propia celda: sus montos cuentan en los totales mensuales y de cada nivel
+        unidas = unidas.dropna(subset=["Clave Q", "Clave de Meta"])
+        celdas = (
+            unidas.groupby(["Clave Q", "Clave de Meta", "Partida", "_version"], sort=False, dropna=False)[COLUMNAS_MONTO]
+            .sum().unstack("_version", fill_value=0.0)
+            .reindex(columns=pd.MultiIndex.from_product([COLUMNAS_MONTO, [0, 1]]), fill_value=0.0)
+        )
+        # (celda, columna, versión) -> (celda, versión, columna)
+        self._valores = celdas.to_numpy().reshape(len(celdas), len(COLUMNAS_MONTO), 2).transpose(0, 2, 1)
+
+        claves_q = celdas.index.get_level_values("Clave Q")
+        claves_meta = celdas.index.get_level_values("Clave de Meta")
+        self._codigo_partida, self._partidas = pd.factorize(
+            celdas.index.get_level_values("Partida"), sort=True, use_na_sentinel=False
+        )
+
+        # Eje y dependencia de cada proyecto desde Datos Generales (el corte ahora tiene prioridad)
+        datos = pd.concat([corte_ahora["datos"], corte_antes["datos"]])[["Clave Q", "Dep Siglas", "Eje"]]
+        datos = datos.astype(object).dropna(subset=["Clave Q"]).drop_duplicates("Clave Q").set_index("Clave Q")
+        self._ubicacion = datos.to_dict("index")
+        dependencias = claves_q.map(datos["Dep Siglas"]).fillna("Sin dependencia")
+        ejes = claves_q.map(datos["Eje"]).fillna("Sin eje")
+
+        self._codigos, self._etiquetas, self._posiciones = {}, {}, {}
+        for nivel, valores in (
+            ("Meta", pd.MultiIndex.from_arrays([claves_q, claves_meta])),
+            ("Clave Q", claves_q), ("Dependencia", dependencias), ("Eje", ejes),
+        ):
+            codigos, etiquetas = pd.factorize(valores)
+            self._codigos[nivel] = codigos
+            self._etiquetas[nivel] = list(etiquetas)
+            self._posiciones[nivel] = {etiqueta: i for i, etiqueta in enumerate(self._etiquetas[nivel])}
+
+    def ubicacion(self, clave_q):
+        # Valor de cada nivel para un proyecto (para pasar de una meta a su proyecto, dependencia o eje)
+        fila = self._ubicacion.get(clave_q, {})
+        return {
+            "Clave Q": clave_q,
+            "Dependencia": fila.get("Dep Siglas") if pd.notna(fila.get("Dep Siglas")) else "Sin dependencia",
+            "Eje": fila.get("Eje") if pd.notna(fila.get("Eje")) else "Sin eje",
+        }
+
+    def _mascara(self, nivel, valor):
+        return self._codigos[nivel] == self._posiciones[nivel].get(valor, -1)
+
+    def _totales(self, codigos, valores, n):
+        # Suma anual por código y versión; `presentes` marca los códigos con al menos una celda
+        antes = np.bincount(codigos, weights=valores[:, 0, ANUAL], minlength=n)
+        ahora = np.bincount(codigos, weights=valores[:, 1, ANUAL], minlength=n)
+        presentes = np.bincount(codigos, minlength=n) > 0
+        return antes[presentes], ahora[presentes], presentes
+
+    def mensual(self, nivel, valor):
+        suma = self._valores[self._mascara(nivel, valor), :, :ANUAL].sum(axis=0)
+        return pd.DataFrame({"Mes": MESES, "Antes": suma[0], "Ahora": suma[1]})
+
+    def por_partida(self, nivel, valor):
+        mascara = self._mascara(nivel, valor)
+        antes, ahora, presentes = self._totales(
+            self._codigo_partida[mascara], self._valores[mascara], len(self._partidas)
+        )
+        # Igual que `comparativo_partidas`: sin fila para la Partida en blanco
+        partidas = np.asarray(self._partidas)[presentes]
+        con_partida = pd.notna(partidas)
+        return pd.DataFrame({
+            "Partida": partidas[con_partida],
+            "Monto Anual (Antes)": antes[con_partida],
+            "Monto Anual (Ahora)": ahora[con_partida],
+            "Diferencia": (ahora - antes)[con_partida],
+        })
+
+    def partidas_proyectos(self, claves_q):
+        # Monto anual de cada meta / partida de varios proyectos, una fila por celda del cubo
+        codigos = [self._posiciones["Clave Q"][q] for q in claves_q if q in self._posiciones["Clave Q"]]
+        mascara = np.isin(self._codigos["Clave Q"], codigos)
+        metas = [self._etiquetas["Meta"][c] for c in self._codigos["Meta"][mascara]]
+        antes, ahora = self._valores[mascara, 0, ANUAL], self._valores[mascara, 1, ANUAL]
+        tabla = pd.DataFrame({
+            "Clave Q": [q for q, _ in metas],
+            "Clave de Meta": [meta for _, meta in metas],
+            "Partida": np.asarray(self._partidas)[self._codigo_partida[mascara]],
+            "Monto Anual (Antes)": antes,
+            "Monto Anual (Ahora)": ahora,
+            "Diferencia": ahora - antes,
+        })
+        return tabla.sort_values(["Clave Q", "Clave de Meta", "Partida"], ignore_index=True)
+
+    def desglose(self, nivel, valor):
+        # Totales anuales del nivel inferior dentro de `valor` (ej. las dependencias de un eje)
+        hijo = DESGLOSE[nivel]
+        mascara = self._mascara(nivel, valor)
+        etiquetas = self._etiquetas[hijo]
+        antes, ahora, presentes = self._totales(self._codigos[hijo][mascara], self._valores[mascara], len(etiquetas))
+
+        nombres = [e[1] if hijo == "Meta" else e for e, p in zip(etiquetas, presentes) if p]
+        tabla = pd.DataFrame({
+            "Clave de Meta" if hijo == "Meta" else hijo: nombres,
+            "Monto Anual (Antes)": antes,
+            "Monto Anual (Ahora)": ahora,
+            "Diferencia": ahora - antes,
+        })
+        return tabla.sort_values("Diferencia", key=np.abs, ascending=False, ignore_index=True)
@@ -0,0 +1,62 @@
+import difflib
+import html
+import re
+
+# ========== DIFERENCIAS DE TEXTO ==========
+
+# Nivel de detalle -> expresión que parte el texto en unidades de comparación
+MODOS = {
+    "palabra": re.compile(r"\s+|\w+|[^\w\s]"),
+    "oracion": re.compile(r"[^.!?;\n]+[.!?;\n]*\s*|[.!?;\n]+\s*"),
+    "caracter": None,
+}
+
+# Si el texto es demasiado grande para un nivel, se pasa al siguiente más grueso
+MAS_GRUESO = {"caracter": "palabra", "palabra": "oracion", "oracion": None}
+
+# Tope de trabajo de SequenceMatcher (tokens antes × tokens ahora), cuadrático en el peor caso
+LIMITE_TRABAJO = 4_000_000
+
+ABRE_ELIMINADO, CIERRA_ELIMINADO = "<del style='color:red'>", "</del>"
+ABRE_AGREGADO, CIERRA_AGREGADO = "<span style='background-color:lightgreen'>", "</span>"
+
+
+def tokenizar(texto, modo):
+    if MODOS[modo] is None:
+        return list(texto)
+    return MODOS[modo].findall(texto)
+
+
+def resaltar_diferencias(texto_antes, texto_ahora, modo="palabra"):
+    # Devuelve (html antes, html ahora) con lo eliminado tachado y lo agregado resaltado
+    if texto_antes == texto_ahora:
+        return html.escape(texto_antes), html.escape(texto_ahora)
+
+    tokens_antes, tokens_ahora = tokenizar(texto_antes, modo), tokenizar(texto_ahora, modo)
+    while len(tokens_antes) * len(tokens_ahora) > LIMITE_TRABAJO and MAS_GRUESO[modo]:
+        modo = MAS_GRUESO[modo]
+        tokens_antes, tokens_ahora = tokenizar(texto_antes, modo), tokenizar(texto_ahora, modo)
+
+    if len(tokens_antes) * len(tokens_ahora) > LIMITE_TRABAJO:
+        # Ni por oraciones cabe: se marca el bloque completo como reemplazado
+        return (
+            ABRE_ELIMINADO + html.escape(texto_antes) + CIERRA_ELIMINADO,
+            ABRE_AGREGADO + html.escape(texto_ahora) + CIERRA_AGREGADO,
+        )
+
+    # Partes en listas y un solo join al final (tiempo lineal en el tamaño de la salida)
+    res_antes, res_ahora = [], []
+    matcher = difflib.SequenceMatcher(None, tokens_antes, tokens_ahora, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        trozo_antes = html.escape("".join(tokens_antes[i1:i2]))
+        trozo_ahora = html.escape("".join(tokens_ahora[j1:j2]))
+        if tag == "equal":
+            res_antes.append(trozo_antes)
+            res_ahora.append(trozo_ahora)
+        else:
+            if trozo_antes:
+                res_antes += [ABRE_ELIMINADO, trozo_antes, CIERRA_ELIMINADO]
+            if trozo_ahora:
+                res_ahora += [ABRE_AGREGADO, trozo_ahora, CIERRA_AGREGADO]
+
+    return "".join(res_antes), "".join(res_ahora)
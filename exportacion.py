@@ -0,0 +1,121 @@
+import io
+
+import pandas as pd
+
+from carga import MESES
+from comparacion import MESES_CUMPLIMIENTO, diferencias_cronograma
+
+# ========== EXPORTACIÓN A EXCEL ==========
+# Un libro con una hoja por comparativo escrito fila por fila (openpyxl en modo write_only). Los
+# proyectos se procesan por bloques: cada bloque se calcula, se escribe y se descarta, así la
+# memoria no crece con el número de proyectos exportados
+
+HOJAS_EXPORTACION = ["Municipios", "Partidas", "Cronograma", "Cumplimiento"]
+
+# Proyectos calculados a la vez (una sola agrupación por hoja y bloque)
+PROYECTOS_POR_BLOQUE = 200
+
+TODO_EL_CORTE = "Todo el corte"
+
+TIPO_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+LLAVES_META = ["Clave Q", "Clave de Meta"]
+
+
+def comparativos_bloque(corte_antes, corte_ahora, claves_q, resumen, cubo):
+    # Las cuatro tablas de un grupo de proyectos, con Clave Q / Clave de Meta al inicio de cada fila;
+    # `resumen` (ResumenMetas) y `cubo` (CuboPartidas) son los de todo el par de cortes
+    return {
+        "Municipios": resumen.municipios_proyectos(claves_q),
+        "Partidas": cubo.partidas_proyectos(claves_q),
+        "Cronograma": diferencias_cronograma(
+            corte_antes.filas_proyectos("cronograma", claves_q), corte_ahora.filas_proyectos("cronograma", claves_q)
+        ),
+        "Cumplimiento": _cumplimiento_bloque(
+            corte_antes, corte_ahora,
+            corte_antes.filas_proyectos("metas", claves_q), corte_ahora.filas_proyectos("metas", claves_q),
+        ),
+    }
+
+
+def _sin_categorias(df):
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def _cumplimiento_bloque(corte_antes, corte_ahora, metas_antes, metas_ahora):
+    # Cantidad programada y meses de cada versión (igual que `cumplimiento_comparado`: primera fila
+    # de la meta y meses vacíos como 0), una fila por meta y versión
+    metas = pd.concat([_sin_categorias(metas_antes[LLAVES_META]), _sin_categorias(metas_ahora[LLAVES_META])])
+    metas = metas.dropna(subset=["Clave de Meta"]).drop_duplicates().sort_values(LLAVES_META, ignore_index=True)
+
+    versiones = []
+    for version, corte in (("Antes", corte_antes), ("Ahora", corte_ahora)):
+        # Las hojas del corte ya están indexadas: cada bloque toma solo sus filas, sin recorrer la hoja
+        cumplimiento = _sin_categorias(corte.primeras_filas("cumplimiento", metas["Clave de Meta"]))
+        cumplimiento = cumplimiento.drop_duplicates("Clave de Meta")[["Clave de Meta", "Cantidad"] + MESES_CUMPLIMIENTO]
+
+        tabla = metas.merge(cumplimiento, on="Clave de Meta", how="left")
+        tabla[MESES_CUMPLIMIENTO] = tabla[MESES_CUMPLIMIENTO].fillna(0)
+        versiones.append(tabla.assign(**{"Versión": version, "_orden": len(versiones)}))
+
+    tabla = pd.concat(versiones, ignore_index=True).sort_values(LLAVES_META + ["_orden"], kind="mergesort")
+    tabla = tabla.rename(columns=dict(zip(MESES_CUMPLIMIENTO, MESES)))
+    return tabla[LLAVES_META + ["Versión", "Cantidad"] + MESES].reset_index(drop=True)
+
+
+def exportar_comparacion(destino, corte_antes, corte_ahora, claves_q, resumen, cubo, avance=None):
+    # Escribe el libro en `destino` (ruta o archivo); `avance(hechos, total)` se llama tras cada bloque
+    # openpyxl se importa al exportar, no al arrancar la app
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hojas = {nombre: libro.create_sheet(nombre) for nombre in HOJAS_EXPORTACION}
+    encabezados = {}
+
+    for inicio in range(0, len(claves_q), PROYECTOS_POR_BLOQUE):
+        bloque = claves_q[inicio:inicio + PROYECTOS_POR_BLOQUE]
+        for nombre, tabla in comparativos_bloque(corte_antes, corte_ahora, bloque, resumen, cubo).items():
+            if tabla.empty:
+                continue
+            # El encabezado sale de la primera tabla no vacía de cada hoja
+            if nombre not in encabezados:
+                encabezados[nombre] = list(tabla.columns)
+                hojas[nombre].append([_celda_encabezado(hojas[nombre], c) for c in tabla.columns])
+            tabla = tabla.reindex(columns=encabezados[nombre]).astype(object)
+            for fila in tabla.where(tabla.notna(), None).itertuples(index=False, name=None):
+                hojas[nombre].append(fila)
+        if avance:
+            avance(inicio + len(bloque), len(claves_q))
+
+    libro.save(destino)
+    return destino
+
+
+def exportar_a_bytes(corte_antes, corte_ahora, claves_q, resumen, cubo, avance=None):
+    salida = io.BytesIO()
+    exportar_comparacion(salida, corte_antes, corte_ahora, claves_q, resumen, cubo, avance)
+    return salida.getvalue()
+
+
+def _celda_encabezado(hoja, texto):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    celda = WriteOnlyCell(hoja, value=texto)
+    celda.font = Font(bold=True)
+    return celda
+
+
+def proyectos_alcance(jerarquia, alcance):
+    # Claves Q de una Dep Siglas (en cualquier eje) o de todo el corte
+    return sorted({
+        clave_q
+        for deps in jerarquia.values()
+        for dep, proyectos in deps.items() if alcance in (TODO_EL_CORTE, dep)
+        for clave_q in proyectos.values()
+    })
+
+
+def nombre_archivo(alcance):
+    seguro = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(alcance))
+    return f"comparacion_{seguro}.xlsx"
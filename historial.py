@@ -0,0 +1,156 @@
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from carga import MESES, a_fechas, texto_clave
+
+# ========== HISTORIAL DE CORTES ==========
+
+# Almacén de solo anexado: cada corte agrega sus propios Parquet y nunca reescribe los anteriores
+DIR_HISTORIAL = os.environ.get(
+    "SED_DIR_HISTORIAL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "historial")
+)
+
+REGISTRO = "registro.json"
+
+COLUMNAS_MESES = [f"Monto {mes}" for mes in MESES]
+
+# Esquema fijo de los Parquet: un corte con montos enteros (int64 al leer el Excel) y otro con
+# decimales deben poder leerse juntos, y las claves numéricas o de texto filtrarse igual:
+# claves como texto, montos como float64 y la fecha del corte
+COLUMNAS_ESQUEMA = {
+    "metas": (["Clave Q", "Clave de Meta"], ["Cantidad Total", "Monto Total"]),
+    "partidas": (["Clave Q", "Clave de Meta", "Partida"], ["Monto Anual"] + COLUMNAS_MESES),
+}
+
+
+@functools.cache
+def esquema(sub):
+    # pyarrow se importa al escribir o leer el historial, no al arrancar la app
+    import pyarrow as pa
+
+    claves, montos = COLUMNAS_ESQUEMA[sub]
+    return pa.schema(
+        [(c, pa.string()) for c in claves] + [(c, pa.float64()) for c in montos] + [("Fecha Corte", pa.timestamp("ns"))]
+    )
+
+
+def fecha_corte(datos):
+    # Fecha más frecuente de la columna "Fecha" de Datos Generales
+    fechas = a_fechas(datos["Fecha"]).dropna() \
+        if "Fecha" in datos.columns else pd.Series(dtype="datetime64[ns]")
+    return fechas.mode().max().normalize() if not fechas.empty else None
+
+
+class Historial:
+
+    def __init__(self, directorio=DIR_HISTORIAL):
+        self.directorio = directorio
+        self._candado = threading.Lock()
+        for sub in ("metas", "partidas"):
+            os.makedirs(os.path.join(directorio, sub), exist_ok=True)
+
+    # --- Registro de cortes ---
+
+    def registro(self):
+        ruta = os.path.join(self.directorio, REGISTRO)
+        if not os.path.exists(ruta):
+            return []
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _guardar_registro(self, registro):
+        ruta = os.path.join(self.directorio, REGISTRO)
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(registro, f, ensure_ascii=False, indent=1)
+        os.replace(ruta + ".tmp", ruta)
+
+    def cortes(self):
+        columnas = ["Fecha Corte", "Archivo", "Huella"]
+        filas = [(pd.Timestamp(c["fecha"]), c["nombre"], c["huella"]) for c in self.registro()]
+        return pd.DataFrame(filas, columns=columnas).sort_values("Fecha Corte", ignore_index=True)
+
+    def contiene(self, huella):
+        return any(c["huella"] == huella for c in self.registro())
+
+    # --- Ingesta ---
+
+    def agregar(self, corte, nombre=""):
+        # Solo se procesa el corte nuevo; si la huella ya está registrada no se hace nada
+        if self.contiene(corte.huella):
+            return False
+
+        fecha = fecha_corte(corte["datos"])
+        if fecha is None:
+            fecha = pd.Timestamp(time.time(), unit="s").normalize()
+
+        metas = (
+            corte["metas"].groupby(["Clave Q", "Clave de Meta"], observed=True)
+            [["Cantidad Total", "Monto Total"]].sum().reset_index()
+        )
+        partidas = (
+            corte["partidas"].groupby(["Clave Q", "Clave de Meta", "Partida"], observed=True)
+            [["Monto Anual"] + COLUMNAS_MESES].sum().reset_index()
+        )
+
+        with self._candado:
+            if self.contiene(corte.huella):
+                return False
+            for sub, df in (("metas", metas), ("partidas", partidas)):
+                _con_esquema(df.assign(**{"Fecha Corte": fecha}), sub).to_parquet(
+                    os.path.join(self.directorio, sub, f"{corte.huella}.parquet"), index=False, schema=esquema(sub)
+                )
+            registro = self.registro()
+            registro.append({"huella": corte.huella, "fecha": fecha.isoformat(), "nombre": nombre})
+            self._guardar_registro(registro)
+        return True
+
+    # --- Consultas (lectura directa de Parquet con filtro) ---
+
+    def _leer(self, sub, filtros):
+        # Con el esquema explícito, los Parquet escritos antes del esquema fijo (montos int64) se convierten al leer
+        import pyarrow.dataset as ds
+
+        ruta = os.path.join(self.directorio, sub)
+        if not self.registro():
+            return pd.DataFrame()
+        condicion = None
+        for columna, _, valor in filtros:
+            # Misma forma que al escribir (`_con_esquema`): 123.0 y 123 buscan "123"
+            termino = ds.field(columna) == texto_clave(valor)
+            condicion = termino if condicion is None else condicion & termino
+        return ds.dataset(ruta, format="parquet", schema=esquema(sub)).to_table(filter=condicion).to_pandas()
+
+    def serie_metas(self, clave_q):
+        # Cantidad Total y Monto Total por meta y por fecha de corte
+        metas = self._leer("metas", [("Clave Q", "==", clave_q)])
+        return metas if metas.empty else metas.sort_values(["Clave de Meta", "Fecha Corte"])
+
+    def serie_proyecto(self, clave_q):
+        metas = self.serie_metas(clave_q)
+        if metas.empty:
+            return metas
+        return metas.groupby("Fecha Corte")[["Cantidad Total", "Monto Total"]].sum().reset_index()
+
+    def serie_partidas(self, clave_q, clave_meta=None):
+        filtros = [("Clave Q", "==", clave_q)]
+        if clave_meta is not None:
+            filtros.append(("Clave de Meta", "==", clave_meta))
+        partidas = self._leer("partidas", filtros)
+        return partidas if partidas.empty else partidas.sort_values(["Fecha Corte", "Partida"])
+
+
+def _con_esquema(df, sub):
+    # Claves como texto (sin ".0" de las claves numéricas leídas como float) y montos como float64
+    df = df.copy()
+    claves, montos = COLUMNAS_ESQUEMA[sub]
+    for col in claves:
+        df[col] = df[col].map(texto_clave, na_action="ignore").astype(object)
+    for col in montos:
+        df[col] = df[col].astype("float64")
+    return df
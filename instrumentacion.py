@@ -0,0 +1,183 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import weakref
+
+from arranque import estadisticas_arranque
+
+# ========== INSTRUMENTACIÓN (OPCIONAL) ==========
+# Se activa con SED_DEPURACION=1 o con el interruptor de depuración de la barra lateral.
+# SED_LOG_TIEMPOS=<ruta> agrega una línea JSON por ejecución del script.
+
+ACTIVA_POR_ENTORNO = os.environ.get("SED_DEPURACION", "") not in ("", "0")
+ARCHIVO_LOG = os.environ.get("SED_LOG_TIEMPOS")
+
+# tracemalloc es global al proceso: se inicia con el primer Medidor activo y se detiene cuando termina
+# el último (si lo inició otro código, no se detiene). Los picos que mide son de todo el proceso.
+_trazado = {"medidores": 0, "propio": False}
+
+# Llamadas y ejecuciones reales de las funciones en caché, compartidas por todo el proceso
+_contadores = {}
+_candado = threading.Lock()
+
+
+def contar_cache(nombre):
+    # Decorador externo a @st.cache_*: cuenta llamadas; la función cacheada llama a `registrar_fallo`
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with _candado:
+                _contadores.setdefault(nombre, {"llamadas": 0, "fallos": 0})["llamadas"] += 1
+            return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def registrar_fallo(nombre):
+    with _candado:
+        _contadores.setdefault(nombre, {"llamadas": 0, "fallos": 0})["fallos"] += 1
+
+
+def _iniciar_trazado():
+    with _candado:
+        if _trazado["medidores"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trazado["propio"] = True
+        _trazado["medidores"] += 1
+
+
+def _detener_trazado():
+    with _candado:
+        _trazado["medidores"] -= 1
+        if _trazado["medidores"] == 0 and _trazado["propio"]:
+            tracemalloc.stop()
+            _trazado["propio"] = False
+
+
+def estadisticas_cache():
+    with _candado:
+        return [
+            {"Función": nombre, "Llamadas": c["llamadas"], "Aciertos": c["llamadas"] - c["fallos"], "Fallos": c["fallos"]}
+            for nombre, c in sorted(_contadores.items())
+        ]
+
+
+class Medidor:
+    # Etapas secuenciales de una ejecución: cada `etapa()` cierra la anterior y abre la siguiente
+
+    def __init__(self, activo=False, perfilar=False):
+        self.activo = activo
+        self.etapas = []
+        self.memoria = {}
+        self.rango = {}
+        self._actual = None
+        self._inicio_ejecucion = time.perf_counter()
+        self._perfil = None
+        self._soltar_trazado = None
+
+        if activo:
+            # También se suelta si la ejecución no llega a `finalizar` (st.rerun, excepción)
+            _iniciar_trazado()
+            self._soltar_trazado = weakref.finalize(self, _detener_trazado)
+        if perfilar:
+            self._perfil = _nuevo_perfilador()
+
+    def etapa(self, nombre):
+        if not self.activo:
+            return
+        self._cerrar_actual()
+        tracemalloc.reset_peak()
+        self._actual = (nombre, time.perf_counter(), tracemalloc.get_traced_memory()[0])
+
+    def registrar_memoria(self, nombre, bytes_por_hoja):
+        self.memoria[nombre] = {hoja: round(b / 1024 ** 2, 2) for hoja, b in bytes_por_hoja.items()}
+
+    def registrar_rango(self, nombre, rango_por_hoja):
+        # Filas con datos y filas / columnas fantasma omitidas al leer el libro
+        for hoja, rango in rango_por_hoja.items():
+            self.rango[(nombre, hoja)] = rango
+
+    def _cerrar_actual(self):
+        if self._actual is None:
+            return
+        nombre, inicio, memoria_inicial = self._actual
+        _, pico = tracemalloc.get_traced_memory()
+        self.etapas.append({
+            "Etapa": nombre,
+            "Tiempo (ms)": round((time.perf_counter() - inicio) * 1000, 1),
+            # Incluye lo que otras sesiones asignaron durante la etapa
+            "Pico memoria proceso (MB)": round(max(pico - memoria_inicial, 0) / 1024 ** 2, 2),
+        })
+        self._actual = None
+
+    def finalizar(self):
+        # Cierra la ejecución; devuelve el reporte del perfilador si se pidió uno
+        self._cerrar_actual()
+        total = round((time.perf_counter() - self._inicio_ejecucion) * 1000, 1)
+        if self._soltar_trazado:
+            self._soltar_trazado()
+        reporte = self._perfil.detener() if self._perfil else None
+        self._perfil = None
+        return total, reporte
+
+    def soltar(self):
+        # Detiene el perfilador y suelta tracemalloc si la ejecución no llegó a `finalizar`
+        if self._soltar_trazado:
+            self._soltar_trazado()
+        if self._perfil:
+            self._perfil.detener()
+            self._perfil = None
+
+    def escribir_log(self, ejecucion, total_ms):
+        if not (self.activo and ARCHIVO_LOG):
+            return
+        registro = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "ejecucion": ejecucion,
+            "total_ms": total_ms,
+            "etapas": self.etapas,
+            "memoria_mb": self.memoria,
+            "rango": [{"corte": nombre, "hoja": hoja, **rango} for (nombre, hoja), rango in self.rango.items()],
+            "cache": estadisticas_cache(),
+            "arranque": estadisticas_arranque(),
+        }
+        with _candado, open(ARCHIVO_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+# --- Perfil de una ejecución completa (pyinstrument si está instalado, si no cProfile) ---
+
+class _PerfilCProfile:
+    def __init__(self):
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+
+    def detener(self):
+        self._perfil.disable()
+        salida = io.StringIO()
+        pstats.Stats(self._perfil, stream=salida).sort_stats("cumulative").print_stats(60)
+        return salida.getvalue()
+
+
+class _PerfilPyinstrument:
+    def __init__(self, profiler_cls):
+        self._perfil = profiler_cls()
+        self._perfil.start()
+
+    def detener(self):
+        self._perfil.stop()
+        return self._perfil.output_text(unicode=True, color=False)
+
+
+def _nuevo_perfilador():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return _PerfilCProfile()
+    return _PerfilPyinstrument(Profiler)
@@ -0,0 +1,274 @@
+import argparse
+import html
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from almacen import cargar_instantanea, huella_contenido, obtener_corte
+from carga import texto_clave
+from comparacion import (
+    CAMPOS_METAS_TEXTO, CAMPOS_TEXTO, ResumenMetas, comparar_textos, cumplimiento_comparado,
+    diferencias_cronograma, tabla_cronograma
+)
+from corte import Corte, unir_jerarquias
+from cubo_partidas import CuboPartidas
+from diferencias_texto import MODOS, resaltar_diferencias
+
+# ========== REPORTES POR LOTE (SIN INTERFAZ) ==========
+# Uso: python lote.py ANTES.xlsx AHORA.xlsx --salida reportes/ [--procesos N] [--dependencia DEP ...]
+
+# Cortes cargados una vez por proceso trabajador
+_cortes = {}
+
+
+def _iniciar_trabajador(archivos):
+    # `archivos`: (ruta, huella) de cada corte. Normalmente solo se lee la instantánea que generó el
+    # proceso principal; si falta (no se pudo guardar, o se podó mientras tanto) se vuelve a leer el libro
+    for version, (ruta, huella) in zip(("antes", "ahora"), archivos):
+        hojas = cargar_instantanea(huella)
+        if hojas is None:
+            with open(ruta, "rb") as f:
+                hojas = obtener_corte(f.read(), nombre=os.path.basename(ruta), huella=huella)
+        _cortes[version] = Corte(hojas, huella=huella)
+    _cortes["resumen"] = ResumenMetas(_cortes["antes"]["metas"], _cortes["ahora"]["metas"])
+    _cortes["cubo"] = CuboPartidas(_cortes["antes"], _cortes["ahora"])
+
+
+def comparar_proyecto(corte_antes, corte_ahora, clave_q, resumen=None, cubo=None):
+    # Las mismas tablas que muestran las pestañas de la app, para una Clave Q; `resumen` (ResumenMetas)
+    # y `cubo` (CuboPartidas) de todo el corte se reutilizan entre proyectos si se proporcionan
+    if resumen is None:
+        resumen = ResumenMetas(corte_antes.filas("metas", clave_q), corte_ahora.filas("metas", clave_q))
+    if cubo is None:
+        cubo = CuboPartidas(corte_antes, corte_ahora)
+
+    textos = pd.DataFrame(
+        comparar_textos(corte_antes.filas("datos", clave_q), corte_ahora.filas("datos", clave_q), CAMPOS_TEXTO),
+        columns=["Campo", "Antes", "Ahora", "Modificado"]
+    )
+
+    metas_ahora = corte_ahora.filas("metas", clave_q)
+    metas_antes = corte_antes.filas("metas", clave_q)
+    claves_meta = pd.concat([metas_antes["Clave de Meta"], metas_ahora["Clave de Meta"]]).dropna().unique()
+
+    metas, municipios, cronograma, partidas, mensual, cumplimiento = [], [], [], [], [], []
+    for clave_meta in claves_meta:
+        df_antes_meta = corte_antes.filas("metas", clave_q, clave_meta)
+        df_ahora_meta = corte_ahora.filas("metas", clave_q, clave_meta)
+
+        fila = {"Clave de Meta": clave_meta}
+        for campo, valor_antes, valor_ahora, _ in comparar_textos(
+            df_antes_meta.head(1), df_ahora_meta.head(1), CAMPOS_METAS_TEXTO
+        ):
+            fila[f"{campo} (Antes)"] = valor_antes
+            fila[f"{campo} (Ahora)"] = valor_ahora
+        fila.update(resumen.totales(clave_q, clave_meta))
+        metas.append(fila)
+
+        municipios.append(
+            resumen.municipios(clave_q, clave_meta).assign(**{"Clave de Meta": clave_meta})
+        )
+
+        crono_antes = corte_antes.filas("cronograma", clave_q, clave_meta)
+        crono_ahora = corte_ahora.filas("cronograma", clave_q, clave_meta)
+        if not (crono_antes.empty and crono_ahora.empty):
+            # Las filas tal como están en cada corte (sin el día que el Gantt agrega a las actividades de un día)
+            cronograma.append(pd.concat([
+                tabla_cronograma(crono_antes).assign(**{"Versión": "Antes"}),
+                tabla_cronograma(crono_ahora).assign(**{"Versión": "Ahora"}),
+            ], ignore_index=True).assign(**{"Clave de Meta": clave_meta}))
+
+        # Partidas desde el mismo cubo que usa la app (incluye los montos sin Partida en la serie mensual)
+        partidas.append(cubo.por_partida("Meta", (clave_q, clave_meta)).assign(**{"Clave de Meta": clave_meta}))
+        mensual.append(cubo.mensual("Meta", (clave_q, clave_meta)).assign(**{"Clave de Meta": clave_meta}))
+
+        _, _, serie = cumplimiento_comparado(
+            corte_antes.filas("cumplimiento", clave_meta=clave_meta),
+            corte_ahora.filas("cumplimiento", clave_meta=clave_meta)
+        )
+        cumplimiento.append(serie.assign(**{"Clave de Meta": clave_meta}))
+
+    # Actividades de todas las metas emparejadas en una sola pasada; solo las que cambiaron
+    cambios_cronograma = diferencias_cronograma(
+        corte_antes.filas("cronograma", clave_q), corte_ahora.filas("cronograma", clave_q)
+    )
+    cambios_cronograma = cambios_cronograma[cambios_cronograma["Estado"] != "Sin cambios"].drop(columns="Clave Q")
+
+    def unir(tablas):
+        if not tablas:
+            return pd.DataFrame()
+        tabla = pd.concat(tablas, ignore_index=True)
+        return tabla[["Clave de Meta"] + [c for c in tabla.columns if c != "Clave de Meta"]]
+
+    return {
+        "Datos Generales": textos,
+        "Metas": pd.DataFrame(metas),
+        "Municipios": unir(municipios),
+        "Cronograma": unir(cronograma),
+        "Cambios Cronograma": cambios_cronograma,
+        "Partidas": unir(partidas),
+        "Partidas Mensual": unir(mensual),
+        "Cumplimiento": unir(cumplimiento),
+    }
+
+
+HOJAS_REPORTE = [
+    "Datos Generales", "Metas", "Municipios", "Cronograma", "Cambios Cronograma", "Partidas", "Partidas Mensual",
+    "Cumplimiento"
+]
+
+
+def _nombres_archivo(dependencias):
+    # Nombre de archivo por dependencia; las siglas que quedan iguales al sanearlas ("A/B" y "A_B", o que
+    # solo difieren en mayúsculas) reciben un sufijo numérico para no sobrescribirse
+    nombres, usados = {}, set()
+    for dependencia in sorted(dependencias, key=str):
+        base = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(dependencia))
+        nombre, n = base, 1
+        while nombre.lower() in usados:
+            n += 1
+            nombre = f"{base}_{n}"
+        usados.add(nombre.lower())
+        nombres[dependencia] = nombre
+    return nombres
+
+
+def _escapar(valor):
+    # Clave Q, dependencia o nombre como texto HTML: pueden venir como número o vacíos
+    return "" if pd.isna(valor) else html.escape(texto_clave(valor))
+
+
+def _html_proyecto(clave_q, nombre, comparacion, modo_texto):
+    partes = [f"<h2 id='{_escapar(clave_q)}'>{_escapar(clave_q)} - {_escapar(nombre)}</h2>"]
+
+    partes.append("<h3>📄 Datos Generales</h3>")
+    for campo, antes, ahora, modificado in comparacion["Datos Generales"].itertuples(index=False):
+        if modificado:
+            antes, ahora = resaltar_diferencias(antes, ahora, modo_texto)
+        else:
+            antes, ahora = html.escape(antes), html.escape(ahora)
+        estado = "🔄 Modificado" if modificado else "✔ Sin cambios"
+        partes.append(
+            f"<p><b>{html.escape(campo)}</b> — {estado}</p>"
+            f"<table class='texto'><tr><td>{antes}</td><td>{ahora}</td></tr></table>"
+        )
+
+    for titulo in HOJAS_REPORTE[1:]:
+        tabla = comparacion[titulo]
+        if tabla.empty:
+            continue
+        partes.append(f"<h3>{titulo}</h3>")
+        partes.append(tabla.to_html(index=False, float_format=lambda x: f"{x:,.2f}", na_rep=""))
+
+    return "\n".join(partes)
+
+
+ESTILO_HTML = """
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-bottom: 1em; font-size: 0.85em; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; vertical-align: top; }
+table.texto td { width: 50%; }
+</style>
+"""
+
+
+def reporte_dependencia(dependencia, nombre_archivo, proyectos, salida, formatos, modo_texto):
+    # Se ejecuta en un proceso trabajador: compara todos los proyectos de una dependencia
+    corte_antes, corte_ahora = _cortes["antes"], _cortes["ahora"]
+
+    comparaciones = {
+        clave_q: comparar_proyecto(corte_antes, corte_ahora, clave_q, _cortes["resumen"], _cortes["cubo"])
+        for clave_q in proyectos.values()
+    }
+
+    if "html" in formatos:
+        secciones = [
+            _html_proyecto(clave_q, etiqueta.split(" - ", 1)[-1], comparaciones[clave_q], modo_texto)
+            for etiqueta, clave_q in proyectos.items()
+        ]
+        with open(os.path.join(salida, f"{nombre_archivo}.html"), "w", encoding="utf-8") as f:
+            f.write(f"<html><head><meta charset='utf-8'><title>{_escapar(dependencia)}</title>{ESTILO_HTML}</head><body>")
+            f.write(f"<h1>Revisión Programación SED — {_escapar(dependencia)}</h1>")
+            f.write("\n".join(secciones))
+            f.write("</body></html>")
+
+    if "xlsx" in formatos:
+        with pd.ExcelWriter(os.path.join(salida, f"{nombre_archivo}.xlsx"), engine="openpyxl") as escritor:
+            for hoja in HOJAS_REPORTE:
+                tablas = [c[hoja].assign(**{"Clave Q": q}) for q, c in comparaciones.items() if not c[hoja].empty]
+                if not tablas:
+                    continue
+                tabla = pd.concat(tablas, ignore_index=True)
+                tabla = tabla[["Clave Q"] + [c for c in tabla.columns if c != "Clave Q"]]
+                tabla.to_excel(escritor, sheet_name=hoja[:31], index=False)
+
+    return dependencia, len(proyectos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los comparativos de todos los proyectos entre dos cortes SED.")
+    parser.add_argument("antes", help="Archivo .xlsx del corte antes")
+    parser.add_argument("ahora", help="Archivo .xlsx del corte ahora")
+    parser.add_argument("--salida", default="reportes", help="Directorio de salida (default: reportes)")
+    parser.add_argument("--formatos", nargs="+", choices=["html", "xlsx"], default=["html", "xlsx"])
+    parser.add_argument("--modo-texto", choices=list(MODOS), default="palabra", help="Nivel de las diferencias de texto")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count(), help="Procesos trabajadores")
+    parser.add_argument("--dependencia", nargs="*", help="Limitar a estas Dep Siglas")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    os.makedirs(args.salida, exist_ok=True)
+
+    # Procesar (o leer de instantánea) ambos cortes una sola vez antes de repartir el trabajo
+    cortes = []
+    for ruta in (args.antes, args.ahora):
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        huella = huella_contenido(contenido)
+        cortes.append(Corte(obtener_corte(contenido, nombre=os.path.basename(ruta), huella=huella), huella=huella))
+    corte_antes, corte_ahora = cortes
+
+    jerarquia = unir_jerarquias(corte_antes.jerarquia, corte_ahora.jerarquia)
+    por_dependencia = {}
+    for deps in jerarquia.values():
+        for dep, proyectos in deps.items():
+            if args.dependencia and dep not in args.dependencia:
+                continue
+            por_dependencia.setdefault(dep, {}).update(proyectos)
+
+    nombres = _nombres_archivo(por_dependencia)
+    print(f"{len(por_dependencia)} dependencias, {sum(map(len, por_dependencia.values()))} proyectos", file=sys.stderr)
+
+    with ProcessPoolExecutor(
+        max_workers=args.procesos,
+        initializer=_iniciar_trabajador,
+        initargs=(((args.antes, corte_antes.huella), (args.ahora, corte_ahora.huella)),),
+    ) as grupo:
+        # Las dependencias más grandes primero para equilibrar la carga entre procesos
+        tareas = [
+            grupo.submit(
+                reporte_dependencia, dep, nombres[dep], dict(sorted(proyectos.items())),
+                args.salida, args.formatos, args.modo_texto
+            )
+            for dep, proyectos in sorted(por_dependencia.items(), key=lambda d: -len(d[1]))
+        ]
+        for tarea in as_completed(tareas):
+            dependencia, total = tarea.result()
+            print(f"  {dependencia}: {total} proyectos", file=sys.stderr)
+
+    if "html" in args.formatos:
+        with open(os.path.join(args.salida, "index.html"), "w", encoding="utf-8") as f:
+            f.write(f"<html><head><meta charset='utf-8'>{ESTILO_HTML}</head><body><h1>Revisión Programación SED</h1><ul>")
+            for dep in sorted(por_dependencia):
+                f.write(f"<li><a href='{nombres[dep]}.html'>{_escapar(dep)}</a> ({len(por_dependencia[dep])})</li>")
+            f.write("</ul></body></html>")
+
+    print(f"Listo en {time.perf_counter() - inicio:,.1f} s -> {args.salida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
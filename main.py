@@ -1,576 +1,951 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import difflib
+
+# plotly.express y openpyxl no se importan aquí: la pantalla de bienvenida no los necesita (ver arranque.py)
+from almacen import (
+    existe_instantanea, huella_contenido, listar_instantaneas, obtener_corte, podar_instantaneas, rango_instantanea
+)
+from arranque import calentar_en_segundo_plano, estadisticas_arranque, registrar_primera_pantalla
+from busqueda import IndiceTexto, buscar
+import catalogo
+from cache_cortes import PRESUPUESTO_MB, CacheCortes, tamano_objeto
+from cache_vistas import PRESUPUESTO_VISTAS_MB, formatear_tabla, recortar_figura, tamano_salida
+from carga import rango_legible
+from carga_paralela import CargaParalela
+from comparacion import (
+    CAMPOS_METAS_TEXTO, CAMPOS_TEXTO, ESTADOS, ComparacionCortes, ResumenMetas, comparar_textos,
+    cronograma_comparado, cronograma_por_fase, cumplimiento_comparado, diferencias_cronograma, tabla_cronograma,
+    texto_llave
+)
+from corte import Corte, construir_jerarquia, unir_jerarquias
+from cubo_partidas import DESGLOSE, NIVELES, CuboPartidas
+from diferencias_texto import MODOS, resaltar_diferencias
+from exportacion import TIPO_XLSX, TODO_EL_CORTE, exportar_a_bytes, nombre_archivo, proyectos_alcance
+from historial import COLUMNAS_MESES, Historial
+from instrumentacion import ACTIVA_POR_ENTORNO, Medidor, contar_cache, estadisticas_cache, registrar_fallo
+from validacion import REGLAS, resumen_hallazgos, validar_corte
 
 st.set_page_config(layout="wide")
 st.title("Revisión Programación SED")
 
 # ========== FUNCIONES UTILITARIAS ==========
 
-@st.cache_data(show_spinner=False)
-def cargar_hoja(archivo, hoja, columnas):
-    df = pd.read_excel(archivo, sheet_name=hoja, header=7)
-    return df[df.columns.intersection(columnas)]
-
-@st.cache_data(show_spinner=False)
-def cargar_cronograma(archivo):
-    columnas = [
-        "Clave Q", "Dep Siglas", "ID Meta", "Clave de Meta", "Clave de Actividad /Hito", "Tipo",
-        "Fase Actividad / Hito", "Descripción", "Fecha de Inicio", "Fecha de Termino",
-        "Monto Actividad / Hito"
+def huella_archivo(archivo):
+    # La huella SHA-256 se calcula una sola vez por archivo subido en la sesión
+    clave = f"huella_{archivo.file_id}"
+    if clave not in st.session_state:
+        st.session_state[clave] = huella_contenido(archivo.getvalue())
+    return st.session_state[clave]
+
+@st.cache_resource(show_spinner=False)
+def abrir_cache_cortes():
+    return CacheCortes(
+        PRESUPUESTO_MB * 1024 ** 2, medir=lambda corte: sum(corte.memoria().values()),
+        compartido=lambda corte: corte.mapeado
+    )
+
+@st.cache_resource(show_spinner=False)
+def abrir_cache_vistas():
+    return CacheCortes(PRESUPUESTO_VISTAS_MB * 1024 ** 2, medir=tamano_salida)
+
+def salida_vista(corte_antes, corte_ahora, clave_q, clave_meta, vista, construir):
+    # Figuras y tablas ya formateadas de una vista; `construir()` solo corre si no están en caché
+    llave = (corte_antes.huella, corte_ahora.huella, clave_q, clave_meta, vista)
+    return abrir_cache_vistas().obtener(llave, construir)
+
+@st.cache_resource(show_spinner=False)
+def abrir_carga_paralela():
+    return CargaParalela()
+
+def cargar_corte(huella, archivo):
+    # Instantánea Parquet por huella SHA-256; el Excel solo se procesa la primera vez
+    # (en segundo plano si ya se inició con `CargaParalela`).
+    # El Corte indexado se comparte entre sesiones (LRU con tope en bytes) y no se copia en cada ejecución.
+    def cargar():
+        hojas = abrir_carga_paralela().terminar(huella)
+        if hojas is None:
+            hojas = obtener_corte(archivo.getvalue(), nombre=archivo.name, huella=huella)
+        return Corte(hojas, huella=huella)
+
+    return abrir_cache_cortes().obtener(huella, cargar)
+
+def cargar_corte_catalogo(huella):
+    # Corte publicado: sus hojas son vistas sobre los archivos Arrow mapeados en memoria, las mismas
+    # páginas para todas las sesiones y procesos; la caché de cortes evita volver a indexarlo
+    return abrir_cache_cortes().obtener(huella, lambda: catalogo.abrir_corte(huella))
+
+@st.cache_data(show_spinner=False, ttl=60)
+def listar_catalogo():
+    # Se publica desde la línea de comandos (`python catalogo.py publicar`); se vuelve a leer cada minuto
+    return catalogo.listar()
+
+def libros_pendientes(archivos):
+    # Libros que no están en memoria ni como instantánea: sus hojas se procesan en paralelo.
+    # Devuelve las huellas con hojas aún sin terminar (las terminadas las recoge `cargar_corte`).
+    # Las cargas que la sesión inició y ya no espera (otro libro, el catálogo) se sueltan; también al
+    # terminar la sesión, cuando Streamlit descarta su estado
+    if not archivos and "sesion_carga" not in st.session_state:
+        return []
+    carga = abrir_carga_paralela()
+    if "sesion_carga" not in st.session_state:
+        st.session_state["sesion_carga"] = carga.sesion()
+    nuevos = [
+        archivo for archivo in archivos
+        if not abrir_cache_cortes().contiene(huella_archivo(archivo)) and not existe_instantanea(huella_archivo(archivo))
     ]
-    df = pd.read_excel(archivo, sheet_name="Sección de Metas-Cronograma", header=7)
-    df = df[df.columns.intersection(columnas)]
-    df["Fecha de Inicio"] = pd.to_datetime(df["Fecha de Inicio"], dayfirst=True, errors='coerce')
-    df["Fecha de Termino"] = pd.to_datetime(df["Fecha de Termino"], dayfirst=True, errors='coerce')
-    return df
-
-@st.cache_data(show_spinner=False)
-def agregar_totales(df):
-    df = df.copy()
-    df["Cantidad Total"] = df.filter(like="Cantidad").sum(axis=1, skipna=True)
-    df["Monto Total"] = df.filter(like="Monto").sum(axis=1, skipna=True)
-    return df
-
-
-# ========== INTERFAZ LATERAL ==========
-
-with st.sidebar:
-    st.title("⚙️ Configuración")
-
-    # --- Zona colapsable para carga de archivos
-    with st.expander("📂 Cargar archivos de Excel", expanded=True):
-        archivo_antes = st.file_uploader("Archivo - Corte Antes", type=["xlsx"], key="archivo_antes")
-        archivo_ahora = st.file_uploader("Archivo - Corte Ahora", type=["xlsx"], key="archivo_ahora")
-
-# ========== CARGA Y FILTRO INICIAL ==========
-
-if archivo_antes and archivo_ahora:
-    with st.spinner("Cargando y procesando archivos..."):
-
-        # --- Cargar hoja 'Datos Generales' para extraer Claves Q disponibles ---
-        columnas_datos = [
-            "Fecha", "Clave Q", "Nombre del Proyecto (Ejercicio Actual)", "Eje", "Dep Siglas",
-            "Diagnóstico", "Objetivo General", "Descripción del Proyecto",
-            "Descripción del Avance Actual", "Alcance Anual"
-        ]
-        datos_ahora = cargar_hoja(archivo_ahora, "Datos Generales", columnas_datos)
-        datos_antes = cargar_hoja(archivo_antes, "Datos Generales", columnas_datos)
-
-        # --- Filtros escalonados ---
-        with st.sidebar:
-            st.markdown("---")
-            st.markdown("### 🔎 Filtrar proyectos")
-
-
-            ejes_disponibles = datos_ahora["Eje"].dropna().unique().tolist()
-            eje_sel = st.selectbox("Eje", [""] + sorted(ejes_disponibles))
-
-            if eje_sel:
-                deps_filtradas = datos_ahora[datos_ahora["Eje"] == eje_sel]["Dep Siglas"].dropna().unique().tolist()
-                dep_sel = st.selectbox("Dependencia", [""] + sorted(deps_filtradas))
-            else:
-                dep_sel = None
-
-            if eje_sel and dep_sel:
-                subset = datos_ahora[
-                    (datos_ahora["Eje"] == eje_sel) & (datos_ahora["Dep Siglas"] == dep_sel)
-                ][["Clave Q", "Nombre del Proyecto (Ejercicio Actual)"]].dropna()
-
-                subset["display"] = subset["Clave Q"] + " - " + subset["Nombre del Proyecto (Ejercicio Actual)"]
-                opciones_q = subset.set_index("display")["Clave Q"].to_dict()
-
-                clave_q_display = st.selectbox("Clave Q", [""] + list(opciones_q.keys()))
-                clave_q = opciones_q.get(clave_q_display)
-            else:
-             clave_q = None
-
-
-        # --- Control de flujo: si no hay Clave Q seleccionada, detener ejecución ---
-        if not clave_q:
-            st.warning("Selecciona una Clave Q específica en el panel lateral para ver los datos comparativos.")
-            st.stop()
-
-        # ========== FILTRAR TODOS LOS DATAFRAMES POR CLAVE Q ANTES DE USARLOS ==========
-
-        datos_ahora = datos_ahora[datos_ahora["Clave Q"] == clave_q]
-        datos_antes = datos_antes[datos_antes["Clave Q"] == clave_q]
-
-        # Cargar y filtrar metas
-        columnas_metas = [
-            "Clave Q", "ID Meta", "Clave de Meta", "Descripción de la Meta", "Unidad de Medida",
-            "ID Mpio", "Municipio", "Registro Presupuestal", "Cantidad Estatal", "Monto Estatal",
-            "Cantidad Federal", "Monto Federal", "Cantidad Municipal", "Monto Municipal",
-            "Cantidad Ingresos Propios", "Monto Ingresos Propios", "Cantidad Otros", "Monto Otros"
-        ]
-        metas_ahora = cargar_hoja(archivo_ahora, "Sección de Metas", columnas_metas)
-        metas_antes = cargar_hoja(archivo_antes, "Sección de Metas", columnas_metas)
-        metas_ahora = agregar_totales(metas_ahora)
-        metas_antes = agregar_totales(metas_antes)
-
-        metas_ahora = metas_ahora[metas_ahora["Clave Q"] == clave_q]
-        metas_antes = metas_antes[metas_antes["Clave Q"] == clave_q]
-
-        # Cronograma
-        metas_crono_ahora = cargar_cronograma(archivo_ahora)
-        metas_crono_antes = cargar_cronograma(archivo_antes)
-
-        metas_crono_ahora = metas_crono_ahora[metas_crono_ahora["Clave Q"] == clave_q]
-        metas_crono_antes = metas_crono_antes[metas_crono_antes["Clave Q"] == clave_q]
-
-        # Partidas
-        columnas_partidas = [
-            "Clave Q", "ID Meta", "Clave de Meta", "Partida", "Monto Anual",
-            "Monto Enero", "Monto Febrero", "Monto Marzo", "Monto Abril", "Monto Mayo",
-            "Monto Junio", "Monto Julio", "Monto Agosto", "Monto Septiembre",
-            "Monto Octubre", "Monto Noviembre", "Monto Diciembre"
-        ]
-        metas_partidas_ahora = cargar_hoja(archivo_ahora, "Sección de Metas-Partidas", columnas_partidas)
-        metas_partidas_antes = cargar_hoja(archivo_antes, "Sección de Metas-Partidas", columnas_partidas)
-
-        metas_partidas_ahora = metas_partidas_ahora[metas_partidas_ahora["Clave Q"] == clave_q]
-        metas_partidas_antes = metas_partidas_antes[metas_partidas_antes["Clave Q"] == clave_q]
-
-        # Cumplimiento (filtrado por Clave de Meta más adelante)
-        columnas_cumplimiento = ["Clave de Meta", "Cantidad"] + [f"Cumplimiento {mes}" for mes in [
-            "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-            "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
-        ]]
-        cumplimiento_ahora = cargar_hoja(archivo_ahora, "Sección de Metas-Cumplimiento", columnas_cumplimiento)
-        cumplimiento_antes = cargar_hoja(archivo_antes, "Sección de Metas-Cumplimiento", columnas_cumplimiento)
-
-        cumplimiento_ahora = cumplimiento_ahora.dropna(subset=["Clave de Meta"])
-        cumplimiento_antes = cumplimiento_antes.dropna(subset=["Clave de Meta"])
-
-# ========== PESTAÑAS PRINCIPALES ==========
-
-    tabs = st.tabs([
-        "📄 Datos Generales",
-        "🎯 Metas",
-    ])
-
-    ################################################ DATOS GENERALES #########################################
-    with tabs[0]:  
-        st.subheader("📄 Datos Generales")
-
-        campos_texto = [
-            "Diagnóstico", "Objetivo General", "Descripción del Proyecto",
-            "Descripción del Avance Actual", "Alcance Anual"
-        ]
-
-        def resaltar_diferencias(texto_antes, texto_ahora):
-            matcher = difflib.SequenceMatcher(None, texto_antes, texto_ahora)
-            res_antes = ""
-            res_ahora = ""
-            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                if tag == "equal":
-                    res_antes += texto_antes[i1:i2]
-                    res_ahora += texto_ahora[j1:j2]
-                elif tag == "replace":
-                    res_antes += f"<del style='color:red'>{texto_antes[i1:i2]}</del>"
-                    res_ahora += f"<span style='background-color:lightgreen'>{texto_ahora[j1:j2]}</span>"
-                elif tag == "delete":
-                    res_antes += f"<del style='color:red'>{texto_antes[i1:i2]}</del>"
-                elif tag == "insert":
-                    res_ahora += f"<span style='background-color:lightgreen'>{texto_ahora[j1:j2]}</span>"
-            return res_antes, res_ahora
-
-        if clave_q == "Todos":
-            st.info("Selecciona una Clave Q específica en el panel lateral para ver los datos comparativos.")
-        else:
-            st.markdown(f"### Clave Q: {clave_q}")
-
-            fila_antes = datos_antes
-            fila_ahora = datos_ahora
-
-            if fila_antes.empty or fila_ahora.empty:
-                st.warning("No se encontró información para esta Clave Q.")
-            else:
-                for campo in campos_texto:
-                    valor_antes = str(fila_antes[campo].values[0])
-                    valor_ahora = str(fila_ahora[campo].values[0])
-
-                    st.markdown(f"**{campo}**")
-                    col1, col2 = st.columns(2)
-
-                    if valor_antes != valor_ahora:
-                        st.info("🔄 Modificado")
-                        antes_html, ahora_html = resaltar_diferencias(valor_antes, valor_ahora)
-                        with col1:
-                            st.markdown("Antes:")
-                            st.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{antes_html}</div>", unsafe_allow_html=True)
-                        with col2:
-                            st.markdown("Ahora:")
-                            st.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{ahora_html}</div>", unsafe_allow_html=True)
-                    else:
-                        st.success("✔ Sin cambios")
-                        with col1:
-                            st.markdown("Antes:")
-                            st.markdown(valor_antes)
-                        with col2:
-                            st.markdown("Ahora:")
-                            st.markdown(valor_ahora)
-
-        ############################## SECCIÓN DE METAS ############################################################
-
-    with tabs[1]:  
-        st.subheader("🎯 Metas")
-
-        # --------- Filtro de Clave de Meta (solo si hay datos y clave_q) ---------
-        if not metas_ahora.empty and clave_q is not None:
-            st.markdown("### Seleccionar Meta")
-
-            metas_disponibles = (
-                metas_ahora[metas_ahora["Clave Q"] == clave_q][["Clave de Meta", "Descripción de la Meta"]]
-                .dropna(subset=["Clave de Meta"])
-                .drop_duplicates()
-                .sort_values("Clave de Meta")
+    carga.iniciar([(huella_archivo(a), a.getvalue(), a.name) for a in nuevos], st.session_state["sesion_carga"])
+    huellas = [huella_archivo(a) for a in nuevos]
+    return [h for h in huellas if carga.progreso([h])[0] < carga.progreso([h])[1]]
+
+def derivado_cortes(nombre, cortes, calcular):
+    # Objeto calculado de uno o dos cortes: vive en la caché de cortes, dentro de su presupuesto en bytes,
+    # y se descarta junto con ellos
+    def cargar():
+        registrar_fallo(nombre)
+        return calcular()
+
+    return abrir_cache_cortes().derivado([corte.huella for corte in cortes], nombre, cargar, medir=tamano_objeto)
+
+@contar_cache("comparar_cortes")
+def comparar_cortes(corte_antes, corte_ahora):
+    # Diferencias fila por fila de todo el portafolio, una vez por par de cortes
+    return derivado_cortes(
+        "comparar_cortes", (corte_antes, corte_ahora), lambda: ComparacionCortes(corte_antes, corte_ahora)
+    )
+
+@contar_cache("resumir_metas")
+def resumir_metas(corte_antes, corte_ahora):
+    # Totales y comparativo por municipio de todas las metas, una vez por par de cortes
+    return derivado_cortes(
+        "resumir_metas", (corte_antes, corte_ahora), lambda: ResumenMetas(corte_antes["metas"], corte_ahora["metas"])
+    )
+
+@contar_cache("cubo_partidas")
+def cubo_partidas(corte_antes, corte_ahora):
+    # Montos por partida y mes de todo el portafolio; cada nivel de agregación sale del mismo cubo
+    return derivado_cortes("cubo_partidas", (corte_antes, corte_ahora), lambda: CuboPartidas(corte_antes, corte_ahora))
+
+@contar_cache("validar")
+def validar(corte):
+    # Hallazgos de consistencia entre hojas, una vez por corte
+    return derivado_cortes("validar", (corte,), lambda: validar_corte(corte))
+
+@contar_cache("exportar_excel")
+@st.cache_data(show_spinner="Generando el archivo de Excel...", max_entries=4)
+def exportar_excel(huella_antes, huella_ahora, alcance, _corte_antes, _corte_ahora, _claves_q):
+    registrar_fallo("exportar_excel")
+    # Libro de comparativos de una dependencia o de todo el corte, con los índices ya en caché
+    resumen = resumir_metas(_corte_antes, _corte_ahora)
+    cubo = cubo_partidas(_corte_antes, _corte_ahora)
+    return exportar_a_bytes(_corte_antes, _corte_ahora, _claves_q, resumen, cubo)
+
+@contar_cache("indice_texto")
+def indice_texto(corte):
+    # Índice de búsqueda de proyectos y metas, una vez por corte
+    return derivado_cortes("indice_texto", (corte,), lambda: IndiceTexto(corte))
+
+@st.cache_resource(show_spinner=False)
+def abrir_historial():
+    return Historial()
+
+@contar_cache("diferencias_campo")
+@st.cache_data(show_spinner=False, max_entries=5000)
+def diferencias_campo(huella_antes, huella_ahora, clave_q, campo, modo, _texto_antes, _texto_ahora):
+    registrar_fallo("diferencias_campo")
+    # Memo por (par de cortes, Clave Q, campo): el texto ya queda fijado por las huellas
+    return resaltar_diferencias(_texto_antes, _texto_ahora, modo)
+
+def cerrar_ejecucion():
+    # Cierra la medición de la ejecución actual y muestra el panel de depuración
+    total_ms, reporte = medidor.finalizar()
+    registrar_primera_pantalla()
+    if reporte:
+        st.session_state["perfil_ejecucion"] = reporte
+    if not medidor.activo:
+        return
+
+    medidor.escribir_log(st.session_state["ejecuciones"], total_ms)
+    with st.sidebar.expander("🛠️ Depuración", expanded=True):
+        st.caption(f"Ejecución #{st.session_state['ejecuciones']} de esta sesión · {total_ms:,.0f} ms")
+        st.dataframe(pd.DataFrame(medidor.etapas), use_container_width=True, hide_index=True)
+        st.caption("Los picos de memoria son de todo el proceso: incluyen las demás sesiones activas.")
+        if medidor.memoria:
+            st.markdown("**Memoria por corte (MB)**")
+            memoria = pd.DataFrame(medidor.memoria)
+            memoria.loc["Total"] = memoria.sum()
+            st.dataframe(memoria, use_container_width=True)
+        if medidor.rango:
+            st.markdown("**Rango leído por hoja**")
+            rango = pd.DataFrame({llave: rango_legible(r) for llave, r in medidor.rango.items()}).T
+            st.dataframe(rango.astype({"Filas fantasma": str}), use_container_width=True)
+        st.markdown("**Caché**")
+        st.dataframe(pd.DataFrame(estadisticas_cache()), use_container_width=True, hide_index=True)
+        st.markdown("**Arranque del proceso**")
+        st.dataframe(pd.DataFrame([estadisticas_arranque()]), use_container_width=True, hide_index=True)
+        st.markdown("**Caché de cortes**")
+        st.dataframe(pd.DataFrame([abrir_cache_cortes().estadisticas()]), use_container_width=True, hide_index=True)
+        st.markdown("**Caché de vistas**")
+        st.dataframe(pd.DataFrame([abrir_cache_vistas().estadisticas()]), use_container_width=True, hide_index=True)
+
+        if st.button("🔬 Perfilar la siguiente ejecución"):
+            st.session_state["perfilar"] = True
+            st.rerun()
+        if "perfil_ejecucion" in st.session_state:
+            st.download_button("⬇️ Descargar perfil", st.session_state["perfil_ejecucion"], file_name="perfil.txt")
+            st.code(st.session_state["perfil_ejecucion"][:20000], language=None)
+
+def detener():
+    cerrar_ejecucion()
+    st.stop()
+
+
+# ========== VISTAS ==========
+# Cada vista es un fragmento: sus widgets solo vuelven a ejecutar la vista, no todo el script
+
+VERSIONES_COLORES = {"Antes": "steelblue", "Ahora": "seagreen"}
+
+MODOS_GANTT = ["Completo", "Solo cambios", "Por fase"]
+LIMITE_GANTT_COMPLETO = 80
+
+
+@st.fragment
+def vista_datos_generales(corte_antes, corte_ahora, clave_q, modo_texto):
+    st.subheader("📄 Datos Generales")
+    st.markdown(f"### Clave Q: {clave_q}")
+
+    fila_antes = corte_antes.filas("datos", clave_q)
+    fila_ahora = corte_ahora.filas("datos", clave_q)
+
+    if fila_antes.empty or fila_ahora.empty:
+        st.warning("No se encontró información para esta Clave Q.")
+        return
+
+    for campo, valor_antes, valor_ahora, modificado in comparar_textos(fila_antes, fila_ahora, CAMPOS_TEXTO):
+
+        st.markdown(f"**{campo}**")
+        col1, col2 = st.columns(2)
+
+        if modificado:
+            st.info("🔄 Modificado")
+            antes_html, ahora_html = diferencias_campo(
+                corte_antes.huella, corte_ahora.huella, clave_q, campo, modo_texto, valor_antes, valor_ahora
             )
-
-            metas_disponibles["Etiqueta"] = metas_disponibles["Clave de Meta"] + " - " + metas_disponibles["Descripción de la Meta"]
-
-            clave_meta_filtro = st.selectbox(
-                "Selecciona una Clave de Meta",
-                [""] + metas_disponibles["Etiqueta"].tolist(),
-                key="filtro_meta"
-            )
-
-            clave_meta_filtro_valor = clave_meta_filtro.split(" - ")[0] if clave_meta_filtro else None
-
+            with col1:
+                st.markdown("Antes:")
+                st.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{antes_html}</div>", unsafe_allow_html=True)
+            with col2:
+                st.markdown("Ahora:")
+                st.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{ahora_html}</div>", unsafe_allow_html=True)
         else:
-            clave_meta_filtro_valor = None
-
-        ############ Subpestañas específicas
-        subtabs = st.tabs([
-            "📋 Información de la Meta",
-            "📆 Cronograma",
-            "💰 Partidas",
-            "✅ Cumplimiento"
-        ])
-
-        with subtabs[0]:
-            st.write("📋 Información de la Meta")
-        
-            def resaltar_diferencias(texto_antes, texto_ahora):
-                matcher = difflib.SequenceMatcher(None, texto_antes, texto_ahora)
-                res_antes = ""
-                res_ahora = ""
-                for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                    if tag == "equal":
-                        res_antes += texto_antes[i1:i2]
-                        res_ahora += texto_ahora[j1:j2]
-                    elif tag == "replace":
-                        res_antes += f"<del style='color:red'>{texto_antes[i1:i2]}</del>"
-                        res_ahora += f"<span style='background-color:lightgreen'>{texto_ahora[j1:j2]}</span>"
-                    elif tag == "delete":
-                        res_antes += f"<del style='color:red'>{texto_antes[i1:i2]}</del>"
-                    elif tag == "insert":
-                        res_ahora += f"<span style='background-color:lightgreen'>{texto_ahora[j1:j2]}</span>"
-                return res_antes, res_ahora
-
-
-            if metas_ahora.empty:
-                st.info("No hay datos disponibles para esta Clave Q.")
-            else:
-                campos_metas_texto = ["Descripción de la Meta", "Unidad de Medida"]
-
-                claves_meta_unicas = metas_ahora["Clave de Meta"].dropna().unique()
-
-                for clave_meta in claves_meta_unicas:
-            
-
-                    if clave_meta_filtro_valor and clave_meta != clave_meta_filtro_valor:
-                        continue  # 👉 Omitir si no coincide con filtro
-
-                    st.markdown(f"#### Meta: {clave_meta}")
-
-                    df_ahora_meta = metas_ahora[metas_ahora["Clave de Meta"] == clave_meta]
-                    df_antes_meta = metas_antes[metas_antes["Clave de Meta"] == clave_meta]
-
-                    fila_ahora = df_ahora_meta.head(1)
-                    fila_antes = df_antes_meta.head(1)
-
-                    col1, col2 = st.columns(2)
-
-                    # Comparativos cualitativos
-                    for campo in campos_metas_texto:
-                        valor_ahora = str(fila_ahora[campo].values[0]) if not fila_ahora.empty else ""
-                        valor_antes = str(fila_antes[campo].values[0]) if not fila_antes.empty else ""
-
-                        if campo == "Descripción de la Meta":
-                            antes_html, ahora_html = resaltar_diferencias(valor_antes, valor_ahora)
-
-                            col1.markdown(f"**{campo} (Antes)**")
-                            col1.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{antes_html}</div>", unsafe_allow_html=True)
-
-                            col2.markdown(f"**{campo} (Ahora)**")
-                            col2.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{ahora_html}</div>", unsafe_allow_html=True)
-                        else:
-                            col1.markdown(f"**{campo} (Antes)**")
-                            col1.markdown(valor_antes)
-                            col2.markdown(f"**{campo} (Ahora)**")
-                            col2.markdown(valor_ahora)
-
-                    # ---------- Métricas generales ----------
-                    total_antes_cantidad = df_antes_meta["Cantidad Total"].sum()
-                    total_ahora_cantidad = df_ahora_meta["Cantidad Total"].sum()
-                    total_antes_monto = df_antes_meta["Monto Total"].sum()
-                    total_ahora_monto = df_ahora_meta["Monto Total"].sum()
-
-                    diferencia_cantidad = total_ahora_cantidad - total_antes_cantidad
-                    diferencia_monto = total_ahora_monto - total_antes_monto
-
-                    color_cantidad = "green" if diferencia_cantidad > 0 else "red" if diferencia_cantidad < 0 else "black"
-                    color_monto = "green" if diferencia_monto > 0 else "red" if diferencia_monto < 0 else "black"
-
-                    col_total1, col_total2 = st.columns(2)
-                    col_total1.metric("Cantidad Total (Ahora)", f"{total_ahora_cantidad:,.2f}")
-                    col_total1.markdown(f"<span style='color:{color_cantidad}'>Diferencia: {diferencia_cantidad:,.2f}</span>", unsafe_allow_html=True)
-
-                    col_total2.metric("Monto Total (Ahora)", f"${total_ahora_monto:,.2f}")
-                    col_total2.markdown(f"<span style='color:{color_monto}'>Diferencia: ${diferencia_monto:,.2f}</span>", unsafe_allow_html=True)
-
-                    # ---------- Comparativo por Municipio ----------
-                    st.markdown("##### Comparativo por Municipio")
-
-                    resumen_antes = df_antes_meta.groupby("Municipio")[["Cantidad Total", "Monto Total"]].sum().reset_index()
-                    resumen_ahora = df_ahora_meta.groupby("Municipio")[["Cantidad Total", "Monto Total"]].sum().reset_index()
-
-                    resumen_antes = resumen_antes.rename(columns={
-                        "Cantidad Total": "Cantidad Total (Antes)",
-                        "Monto Total": "Monto Total (Antes)"
-                    })
-                    resumen_ahora = resumen_ahora.rename(columns={
-                        "Cantidad Total": "Cantidad Total (Ahora)",
-                        "Monto Total": "Monto Total (Ahora)"
-                    })
-
-                    resumen_comparativo = pd.merge(resumen_antes, resumen_ahora, on="Municipio", how="outer").fillna(0)
-                    resumen_comparativo = resumen_comparativo[[
-                        "Municipio",
-                        "Cantidad Total (Antes)", "Cantidad Total (Ahora)",
-                        "Monto Total (Antes)", "Monto Total (Ahora)"
-                    ]]
-
-                    for col in ["Monto Total (Antes)", "Monto Total (Ahora)"]:
-                        resumen_comparativo[col] = resumen_comparativo[col].apply(lambda x: f"${x:,.2f}")
-
-                    st.dataframe(resumen_comparativo, use_container_width=True)
-
-
-############################## SECCIÓN DE CRONOGRAMA ############################################################
+            st.success("✔ Sin cambios")
+            with col1:
+                st.markdown("Antes:")
+                st.markdown(valor_antes)
+            with col2:
+                st.markdown("Ahora:")
+                st.markdown(valor_ahora)
+
+
+@st.fragment
+def vista_metas(corte_antes, corte_ahora, clave_q, modo_texto):
+    st.subheader("🎯 Metas")
+
+    metas_ahora = corte_ahora.filas("metas", clave_q)
+
+    # --------- Filtro de Clave de Meta (solo si hay datos) ---------
+    if not metas_ahora.empty:
+        st.markdown("### Seleccionar Meta")
+
+        metas_disponibles = (
+            metas_ahora[["Clave de Meta", "Descripción de la Meta"]]
+            .dropna(subset=["Clave de Meta"])
+            .drop_duplicates()
+            .sort_values("Clave de Meta")
+        )
+
+        metas_disponibles["Etiqueta"] = (
+            metas_disponibles["Clave de Meta"].astype(str) + " - " + metas_disponibles["Descripción de la Meta"].astype(str)
+        )
+
+        clave_meta_filtro = st.selectbox(
+            "Selecciona una Clave de Meta",
+            [""] + metas_disponibles["Etiqueta"].tolist(),
+            key="filtro_meta"
+        )
+
+        clave_meta_filtro_valor = clave_meta_filtro.split(" - ")[0] if clave_meta_filtro else None
+
+    else:
+        clave_meta_filtro_valor = None
+
+    ############ Subsecciones: solo se calcula la que está abierta; cada una es su propio fragmento, así que
+    # cambiar el modo del Gantt o el nivel de partidas solo vuelve a ejecutar esa subsección
+    subvista = st.radio(
+        "Subsección de Metas",
+        ["📋 Información de la Meta", "📆 Cronograma", "💰 Partidas", "✅ Cumplimiento"],
+        horizontal=True, label_visibility="collapsed", key="subvista_metas"
+    )
+
+    if subvista == "📋 Información de la Meta":
+        vista_info_meta(corte_antes, corte_ahora, clave_q, clave_meta_filtro_valor, modo_texto)
+    elif not clave_meta_filtro_valor:
+        st.info("Selecciona una Clave de Meta para ver las secciones de Cronograma, Partidas y Cumplimiento")
+    elif subvista == "📆 Cronograma":
+        vista_cronograma(corte_antes, corte_ahora, clave_q, clave_meta_filtro_valor)
+    elif subvista == "💰 Partidas":
+        vista_partidas(corte_antes, corte_ahora, clave_q, clave_meta_filtro_valor)
+    else:
+        vista_cumplimiento(corte_antes, corte_ahora, clave_q, clave_meta_filtro_valor)
+
+
+@st.fragment
+def vista_info_meta(corte_antes, corte_ahora, clave_q, clave_meta_filtro_valor, modo_texto):
+    st.write("📋 Información de la Meta")
+
+    metas_ahora = corte_ahora.filas("metas", clave_q)
+    if metas_ahora.empty:
+        st.info("No hay datos disponibles para esta Clave Q.")
+        return
 
     if clave_meta_filtro_valor:
-        with subtabs[1]:
-            st.write("📆 Cronograma")
-       
-            clave_meta_seleccionada = clave_meta_filtro_valor
+        claves_meta_unicas = [clave_meta_filtro_valor]
+    else:
+        claves_meta_unicas = metas_ahora["Clave de Meta"].dropna().unique()
 
-            df_crono_ahora_qm = metas_crono_ahora[metas_crono_ahora["Clave de Meta"] == clave_meta_seleccionada]
-            df_crono_antes_qm = metas_crono_antes[metas_crono_antes["Clave de Meta"] == clave_meta_seleccionada]
+    resumen = resumir_metas(corte_antes, corte_ahora)
 
-            if df_crono_ahora_qm.empty and df_crono_antes_qm.empty:
-                st.info("No se encontraron actividades o hitos para esta meta en ninguna de las versiones.")
-            else:
-                # Marcar versión
-                df_crono_ahora_qm = df_crono_ahora_qm.copy()
-                df_crono_ahora_qm["Versión"] = "Ahora"
+    for clave_meta in claves_meta_unicas:
 
-                df_crono_antes_qm = df_crono_antes_qm.copy()
-                df_crono_antes_qm["Versión"] = "Antes"
+        st.markdown(f"#### Meta: {clave_meta}")
 
-                df_crono_comparado = pd.concat([df_crono_antes_qm, df_crono_ahora_qm], ignore_index=True)
+        df_ahora_meta = corte_ahora.filas("metas", clave_q, clave_meta)
+        df_antes_meta = corte_antes.filas("metas", clave_q, clave_meta)
 
-                # Convertir clave numérica
-                df_crono_comparado["Clave Num"] = pd.to_numeric(
-                    df_crono_comparado["Clave de Actividad /Hito"], errors="coerce"
-                )
-
-                df_crono_comparado["Actividad"] = (
-                    df_crono_comparado["Clave de Actividad /Hito"].astype(str) +
-                    " - " + df_crono_comparado["Descripción"].astype(str) +
-                    " (" + df_crono_comparado["Versión"] + ")"
-                )
+        col1, col2 = st.columns(2)
 
-                orden_y = df_crono_comparado.sort_values("Clave Num")["Actividad"].tolist()
+        # Comparativos cualitativos
+        comparados = comparar_textos(df_antes_meta.head(1), df_ahora_meta.head(1), CAMPOS_METAS_TEXTO)
+        for campo, valor_antes, valor_ahora, _ in comparados:
 
-                # Ajustar fechas iguales (inicio = término)
-                mismo_dia = (
-                    df_crono_comparado["Fecha de Inicio"] == df_crono_comparado["Fecha de Termino"]
+            if campo == "Descripción de la Meta":
+                antes_html, ahora_html = diferencias_campo(
+                    corte_antes.huella, corte_ahora.huella, clave_q, f"{clave_meta} · {campo}",
+                    modo_texto, valor_antes, valor_ahora
                 )
-                df_crono_comparado.loc[mismo_dia, "Fecha de Termino"] += pd.Timedelta(days=1)
-
-                # Gantt
-                fig = px.timeline(
-                    df_crono_comparado,
-                    x_start="Fecha de Inicio",
-                    x_end="Fecha de Termino",
-                    y="Actividad",
-                    color="Versión",
-                    color_discrete_map={"Antes": "steelblue", "Ahora": "seagreen"},
-                    title=f"Cronograma de Actividades / Hitos - Meta {clave_meta_seleccionada}"
-                )
-
-                fig.update_yaxes(categoryorder="array", categoryarray=orden_y)
-                fig.update_yaxes(autorange="reversed")
-                fig.update_layout(height=600)
-
-                st.plotly_chart(fig, use_container_width=True)
 
-                # Tabla de detalle (solo versión actual)
-                st.markdown("##### Detalle de Actividades / Hitos (Versión Actual)")
+                col1.markdown(f"**{campo} (Antes)**")
+                col1.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{antes_html}</div>", unsafe_allow_html=True)
 
-                columnas_tabla = [
-                    "Clave de Actividad /Hito", "Fase Actividad / Hito", "Descripción",
-                    "Fecha de Inicio", "Fecha de Termino", "Monto Actividad / Hito"
-                ]
+                col2.markdown(f"**{campo} (Ahora)**")
+                col2.markdown(f"<div style='border:1px solid #ccc;padding:8px'>{ahora_html}</div>", unsafe_allow_html=True)
+            else:
+                col1.markdown(f"**{campo} (Antes)**")
+                col1.markdown(valor_antes)
+                col2.markdown(f"**{campo} (Ahora)**")
+                col2.markdown(valor_ahora)
+
+        # ---------- Métricas generales ----------
+        totales = resumen.totales(clave_q, clave_meta)
+        diferencia_cantidad = totales["Diferencia Cantidad"]
+        diferencia_monto = totales["Diferencia Monto"]
+
+        color_cantidad = "green" if diferencia_cantidad > 0 else "red" if diferencia_cantidad < 0 else "black"
+        color_monto = "green" if diferencia_monto > 0 else "red" if diferencia_monto < 0 else "black"
+
+        col_total1, col_total2 = st.columns(2)
+        col_total1.metric("Cantidad Total (Ahora)", f"{totales['Cantidad Total (Ahora)']:,.2f}")
+        col_total1.markdown(f"<span style='color:{color_cantidad}'>Diferencia: {diferencia_cantidad:,.2f}</span>", unsafe_allow_html=True)
+
+        col_total2.metric("Monto Total (Ahora)", f"${totales['Monto Total (Ahora)']:,.2f}")
+        col_total2.markdown(f"<span style='color:{color_monto}'>Diferencia: ${diferencia_monto:,.2f}</span>", unsafe_allow_html=True)
+
+        # ---------- Comparativo por Municipio ----------
+        st.markdown("##### Comparativo por Municipio")
+
+        resumen_comparativo = resumen.municipios(clave_q, clave_meta, formato=True)
+        st.dataframe(resumen_comparativo, use_container_width=True)
+
+
+@st.fragment
+def vista_cronograma(corte_antes, corte_ahora, clave_q, clave_meta_seleccionada):
+    st.write("📆 Cronograma")
+
+    def filas():
+        return (
+            corte_antes.filas("cronograma", clave_q, clave_meta_seleccionada),
+            corte_ahora.filas("cronograma", clave_q, clave_meta_seleccionada),
+        )
+
+    def construir_tablas():
+        df_crono_antes_qm, df_crono_ahora_qm = filas()
+        if df_crono_ahora_qm.empty and df_crono_antes_qm.empty:
+            return None
+
+        # Actividades emparejadas por Clave de Actividad /Hito
+        cambios = diferencias_cronograma(df_crono_antes_qm, df_crono_ahora_qm)
+        conteo = cambios["Estado"].value_counts()
+        cambiadas = cambios[cambios["Estado"] != "Sin cambios"]
+        return {
+            "conteo": " · ".join(f"{estado}: {conteo.get(estado, 0)}" for estado in ESTADOS),
+            "actividades": len(cambios),
+            "claves_cambiadas": cambiadas["Clave de Actividad /Hito"].tolist(),
+            "cambios": formatear_tabla(
+                cambiadas.drop(columns=["Clave Q", "Clave de Meta"]),
+                monedas=["Monto (Antes)", "Monto (Ahora)", "Diferencia Monto"],
+                fechas=["Inicio (Antes)", "Inicio (Ahora)", "Término (Antes)", "Término (Ahora)"],
+            ),
+            # Detalle de la versión actual
+            "actual": formatear_tabla(
+                tabla_cronograma(df_crono_ahora_qm),
+                monedas=["Monto Actividad / Hito"], fechas=["Fecha de Inicio", "Fecha de Termino"],
+            ),
+        }
+
+    tablas = salida_vista(corte_antes, corte_ahora, clave_q, clave_meta_seleccionada, "cronograma", construir_tablas)
+    if tablas is None:
+        st.info("No se encontraron actividades o hitos para esta meta en ninguna de las versiones.")
+        return
+
+    st.caption(tablas["conteo"])
+
+    # Gantt: con muchas actividades se abre en modo compacto
+    modo_gantt = st.radio(
+        "Gantt", MODOS_GANTT, horizontal=True, key="modo_gantt",
+        index=0 if tablas["actividades"] <= LIMITE_GANTT_COMPLETO else 1
+    )
+
+    def construir_gantt():
+        import plotly.express as px
+
+        df_crono_antes_qm, df_crono_ahora_qm = filas()
+        if modo_gantt == "Por fase":
+            df_crono_comparado, orden_y = cronograma_por_fase(df_crono_antes_qm, df_crono_ahora_qm)
+            eje_y = "Fase"
+        elif modo_gantt == "Solo cambios":
+            claves = tablas["claves_cambiadas"]
+            df_crono_comparado, orden_y = cronograma_comparado(
+                df_crono_antes_qm[texto_llave(df_crono_antes_qm["Clave de Actividad /Hito"]).isin(claves)],
+                df_crono_ahora_qm[texto_llave(df_crono_ahora_qm["Clave de Actividad /Hito"]).isin(claves)],
+            )
+            eje_y = "Actividad"
+        else:
+            df_crono_comparado, orden_y = cronograma_comparado(df_crono_antes_qm, df_crono_ahora_qm)
+            eje_y = "Actividad"
+
+        if df_crono_comparado.empty:
+            return None
+
+        fig = px.timeline(
+            df_crono_comparado,
+            x_start="Fecha de Inicio",
+            x_end="Fecha de Termino",
+            y=eje_y,
+            color="Versión",
+            color_discrete_map=VERSIONES_COLORES,
+            title=f"Cronograma de Actividades / Hitos - Meta {clave_meta_seleccionada}"
+        )
+
+        fig.update_yaxes(categoryorder="array", categoryarray=orden_y)
+        fig.update_yaxes(autorange="reversed")
+        fig.update_layout(height=600)
+        return recortar_figura(fig)
+
+    fig = salida_vista(
+        corte_antes, corte_ahora, clave_q, clave_meta_seleccionada, ("gantt", modo_gantt), construir_gantt
+    )
+    if fig is None:
+        st.success("✔ Ninguna actividad cambió entre los cortes.")
+    else:
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Cambios por actividad
+    if not tablas["cambios"].empty:
+        st.markdown("##### Cambios por Actividad / Hito")
+        st.dataframe(tablas["cambios"], use_container_width=True, hide_index=True)
+
+    # Tabla de detalle (solo versión actual)
+    st.markdown("##### Detalle de Actividades / Hitos (Versión Actual)")
+    st.dataframe(tablas["actual"], use_container_width=True)
+
+
+@st.fragment
+def vista_partidas(corte_antes, corte_ahora, clave_q, clave_meta):
+    st.write("💰 Partidas")
+
+    cubo = cubo_partidas(corte_antes, corte_ahora)
+
+    # Nivel de agregación: la meta seleccionada o el proyecto, dependencia o eje al que pertenece
+    nivel = st.radio("Nivel", NIVELES, horizontal=True, key="nivel_partidas")
+    ubicacion = cubo.ubicacion(clave_q)
+    valor = (clave_q, clave_meta) if nivel == "Meta" else ubicacion[nivel]
+    titulo = f"Meta {clave_meta}" if nivel == "Meta" else f"{nivel} {valor}"
+    montos = ["Monto Anual (Antes)", "Monto Anual (Ahora)", "Diferencia"]
+
+    def construir():
+        import plotly.express as px
+
+        # --- Distribución mensual ---
+        fig = px.bar(
+            cubo.mensual(nivel, valor),
+            x="Mes",
+            y=["Antes", "Ahora"],
+            barmode="group",
+            title=f"Distribución Mensual de Montos - {titulo}",
+            labels={"value": "Monto", "variable": "Versión"},
+            color_discrete_map=VERSIONES_COLORES
+        )
+        fig.update_layout(height=500)
+
+        return {
+            # Comparativo de montos anuales por partida, con formato de moneda
+            "comparativo": formatear_tabla(cubo.por_partida(nivel, valor), monedas=montos),
+            "figura": recortar_figura(fig),
+            "desglose": formatear_tabla(cubo.desglose(nivel, valor), monedas=montos) if nivel in DESGLOSE else None,
+        }
+
+    # Arriba del nivel Meta la salida no depende de la meta elegida: se comparte entre las metas del proyecto
+    salida = salida_vista(
+        corte_antes, corte_ahora, clave_q, clave_meta if nivel == "Meta" else None, ("partidas", nivel), construir
+    )
+
+    st.markdown("##### Comparativo de Montos por Partida")
+    st.dataframe(salida["comparativo"], use_container_width=True)
+
+    st.plotly_chart(salida["figura"], use_container_width=True)
+
+    # --- Desglose al nivel inferior ---
+    if salida["desglose"] is not None:
+        st.markdown(f"##### Desglose por {DESGLOSE[nivel]} - {titulo}")
+        st.dataframe(salida["desglose"], use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def vista_cumplimiento(corte_antes, corte_ahora, clave_q, clave_meta):
+    st.write("✅ Cumplimiento Programado")
+
+    def construir():
+        import plotly.express as px
+
+        df_cump_ahora = corte_ahora.filas("cumplimiento", clave_meta=clave_meta)
+        df_cump_antes = corte_antes.filas("cumplimiento", clave_meta=clave_meta)
+
+        # Cantidad programada y serie mensual de ambas versiones
+        cantidad_antes, cantidad_ahora, df_cumplimiento = cumplimiento_comparado(df_cump_antes, df_cump_ahora)
+
+        # Gráfico de cumplimiento mensual
+        fig_cump = px.bar(
+            df_cumplimiento,
+            x="Mes",
+            y="Valor",
+            color="Versión",
+            barmode="group",
+            color_discrete_map=VERSIONES_COLORES,
+            title=f"Cumplimiento Programado por Mes - Meta {clave_meta}"
+        )
+        fig_cump.update_layout(xaxis_tickangle=-45, height=400)
+        return {"cantidad_antes": cantidad_antes, "cantidad_ahora": cantidad_ahora, "figura": recortar_figura(fig_cump)}
+
+    salida = salida_vista(corte_antes, corte_ahora, clave_q, clave_meta, "cumplimiento", construir)
+
+    # Mostrar métricas
+    col1, col2 = st.columns(2)
+    with col1:
+        cantidad_ahora = salida["cantidad_ahora"]
+        st.metric("Cantidad Programada (Ahora)", f"{cantidad_ahora:.2f}" if cantidad_ahora is not None else "—")
+    with col2:
+        cantidad_antes = salida["cantidad_antes"]
+        st.metric("Cantidad Programada (Antes)", f"{cantidad_antes:.2f}" if cantidad_antes is not None else "—")
+
+    st.plotly_chart(salida["figura"], use_container_width=True)
+
+
+@st.fragment
+def vista_tendencias(historial, clave_q):
+    import plotly.express as px
+
+    st.subheader("📈 Tendencias entre cortes")
+
+    serie_proyecto = historial.serie_proyecto(clave_q)
+
+    if serie_proyecto.empty:
+        st.info("No hay cortes en el historial para esta Clave Q.")
+        return
+
+    st.caption(f"{len(serie_proyecto)} cortes con información de la Clave Q {clave_q}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.line(serie_proyecto, x="Fecha Corte", y="Monto Total", markers=True,
+                      title=f"Monto Total - {clave_q}")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = px.line(serie_proyecto, x="Fecha Corte", y="Cantidad Total", markers=True,
+                      title=f"Cantidad Total - {clave_q}")
+        st.plotly_chart(fig, use_container_width=True)
+
+    # --- Por meta (la meta elegida en la sección de Metas, si hay una) ---
+    clave_meta = (st.session_state.get("filtro_meta") or "").split(" - ")[0] or None
+    serie_metas = historial.serie_metas(clave_q)
+    if clave_meta:
+        serie_metas = serie_metas[serie_metas["Clave de Meta"] == clave_meta]
+
+    fig = px.line(serie_metas, x="Fecha Corte", y="Monto Total", color="Clave de Meta", markers=True,
+                  title="Monto Total por Meta")
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- Partidas: distribución mensual en cada corte ---
+    serie_partidas = historial.serie_partidas(clave_q, clave_meta)
+    if serie_partidas.empty:
+        return
+
+    mensual = (
+        serie_partidas.groupby("Fecha Corte")[COLUMNAS_MESES].sum()
+        .rename(columns=lambda c: c.replace("Monto ", ""))
+        .reset_index()
+        .melt(id_vars="Fecha Corte", var_name="Mes", value_name="Monto")
+    )
+    mensual["Corte"] = mensual["Fecha Corte"].dt.strftime("%d/%m/%Y")
 
-                tabla_actual = df_crono_ahora_qm[columnas_tabla].sort_values("Clave de Actividad /Hito").copy()
+    fig = px.line(mensual, x="Mes", y="Monto", color="Corte", markers=True,
+                  title=f"Distribución Mensual de Partidas - {clave_meta or clave_q}")
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("##### Monto Anual por Partida en cada corte")
+    anual = serie_partidas.pivot_table(
+        index="Partida", columns="Fecha Corte", values="Monto Anual", aggfunc="sum", fill_value=0
+    )
+    anual.columns = anual.columns.strftime("%d/%m/%Y")
+    st.dataframe(anual, use_container_width=True)
 
-                tabla_actual["Monto Actividad / Hito"] = tabla_actual["Monto Actividad / Hito"].apply(
-                    lambda x: f"${x:,.2f}" if pd.notna(x) else ""
-                )
-                tabla_actual["Fecha de Inicio"] = tabla_actual["Fecha de Inicio"].dt.strftime("%d/%m/%Y")
-                tabla_actual["Fecha de Termino"] = tabla_actual["Fecha de Termino"].dt.strftime("%d/%m/%Y")
 
-                st.dataframe(tabla_actual, use_container_width=True)
-    else: "Selecciona una Clave de Meta para ver las secciones de Cronograma, Partidas y Cumplimiento"           
+@st.fragment
+def vista_validacion(corte_antes, corte_ahora, clave_q):
+    st.subheader("🔍 Validación entre hojas")
+
+    version = st.radio("Corte", ["Ahora", "Antes"], horizontal=True, key="validacion_corte")
+    corte = corte_ahora if version == "Ahora" else corte_antes
+    hallazgos = validar(corte)
+
+    resumen = resumen_hallazgos(hallazgos)
+    st.dataframe(resumen, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    solo_proyecto = col1.toggle(f"Solo la Clave Q {clave_q}", value=True, key="validacion_solo_proyecto")
+    reglas = col2.multiselect("Reglas", REGLAS, default=REGLAS, key="validacion_reglas")
+
+    filtro = hallazgos["Regla"].isin(reglas)
+    if solo_proyecto:
+        filtro &= hallazgos["Clave Q"] == clave_q
+    seleccion = hallazgos[filtro]
+
+    if seleccion.empty:
+        st.success("✔ Sin hallazgos con los filtros actuales.")
+        return
 
+    st.caption(f"{len(seleccion):,} hallazgos")
+    st.dataframe(seleccion, use_container_width=True, hide_index=True, column_config={
+        col: st.column_config.NumberColumn(format="%.2f") for col in ["Esperado", "Obtenido", "Diferencia"]
+    })
 
-        ############################## SECCIÓN DE METAS-PARTIDAS ############################################################
 
-    if clave_meta_filtro_valor:
-        with subtabs[2]:
-            st.write("💰 Partidas")
+# ========== INTERFAZ LATERAL ==========
 
-            clave_meta = clave_meta_filtro_valor
+st.session_state["ejecuciones"] = st.session_state.get("ejecuciones", 0) + 1
 
-            df_partidas_ahora_qm = metas_partidas_ahora[metas_partidas_ahora["Clave de Meta"] == clave_meta]
-            df_partidas_antes_qm = metas_partidas_antes[metas_partidas_antes["Clave de Meta"] == clave_meta]
+with st.sidebar:
+    st.title("⚙️ Configuración")
 
-            # --- Comparativo de montos anuales por partida ---
-            resumen_ahora = (
-                df_partidas_ahora_qm.groupby("Partida")["Monto Anual"].sum().reset_index()
-                .rename(columns={"Monto Anual": "Monto Anual (Ahora)"})
-            )
-            resumen_antes = (
-                df_partidas_antes_qm.groupby("Partida")["Monto Anual"].sum().reset_index()
-                .rename(columns={"Monto Anual": "Monto Anual (Antes)"})
-            )
+    depuracion = st.toggle("🛠️ Depuración", value=ACTIVA_POR_ENTORNO, key="depuracion")
+    medidor = Medidor(activo=depuracion, perfilar=st.session_state.pop("perfilar", False))
+    medidor.etapa("interfaz_lateral")
 
-            df_comparativo = pd.merge(resumen_antes, resumen_ahora, on="Partida", how="outer").fillna(0)
-            df_comparativo["Diferencia"] = (
-                df_comparativo["Monto Anual (Ahora)"] - df_comparativo["Monto Anual (Antes)"]
+    # --- Zona colapsable para carga de archivos
+    # Los cortes publicados en el catálogo se eligen sin subir nada; subir archivos sigue disponible
+    with st.expander("📂 Cargar archivos de Excel", expanded=True):
+        publicados = listar_catalogo()
+        origen = "⬆️ Subir archivos"
+        if not publicados.empty:
+            origen = st.radio(
+                "Origen de los cortes", ["📚 Catálogo", "⬆️ Subir archivos"], horizontal=True, key="origen_cortes"
             )
 
-            # Formato de moneda
-            for col in ["Monto Anual (Antes)", "Monto Anual (Ahora)", "Diferencia"]:
-                df_comparativo[col] = df_comparativo[col].apply(lambda x: f"${x:,.2f}")
-
-            st.markdown("##### Comparativo de Montos por Partida")
-            st.dataframe(df_comparativo, use_container_width=True)
-
-            # --- Distribución mensual por meta ---
-            meses = [
-                "Monto Enero", "Monto Febrero", "Monto Marzo", "Monto Abril", "Monto Mayo",
-                "Monto Junio", "Monto Julio", "Monto Agosto", "Monto Septiembre",
-                "Monto Octubre", "Monto Noviembre", "Monto Diciembre"
-            ]
-
-            # Sumar por mes
-            sum_mensual_ahora = df_partidas_ahora_qm[meses].sum()
-            sum_mensual_antes = df_partidas_antes_qm[meses].sum()
-
-            df_mensual = pd.DataFrame({
-                "Mes": [mes.replace("Monto ", "") for mes in meses],
-                "Antes": sum_mensual_antes.values,
-                "Ahora": sum_mensual_ahora.values
-            })
-
-            fig = px.bar(
-                df_mensual,
-                x="Mes",
-                y=["Antes", "Ahora"],
-                barmode="group",
-                title=f"Distribución Mensual de Montos - Meta {clave_meta}",
-                labels={"value": "Monto", "variable": "Versión"},
-                color_discrete_map={"Antes": "steelblue", "Ahora": "seagreen"}
+        archivo_antes = archivo_ahora = seleccion_antes = seleccion_ahora = None
+        if origen == "📚 Catálogo":
+            etiquetas = dict(zip(publicados["Huella"], publicados["Corte"]))
+            huellas = list(etiquetas)
+            seleccion_antes = st.selectbox(
+                "Corte Antes", huellas, index=min(1, len(huellas) - 1), format_func=etiquetas.get, key="catalogo_antes"
             )
+            seleccion_ahora = st.selectbox("Corte Ahora", huellas, index=0, format_func=etiquetas.get, key="catalogo_ahora")
+        else:
+            archivo_antes = st.file_uploader("Archivo - Corte Antes", type=["xlsx"], key="archivo_antes")
+            archivo_ahora = st.file_uploader("Archivo - Corte Ahora", type=["xlsx"], key="archivo_ahora")
+
+    # --- Historial: cortes adicionales para las tendencias (solo se procesan los nuevos)
+    historial = abrir_historial()
+    with st.expander("📈 Historial de cortes", expanded=False):
+        archivos_historial = st.file_uploader(
+            "Agregar cortes al historial", type=["xlsx"], accept_multiple_files=True, key="archivos_historial"
+        )
+        for archivo in archivos_historial or []:
+            huella = huella_archivo(archivo)
+            if not historial.contiene(huella):
+                with st.spinner(f"Agregando {archivo.name} al historial..."):
+                    historial.agregar(cargar_corte(huella, archivo), nombre=archivo.name)
+
+        cortes_historial = historial.cortes()
+        st.caption(f"{len(cortes_historial)} cortes en el historial")
+        st.dataframe(cortes_historial[["Fecha Corte", "Archivo"]], use_container_width=True, hide_index=True)
+
+    # --- Instantáneas de cortes ya procesados
+    with st.expander("🗄️ Instantáneas guardadas", expanded=False):
+        instantaneas = listar_instantaneas()
+        st.caption(f"{len(instantaneas)} cortes guardados · {instantaneas['Tamaño (MB)'].sum():,.1f} MB")
+        st.dataframe(instantaneas[["Archivo", "Creado", "Tamaño (MB)"]], use_container_width=True, hide_index=True)
+
+        dias_conservar = st.number_input("Eliminar las de más de (días)", min_value=0, value=30, step=1)
+        if st.button("🧹 Depurar instantáneas"):
+            eliminadas = podar_instantaneas(dias=dias_conservar)
+            st.success(f"Se eliminaron {eliminadas} instantáneas.")
 
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
-
-
- ############################## SECCIÓN DE METAS - CUMPLIMIENTO ############################################################
-    if clave_meta_filtro_valor:
-
-        with subtabs[3]:
-            st.write("✅ Cumplimiento Programado")
-
-            clave_meta = clave_meta_filtro_valor
-
-            df_cump_ahora = cumplimiento_ahora[ cumplimiento_ahora["Clave de Meta"] == clave_meta ]
-            df_cump_antes = cumplimiento_antes[ cumplimiento_antes["Clave de Meta"] == clave_meta ]
+# ========== CARGA Y FILTRO INICIAL ==========
 
-            # Obtener cantidad programada
-            cantidad_ahora = df_cump_ahora["Cantidad"].values[0] if not df_cump_ahora.empty else None
-            cantidad_antes = df_cump_antes["Cantidad"].values[0] if not df_cump_antes.empty else None
+RESULTADOS_BUSQUEDA = 8
+
+
+def ir_a_resultado(jerarquia, clave_q, etiqueta_meta):
+    # Lleva los selectores laterales (y el de meta, si el resultado es una meta) al resultado elegido
+    for eje, deps in jerarquia.items():
+        for dep, proyectos in deps.items():
+            for etiqueta, q in proyectos.items():
+                if q != clave_q:
+                    continue
+                st.session_state.update({
+                    "filtro_eje": eje, "filtro_dep": dep, "filtro_q": etiqueta, "filtro_solo_cambios": False
+                })
+                if etiqueta_meta:
+                    st.session_state["filtro_meta"] = etiqueta_meta
+                    st.session_state["seccion_principal"] = "🎯 Metas"
+                return
+
+
+def busqueda_lateral(jerarquia, indices, corte_ahora):
+    # Caja de búsqueda sobre ambos cortes; cada resultado es un botón que fija los selectores
+    consulta = st.text_input("Buscar proyecto o meta", key="busqueda", placeholder="ej. techos escuela")
+    if not consulta.strip():
+        return
+
+    resultados = buscar(indices, consulta, RESULTADOS_BUSQUEDA)
+    if resultados.empty:
+        st.caption("Sin resultados.")
+        return
+
+    for i, fila in enumerate(resultados.itertuples(index=False)):
+        # La etiqueta de la meta debe coincidir con la del selector de metas (textos del corte ahora)
+        etiqueta_meta = None
+        if pd.notna(fila[1]):
+            meta_ahora = corte_ahora.filas("metas", fila[0], fila[1])
+            if not meta_ahora.empty:
+                etiqueta_meta = f"{fila[1]} - {meta_ahora['Descripción de la Meta'].iloc[0]}"
+            titulo = f"{fila[1]} · {fila.Meta}"
+        else:
+            titulo = f"{fila[0]} · {fila.Proyecto}"
+
+        st.button(
+            titulo if len(titulo) <= 70 else titulo[:67] + "...",
+            key=f"resultado_busqueda_{i}", use_container_width=True,
+            help=f"{fila.Proyecto} ({fila.Corte})",
+            on_click=ir_a_resultado, args=(jerarquia, fila[0], etiqueta_meta)
+        )
+
+
+def filtros_laterales(jerarquia, comparacion=None, indices=None, corte_ahora=None):
+    # Selectores escalonados (jerarquía precalculada del corte). Sin `comparacion` (los cortes
+    # aún se están procesando) se omiten la búsqueda, el filtro y el resumen de proyectos con cambios.
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### 🔎 Filtrar proyectos")
+
+        modo_texto = st.radio(
+            "Comparar textos por", list(MODOS), horizontal=True,
+            format_func={"palabra": "Palabra", "oracion": "Oración", "caracter": "Carácter"}.get
+        )
+
+        if indices:
+            busqueda_lateral(jerarquia, indices, corte_ahora)
+
+        solo_cambios = False
+        if comparacion is not None:
+            proyectos_cambiados = comparacion.proyectos_con_cambios()
+            solo_cambios = st.toggle(
+                f"Solo proyectos con cambios ({len(proyectos_cambiados)})", key="filtro_solo_cambios"
+            )
 
-            # Mostrar métricas
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Cantidad Programada (Ahora)", f"{cantidad_ahora:.2f}" if cantidad_ahora is not None else "—")
-            with col2:
-                st.metric("Cantidad Programada (Antes)", f"{cantidad_antes:.2f}" if cantidad_antes is not None else "—")
+        eje_sel = st.selectbox("Eje", [""] + sorted(jerarquia), key="filtro_eje")
 
-            # Gráfico de cumplimiento mensual
-            meses = [
-                "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-                "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
-            ]
-            columnas_mensuales = [f"Cumplimiento {mes}" for mes in meses]
+        if eje_sel:
+            dep_sel = st.selectbox("Dependencia", [""] + sorted(jerarquia[eje_sel]), key="filtro_dep")
+        else:
+            dep_sel = None
 
-            valores_ahora = (
-                df_cump_ahora.iloc[0][columnas_mensuales].fillna(0).values if not df_cump_ahora.empty else [0] * 12
-            )
-            valores_antes = (
-                df_cump_antes.iloc[0][columnas_mensuales].fillna(0).values if not df_cump_antes.empty else [0] * 12
-            )
+        if eje_sel and dep_sel:
+            opciones_q = {
+                etiqueta: q for etiqueta, q in sorted(jerarquia[eje_sel][dep_sel].items())
+                if not solo_cambios or q in proyectos_cambiados.index
+            }
 
-            df_cumplimiento = pd.DataFrame({
-                "Mes": meses * 2,
-                "Valor": list(valores_antes) + list(valores_ahora),
-                "Versión": ["Antes"] * 12 + ["Ahora"] * 12
-            })
-
-            fig_cump = px.bar(
-                df_cumplimiento,
-                x="Mes",
-                y="Valor",
-                color="Versión",
-                barmode="group",
-                color_discrete_map={"Antes": "steelblue", "Ahora": "seagreen"},
-                title=f"Cumplimiento Programado por Mes - Meta {clave_meta}"
+            clave_q_display = st.selectbox("Clave Q", [""] + list(opciones_q.keys()), key="filtro_q")
+            clave_q = opciones_q.get(clave_q_display)
+        else:
+            clave_q = None
+
+        # --- Resumen de cambios de todo el portafolio
+        if comparacion is not None:
+            with st.expander("🧮 Proyectos con cambios", expanded=False):
+                st.dataframe(comparacion.conteos(), use_container_width=True)
+                st.dataframe(proyectos_cambiados, use_container_width=True)
+
+    return modo_texto, clave_q
+
+
+def exportacion_lateral(corte_antes, corte_ahora, jerarquia):
+    # Municipios, partidas, cronograma y cumplimiento de una dependencia (o de todo el corte) en un .xlsx
+    with st.sidebar.expander("📤 Exportar a Excel", expanded=False):
+        dependencias = sorted({dep for deps in jerarquia.values() for dep in deps})
+        alcance = st.selectbox("Alcance", [TODO_EL_CORTE] + dependencias, key="exportar_alcance")
+        claves_q = proyectos_alcance(jerarquia, alcance)
+        st.caption(f"{len(claves_q)} proyectos")
+
+        if st.button("Preparar archivo", key="exportar_preparar"):
+            st.session_state["exportacion"] = (corte_antes.huella, corte_ahora.huella, alcance)
+        if st.session_state.get("exportacion") == (corte_antes.huella, corte_ahora.huella, alcance):
+            contenido = exportar_excel(corte_antes.huella, corte_ahora.huella, alcance, corte_antes, corte_ahora, claves_q)
+            st.download_button("⬇️ Descargar Excel", contenido, file_name=nombre_archivo(alcance), mime=TIPO_XLSX)
+
+
+usar_catalogo = seleccion_antes is not None
+
+# --- Libros nuevos: hojas en paralelo; los selectores se habilitan con Datos Generales ---
+subidos = not usar_catalogo and archivo_antes and archivo_ahora
+# st.rerun(), st.stop() o una excepción salen sin pasar por `cerrar_ejecucion`: el perfilador y
+# tracemalloc se sueltan igual
+try:
+    pendientes = libros_pendientes([archivo_antes, archivo_ahora] if subidos else [])
+
+    if usar_catalogo or (archivo_antes and archivo_ahora):
+        # Con los cortes elegidos, plotly se prepara en segundo plano mientras se cargan
+        calentar_en_segundo_plano()
+
+        if pendientes:
+            medidor.etapa("carga_datos_generales")
+            with st.spinner("Leyendo Datos Generales..."):
+                datos = []
+                for a in (archivo_antes, archivo_ahora):
+                    # La carga pudo terminarla otra sesión mientras tanto: entonces se lee el corte completo
+                    hoja = abrir_carga_paralela().hoja(huella_archivo(a), "datos") if huella_archivo(a) in pendientes else None
+                    datos.append(hoja if hoja is not None else cargar_corte(huella_archivo(a), a)["datos"])
+            filtros_laterales(unir_jerarquias(*(construir_jerarquia(d) for d in datos)))
+
+            medidor.etapa("carga_segundo_plano")
+            barra = st.progress(0.0)
+            while True:
+                listas, total = abrir_carga_paralela().progreso(pendientes)
+                # total == 0: otra sesión terminó (y liberó) las cargas pendientes
+                barra.progress(listas / total if total else 1.0, text=f"Procesando hojas de los libros en segundo plano: {listas} de {total}")
+                if listas == total:
+                    break
+                abrir_carga_paralela().esperar(pendientes, 0.5)
+            st.rerun()
+
+        with st.spinner("Cargando y procesando archivos..."):
+
+            medidor.etapa("carga_cortes")
+            if usar_catalogo:
+                corte_ahora = cargar_corte_catalogo(seleccion_ahora)
+                corte_antes = cargar_corte_catalogo(seleccion_antes)
+                archivos = dict(zip(publicados["Huella"], publicados["Archivo"]))
+                nombre_antes, nombre_ahora = archivos[seleccion_antes], archivos[seleccion_ahora]
+            else:
+                corte_ahora = cargar_corte(huella_archivo(archivo_ahora), archivo_ahora)
+                corte_antes = cargar_corte(huella_archivo(archivo_antes), archivo_antes)
+                nombre_antes, nombre_ahora = archivo_antes.name, archivo_ahora.name
+            if medidor.activo:
+                for nombre, corte in (("Corte antes", corte_antes), ("Corte ahora", corte_ahora)):
+                    medidor.registrar_memoria(f"{nombre} (mapeado)" if corte.mapeado else nombre, corte.memoria())
+                medidor.registrar_rango("Corte antes", rango_instantanea(corte_antes.huella))
+                medidor.registrar_rango("Corte ahora", rango_instantanea(corte_ahora.huella))
+
+            medidor.etapa("historial")
+            historial.agregar(corte_antes, nombre=nombre_antes)
+            historial.agregar(corte_ahora, nombre=nombre_ahora)
+
+            # Validación de cada corte al subirlo (en caché por huella)
+            medidor.etapa("validacion")
+            hallazgos_antes = validar(corte_antes)
+            hallazgos_ahora = validar(corte_ahora)
+            st.sidebar.caption(
+                f"🔍 Validación: {len(hallazgos_ahora):,} hallazgos en el corte ahora · "
+                f"{len(hallazgos_antes):,} en el corte antes"
             )
-            fig_cump.update_layout(xaxis_tickangle=-45, height=400)
-
-            st.plotly_chart(fig_cump, use_container_width=True)
 
+            medidor.etapa("comparacion_portafolio")
+            comparacion = comparar_cortes(corte_antes, corte_ahora)
+
+            # Proyectos de ambos cortes, para incluir los que solo existen en el corte antes
+            jerarquia = unir_jerarquias(corte_antes.jerarquia, corte_ahora.jerarquia)
+
+            medidor.etapa("filtros")
+            indices = {
+                "Antes": indice_texto(corte_antes),
+                "Ahora": indice_texto(corte_ahora),
+            }
+            modo_texto, clave_q = filtros_laterales(jerarquia, comparacion, indices, corte_ahora)
+            exportacion_lateral(corte_antes, corte_ahora, jerarquia)
+
+            # --- Control de flujo: si no hay Clave Q seleccionada, detener ejecución ---
+            if not clave_q:
+                st.warning("Selecciona una Clave Q específica en el panel lateral para ver los datos comparativos.")
+                detener()
+
+    # ========== SECCIONES PRINCIPALES ==========
+    # Solo se construye la sección abierta (st.tabs ejecutaría todas en cada interacción)
+
+        seccion = st.radio(
+            "Sección",
+            ["📄 Datos Generales", "🎯 Metas", "📈 Tendencias", "🔍 Validación"],
+            horizontal=True, label_visibility="collapsed", key="seccion_principal"
+        )
+
+        if seccion == "📄 Datos Generales":
+            medidor.etapa("datos_generales")
+            vista_datos_generales(corte_antes, corte_ahora, clave_q, modo_texto)
+        elif seccion == "🎯 Metas":
+            medidor.etapa("metas")
+            vista_metas(corte_antes, corte_ahora, clave_q, modo_texto)
+        elif seccion == "📈 Tendencias":
+            medidor.etapa("tendencias")
+            vista_tendencias(historial, clave_q)
+        else:
+            medidor.etapa("validacion_vista")
+            vista_validacion(corte_antes, corte_ahora, clave_q)
 
+    else:
+        medidor.etapa("bienvenida")
+        st.markdown("""
+        ## 👋 Bienvenido a la app de Revisión de Programación SED
 
-else:
-    st.markdown("""
-    ## 👋 Bienvenido a la app de Revisión de Programación SED
+        Para comenzar, sigue estos pasos desde el panel lateral:
 
-    Para comenzar, sigue estos pasos desde el panel lateral:
+        1. 📂 **Elige del catálogo o carga los archivos** correspondientes a los cortes **Antes** y **Ahora**.
+        2. 🧭 **Selecciona un Eje**.
+        3. 🏛️ **Selecciona la Dependencia o Entidad**.
+        4. 🔑 **Elige la Clave Q** del proyecto que deseas revisar.
 
-    1. 📂 **Carga los archivos** correspondientes a los cortes **Antes** y **Ahora**.
-    2. 🧭 **Selecciona un Eje**.
-    3. 🏛️ **Selecciona la Dependencia o Entidad**.
-    4. 🔑 **Elige la Clave Q** del proyecto que deseas revisar.
+        Una vez seleccionada una Clave Q, se mostrarán las distintas secciones comparativas para facilitar el análisis de la información entre fechas de corte.
 
-    Una vez seleccionada una Clave Q, se mostrarán las distintas secciones comparativas para facilitar el análisis de la información entre fechas de corte.
+        > Si no ves nada aún, asegúrate de haber elegido o subido ambos cortes y de haber seleccionado una Clave Q válida.
+        """)
 
-    > Si no ves nada aún, asegúrate de haber subido ambos archivos y de haber seleccionado una Clave Q válida.
-    """)
+    cerrar_ejecucion()
+finally:
+    medidor.soltar()
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import almacen
+from benchmarks.generar_libro import generar_libro
+from carga import FILA_ENCABEZADO, HOJAS
+
+
+def _celda(hoja, columna, fila):
+    encabezado = [c.value for c in hoja[FILA_ENCABEZADO]]
+    return hoja.cell(row=fila, column=encabezado.index(columna) + 1)
+
+
+@pytest.fixture
+def libro(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    ruta = str(tmp_path / "corte.xlsx")
+    generar_libro(ruta, proyectos=4)
+
+    # Una clave numérica entre claves de texto y una fecha capturada como texto
+    wb = load_workbook(ruta)
+    _celda(wb[HOJAS["metas"][0]], "Clave de Meta", FILA_ENCABEZADO + 1).value = 123
+    _celda(wb[HOJAS["cronograma"][0]], "Fecha de Inicio", FILA_ENCABEZADO + 1).value = "por definir"
+    wb.save(ruta)
+    with open(ruta, "rb") as f:
+        return f.read()
+
+
+def test_instantanea_igual_al_libro_procesado(libro):
+    nuevo = almacen.obtener_corte(libro)
+    guardado = almacen.obtener_corte(libro)
+    assert almacen.existe_instantanea(almacen.huella_contenido(libro))
+    for clave in HOJAS:
+        pd.testing.assert_frame_equal(nuevo[clave], guardado[clave])
+    assert "123" in set(guardado["metas"]["Clave de Meta"].astype(str))
+
+
+def test_instantanea_de_otra_version_se_reprocesa(libro):
+    huella = almacen.huella_contenido(libro)
+    almacen.obtener_corte(libro)
+    ruta_meta = os.path.join(almacen.DIR_INSTANTANEAS, huella, almacen.ARCHIVO_META)
+    with open(ruta_meta, encoding="utf-8") as f:
+        meta = json.load(f)
+    del meta["version"]
+    with open(ruta_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    assert not almacen.existe_instantanea(huella)
+    assert almacen.cargar_instantanea(huella) is None
+    corte = almacen.obtener_corte(libro)
+    assert almacen.existe_instantanea(huella)
+    assert corte["cronograma"]["Fechas Inválidas"].notna().any()
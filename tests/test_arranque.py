@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+from arranque import MODULOS_DIFERIDOS
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importa la app en modo simple (sin servidor) y devuelve los módulos que cargó además de pandas y streamlit
+SCRIPT = """
+import json, sys
+import pandas, streamlit
+# Con pandas 3, construir texto `str` ya carga partes de pyarrow
+pandas.DataFrame({"texto": ["a"]}, columns=pandas.Index(["texto"]))
+previos = set(sys.modules)
+import main
+print(json.dumps(sorted(set(sys.modules) - previos)))
+"""
+
+
+def test_importar_main_no_carga_modulos_diferidos(tmp_path):
+    entorno = {
+        **os.environ,
+        "SED_DIR_CATALOGO": str(tmp_path / "catalogo"),
+        "SED_DIR_HISTORIAL": str(tmp_path / "historial"),
+        "SED_DEPURACION": "0",
+    }
+    salida = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=RAIZ, env=entorno, capture_output=True, text=True, timeout=120, check=True
+    ).stdout
+    cargados = json.loads(salida.strip().splitlines()[-1])
+
+    for modulo in MODULOS_DIFERIDOS + ["pyarrow"]:
+        # pandas 3 ya importa pyarrow: basta que la app no cargue nada más de él
+        assert not [m for m in cargados if m == modulo or m.startswith(modulo + ".")], modulo
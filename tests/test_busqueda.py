@@ -0,0 +1,67 @@
+import pandas as pd
+
+import busqueda
+from busqueda import CAMPO_META, CAMPOS_PROYECTO, IndiceTexto, buscar
+
+
+def _corte(proyectos, metas=()):
+    # proyectos: {Clave Q: (nombre, diagnóstico)}; metas: [(Clave Q, Clave de Meta, descripción)]
+    datos = pd.DataFrame([
+        {"Clave Q": clave_q, CAMPOS_PROYECTO[0]: nombre, CAMPOS_PROYECTO[1]: diagnostico,
+         CAMPOS_PROYECTO[2]: "", CAMPOS_PROYECTO[3]: ""}
+        for clave_q, (nombre, diagnostico) in proyectos.items()
+    ])
+    metas = pd.DataFrame(list(metas), columns=["Clave Q", "Clave de Meta", CAMPO_META])
+    return {"datos": datos, "metas": metas}
+
+
+def test_orden_por_palabras_y_puntaje_bm25():
+    indice = IndiceTexto(_corte({
+        "Q1": ("Rehabilitación de caminos", "Caminos rurales del municipio y su mantenimiento general"),
+        "Q2": ("Alumbrado público", "Incluye caminos"),
+        "Q3": ("Caminos rurales", ""),
+        "Q4": ("Parque central", ""),
+    }))
+    resultado = indice.buscar("caminos rurales")
+    # Primero los que tienen las dos palabras; entre ellos, la coincidencia en el nombre corto pesa más
+    assert list(resultado["Clave Q"]) == ["Q3", "Q1", "Q2"]
+    assert list(resultado["Palabras"]) == [2, 2, 1]
+    assert resultado["Puntaje"].is_monotonic_decreasing
+
+
+def test_sin_acentos_ni_palabras_vacias():
+    indice = IndiceTexto(_corte({"Q1": ("Educación básica", ""), "Q2": ("Salud de la población", "")}))
+    assert list(indice.buscar("EDUCACION")["Clave Q"]) == ["Q1"]
+    assert indice.buscar("de la").empty
+
+
+def test_prefijo_encuentra_y_pesa_menos_que_la_palabra_exacta():
+    indice = IndiceTexto(_corte(
+        {"Q1": ("Escuelas dignas", ""), "Q2": ("Escuel móvil", "")},
+        [("Q1", "M1", "Techado de escuelas")],
+    ))
+    resultado = indice.buscar("escuel")
+    assert set(zip(resultado["Clave Q"], resultado["Clave de Meta"].fillna(""))) == {("Q1", ""), ("Q2", ""), ("Q1", "M1")}
+    # La coincidencia exacta "escuel" supera a los prefijos de igual peso de campo
+    assert resultado.iloc[0]["Clave Q"] == "Q2"
+    assert indice.buscar("escuelasx").empty
+
+
+def test_limite_de_terminos_por_prefijo(monkeypatch):
+    proyectos = {f"Q{i:02d}": (f"obra{i:02d}", "") for i in range(12)}
+    indice = IndiceTexto(_corte(proyectos))
+    assert len(indice.buscar("obra", limite=100)) == 12
+
+    monkeypatch.setattr(busqueda, "LIMITE_PREFIJO", 5)
+    resultado = indice.buscar("obra", limite=100)
+    # Solo los primeros términos del vocabulario en orden alfabético
+    assert sorted(resultado["Clave Q"]) == ["Q00", "Q01", "Q02", "Q03", "Q04"]
+
+
+def test_buscar_en_varios_cortes_une_resultados():
+    antes = IndiceTexto(_corte({"Q1": ("Puente peatonal", ""), "Q2": ("Puente vehicular", "")}))
+    ahora = IndiceTexto(_corte({"Q1": ("Puente peatonal nuevo", "")}))
+    resultado = buscar({"Antes": antes, "Ahora": ahora}, "puente")
+    assert dict(zip(resultado["Clave Q"], resultado["Corte"])) == {"Q1": "Antes, Ahora", "Q2": "Antes"}
+    # El texto mostrado es el del último corte
+    assert resultado.set_index("Clave Q").loc["Q1", "Proyecto"] == "Puente peatonal nuevo"
@@ -0,0 +1,36 @@
+import numpy as np
+
+from cache_cortes import CacheCortes, tamano_objeto
+
+
+def test_derivados_cuentan_en_el_presupuesto_y_salen_con_sus_cortes():
+    cache = CacheCortes(250, medir=lambda valor: 100)
+    for huella in ("a", "b"):
+        cache.obtener(huella, lambda: huella)
+    par = cache.derivado(["a", "b"], "comparar", lambda: np.zeros(5), medir=tamano_objeto)
+    assert cache.bytes == 240
+    # Un acierto no vuelve a calcularlo
+    assert cache.derivado(["a", "b"], "comparar", lambda: None, medir=tamano_objeto) is par
+
+    # Entra un tercer corte: sale "a" (el menos usado) y con él la comparación del par
+    cache.obtener("c", lambda: "c")
+    assert not cache.contiene("a")
+    assert cache.bytes == 200
+    assert cache.estadisticas()["Derivados"] == 0
+
+
+def test_derivado_sin_sus_cortes_no_se_guarda():
+    cache = CacheCortes(1000, medir=lambda valor: 100)
+    cache.obtener("a", lambda: "a")
+    cache.derivado(["a", "x"], "comparar", lambda: 1, medir=lambda valor: 10)
+    assert cache.bytes == 100
+    assert cache.estadisticas()["Derivados"] == 0
+
+
+def test_cortes_mapeados_no_cuentan_en_el_presupuesto():
+    cache = CacheCortes(150, medir=lambda valor: 100, compartido=lambda valor: valor.startswith("catalogo"))
+    for huella in ("catalogo-a", "catalogo-b", "subido"):
+        cache.obtener(huella, lambda: huella)
+    assert cache.bytes == 100
+    assert cache.desalojos == 0
+    assert cache.estadisticas()["Mapeados (MB)"] == round(200 / 1024 ** 2, 2)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from cache_vistas import recortar_figura
+
+
+def test_recortar_figura_quita_lo_que_no_se_muestra():
+    figura = go.Figure([
+        go.Bar(
+            x=["Ene", "Feb"], y=[1.0, 2.0], name="Antes",
+            customdata=np.array([["a"], ["b"]]), hovertext=["x", "y"],
+            hovertemplate="Mes=%{x}<br>Monto=%{y}<extra></extra>",
+        ),
+        go.Bar(
+            x=["Ene", "Feb"], y=[3.0, 4.0], name="Ahora",
+            customdata=np.array([["c"], ["d"]]), hovertemplate="Clave=%{customdata[0]}<extra></extra>",
+        ),
+        go.Bar(x=["Ene"], y=[5.0], name="Oculta", visible=False),
+        go.Bar(x=[], y=[], name="Vacía"),
+        go.Bar(x=["Ene"], y=[6.0], name="Leyenda", visible="legendonly"),
+    ])
+
+    recortada = recortar_figura(figura)
+
+    assert [t.name for t in recortada.data] == ["Antes", "Ahora", "Leyenda"]
+    assert recortada.data[0].customdata is None and recortada.data[0].hovertext is None
+    # La plantilla de la etiqueta sí usa `customdata`
+    assert recortada.data[1].customdata is not None
+
+
+def test_recortar_figura_fechas_sin_hora():
+    inicio = pd.to_datetime(["2024-01-01", "2024-02-01"]).to_numpy()
+    figura = go.Figure([go.Bar(base=inicio, x=[86400000.0, 86400000.0], y=["A", "B"], orientation="h")])
+    assert list(recortar_figura(figura).data[0].base) == ["2024-01-01", "2024-02-01"]
@@ -0,0 +1,72 @@
+import datetime
+import warnings
+
+import pandas as pd
+
+from carga import COLUMNA_FECHAS_INVALIDAS, FILA_ENCABEZADO, FILAS_VACIAS_FIN, leer_hoja, normalizar_corte, rango_legible
+
+
+class HojaFalsa:
+    # Lo que `leer_hoja` usa de una hoja de openpyxl en modo solo lectura
+    def __init__(self, filas, max_row=None):
+        self.filas = filas
+        self.max_row = max_row
+        self.max_column = None
+
+    def iter_rows(self, min_row=1, max_row=None, max_col=None, values_only=True):
+        return (tuple(fila[:max_col]) for fila in self.filas[min_row - 1:max_row])
+
+
+def _filas(vacias):
+    relleno = [(None, None)] * (FILA_ENCABEZADO - 1)
+    datos = [("Q1", 1.0), ("Q2", 2.0), ("Q3", 3.0)]
+    return relleno + [("Clave Q", "Monto")] + datos + [(None, None)] * vacias
+
+
+def test_filas_fantasma_sin_dimension_son_cota_inferior():
+    _, rango = leer_hoja(HojaFalsa(_filas(700)), ["Clave Q", "Monto"], llaves=["Clave Q"])
+    assert rango["Filas"] == 3
+    assert rango["Filas fantasma"] == FILAS_VACIAS_FIN
+    assert rango_legible(rango)["Filas fantasma"] == f"≥{FILAS_VACIAS_FIN}"
+
+
+def test_filas_fantasma_con_dimension_son_exactas():
+    hoja = HojaFalsa(_filas(700), max_row=FILA_ENCABEZADO + 703)
+    _, rango = leer_hoja(hoja, ["Clave Q", "Monto"], llaves=["Clave Q"])
+    assert rango["Filas fantasma"] == 700
+    assert rango_legible(rango)["Filas fantasma"] == 700
+
+
+def test_textos_faltantes_como_nan():
+    relleno = [(None, None, None)] * (FILA_ENCABEZADO - 1)
+    datos = [("Q1", 1.5, "NA"), ("Q2", "N/A", "#N/A"), ("Q3", "#N/A", "texto"), ("Q4", 4.0, "NAS")]
+    df, _ = leer_hoja(HojaFalsa(relleno + [("Clave Q", "Monto", "Nota")] + datos), ["Clave Q", "Monto", "Nota"])
+    # Con los textos faltantes fuera, la columna de montos queda numérica, igual que con pd.read_excel
+    assert df["Monto"].dtype == "float64"
+    assert df["Monto"].isna().tolist() == [False, True, True, False]
+    assert df["Nota"].isna().tolist() == [True, True, False, False]
+
+    # Una columna que solo trae textos faltantes queda vacía, como float
+    vacia, _ = leer_hoja(HojaFalsa(relleno + [("Clave Q", "Nota")] + [("Q1", "N/A"), ("Q2", "NA")]), ["Clave Q", "Nota"])
+    assert vacia["Nota"].dtype == "float64"
+
+
+def test_fechas_del_cronograma():
+    crono = pd.DataFrame({
+        "Clave Q": ["Q1"] * 5,
+        "Fecha de Inicio": [datetime.datetime(2025, 5, 2), "31/03/2025", "1/4/2025", "por definir", None],
+        # Un espacio al final del primer valor no debe invalidar el resto de la columna
+        "Fecha de Termino": ["15/07/2025 ", "30/04/2025", "2025-06-30", "31/13/2025", "01/08/2025"],
+    }, dtype=object)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        crono = normalizar_corte({"cronograma": crono})["cronograma"]
+
+    assert crono["Fecha de Inicio"].tolist()[:3] == [pd.Timestamp(2025, 5, 2), pd.Timestamp(2025, 3, 31), pd.Timestamp(2025, 4, 1)]
+    assert crono["Fecha de Inicio"].iloc[3:].isna().all()
+    assert crono["Fecha de Termino"].tolist()[:3] == [pd.Timestamp(2025, 7, 15), pd.Timestamp(2025, 4, 30), pd.Timestamp(2025, 6, 30)]
+    assert crono["Fecha de Termino"].iloc[4] == pd.Timestamp(2025, 8, 1)
+    # El texto original de lo que no es fecha se conserva; las celdas vacías no cuentan
+    assert crono[COLUMNA_FECHAS_INVALIDAS].fillna("").tolist() == [
+        "", "", "", "Fecha de Inicio: por definir; Fecha de Termino: 31/13/2025", "",
+    ]
@@ -0,0 +1,57 @@
+import gc
+import os
+
+import pandas as pd
+import pytest
+
+import almacen
+from benchmarks.generar_libro import generar_libro
+from carga import HOJAS
+from carga_paralela import CargaParalela
+
+
+@pytest.fixture
+def carga(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    carga = CargaParalela(procesos=1)
+    yield carga
+    carga._grupo.shutdown(cancel_futures=True)
+
+
+def _libro(tmp_path, nombre, semilla):
+    ruta = str(tmp_path / nombre)
+    generar_libro(ruta, proyectos=2, semilla=semilla)
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    return almacen.huella_contenido(contenido), contenido, nombre
+
+
+def test_carga_igual_a_procesar_el_libro(carga, tmp_path):
+    huella, contenido, nombre = _libro(tmp_path, "corte.xlsx", 0)
+    sesion = carga.sesion()
+    carga.iniciar([(huella, contenido, nombre)], sesion)
+    assert carga.hoja(huella, "datos") is not None
+    assert carga.progreso([huella])[1] == len(HOJAS)
+
+    hojas = carga.terminar(huella)
+    assert not carga.contiene(huella)
+    esperado = almacen.obtener_corte(contenido, huella=huella)
+    for clave in HOJAS:
+        pd.testing.assert_frame_equal(hojas[clave], esperado[clave])
+
+
+def test_cargas_sin_recoger_se_sueltan(carga, tmp_path):
+    libros = [_libro(tmp_path, "antes.xlsx", 0), _libro(tmp_path, "ahora.xlsx", 1)]
+    sesion = carga.sesion()
+    carga.iniciar(libros, sesion)
+    rutas = [carga._cargas[huella]["ruta"] for huella, _, _ in libros]
+
+    # La sesión subió otro libro en lugar del primero
+    carga.iniciar(libros[1:], sesion)
+    assert not carga.contiene(libros[0][0]) and not os.path.exists(rutas[0])
+    assert carga.contiene(libros[1][0])
+
+    # La sesión terminó sin recoger el segundo
+    del sesion
+    gc.collect()
+    assert not carga.contiene(libros[1][0]) and not os.path.exists(rutas[1])
@@ -0,0 +1,52 @@
+import json
+import os
+
+import pytest
+
+import almacen
+import catalogo
+from benchmarks.generar_libro import generar_libro
+from carga import HOJAS
+
+
+@pytest.fixture
+def libro(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    monkeypatch.setattr(catalogo, "DIR_CATALOGO", str(tmp_path / "catalogo"))
+    ruta = str(tmp_path / "corte.xlsx")
+    generar_libro(ruta, proyectos=3)
+    with open(ruta, "rb") as f:
+        return f.read()
+
+
+def _cambiar_version(huella, version):
+    ruta = os.path.join(catalogo._ruta(huella), catalogo.ARCHIVO_META)
+    with open(ruta, encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["version"] = version
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def test_publicar_y_abrir(libro):
+    huella = catalogo.publicar(libro, nombre="corte.xlsx")
+    assert catalogo.publicado(huella)
+    assert list(catalogo.listar()["Huella"]) == [huella]
+    hojas = catalogo.abrir(huella)
+    original = almacen.obtener_corte(libro)
+    for clave in HOJAS:
+        assert len(hojas[clave]) == len(original[clave])
+
+
+def test_corte_de_otra_version_se_rechaza_y_se_vuelve_a_publicar(libro):
+    huella = catalogo.publicar(libro, nombre="corte.xlsx")
+    _cambiar_version(huella, catalogo.VERSION_CATALOGO - 1)
+
+    assert not catalogo.publicado(huella)
+    assert catalogo.listar().empty
+    with pytest.raises(ValueError):
+        catalogo.abrir(huella)
+
+    assert catalogo.publicar(libro, nombre="corte.xlsx") == huella
+    assert catalogo.publicado(huella)
+    assert len(catalogo.abrir(huella)["datos"]) > 0
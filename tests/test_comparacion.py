@@ -0,0 +1,38 @@
+import pandas as pd
+
+from comparacion import comparar_hoja, diferencias_cronograma
+
+
+def test_llaves_numericas_y_de_texto_se_emparejan():
+    antes = pd.DataFrame({
+        "Clave Q": ["Q1", "Q1", "Q1"], "Clave de Meta": [1.0, 2.0, 3.0], "Municipio": ["A", "A", "A"],
+        "Monto Total": [10.0, 20.0, 30.0],
+    })
+    ahora = pd.DataFrame({
+        "Clave Q": ["Q1", "Q1", "Q1"], "Clave de Meta": ["1", "2", " 4"], "Municipio": ["A", "A", "A"],
+        "Monto Total": [10.0, 25.0, 40.0],
+    })
+
+    estados = comparar_hoja(antes, ahora, "metas").set_index("Clave de Meta")["Estado"]
+    assert estados.to_dict() == {"1": "Sin cambios", "2": "Modificado", "3": "Eliminado", "4": "Agregado"}
+
+
+def _cronograma(claves, inicio):
+    return pd.DataFrame({
+        "Clave Q": "Q1", "Clave de Meta": "M1", "Clave de Actividad /Hito": claves,
+        "Fase Actividad / Hito": "F1", "Descripción": "Actividad",
+        "Fecha de Inicio": pd.to_datetime(inicio), "Fecha de Termino": pd.to_datetime(inicio),
+        "Monto Actividad / Hito": 1.0,
+    })
+
+
+def test_diferencias_cronograma_con_llaves_entero_y_texto():
+    # Antes: claves compactadas a entero; ahora: una clave "2.1" deja toda la columna como texto
+    antes = _cronograma(pd.array([1, 2, 10], dtype="int8"), ["2025-01-01", "2025-02-01", "2025-03-01"])
+    ahora = _cronograma(["1", "2.1", "10"], ["2025-01-01", "2025-02-01", "2025-03-05"])
+
+    cambios = diferencias_cronograma(antes, ahora)
+    estados = dict(zip(cambios["Clave de Actividad /Hito"], cambios["Estado"]))
+    assert estados == {"1": "Sin cambios", "2": "Eliminado", "2.1": "Agregado", "10": "Modificado"}
+    # Las claves numéricas se ordenan como números
+    assert list(cambios["Clave de Actividad /Hito"]) == ["1", "2", "2.1", "10"]
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+import almacen
+from benchmarks.generar_libro import generar_libro
+from corte import Corte
+
+
+@pytest.fixture
+def hojas(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    ruta = str(tmp_path / "corte.xlsx")
+    generar_libro(ruta, proyectos=6)
+    with open(ruta, "rb") as f:
+        hojas = almacen.obtener_corte(f.read())
+    # Desordenadas, como puede venir el libro
+    return {clave: df.sample(frac=1, random_state=0).reset_index(drop=True) for clave, df in hojas.items()}
+
+
+def _iguales(obtenidas, esperadas):
+    pd.testing.assert_frame_equal(obtenidas.reset_index(drop=True), esperadas.reset_index(drop=True))
+
+
+def _con_mascara(df, **llaves):
+    mascara = pd.Series(True, index=df.index)
+    for columna, valor in llaves.items():
+        mascara &= df[columna] == valor
+    # Orden estable por llaves, como queda el corte indexado
+    return df[mascara].sort_values([c for c in ["Clave Q", "Clave de Meta"] if c in df.columns], kind="mergesort")
+
+
+def test_filas_por_proyecto_igual_a_la_mascara(hojas):
+    corte = Corte(hojas)
+    claves_q = list(hojas["datos"]["Clave Q"].unique()) + ["Q-NO-EXISTE"]
+    for hoja in ["datos", "cronograma", "partidas"]:
+        for clave_q in claves_q:
+            _iguales(corte.filas(hoja, clave_q), _con_mascara(hojas[hoja], **{"Clave Q": clave_q}))
+    # Las metas traen además las filas de totales del corte
+    for clave_q in claves_q:
+        metas = corte["metas"]
+        _iguales(corte.filas("metas", clave_q), metas[metas["Clave Q"] == clave_q])
+    assert corte.filas("cronograma", "Q-NO-EXISTE").empty
+    assert list(corte.filas("cronograma", "Q-NO-EXISTE").columns) == list(corte["cronograma"].columns)
+
+
+def test_filas_por_meta_igual_a_la_mascara(hojas):
+    corte = Corte(hojas)
+    crono = hojas["cronograma"]
+    llaves = list(crono[["Clave Q", "Clave de Meta"]].drop_duplicates().itertuples(index=False, name=None))
+    for clave_q, clave_meta in llaves + [(llaves[0][0], "M-NO-EXISTE"), ("Q-NO-EXISTE", llaves[0][1])]:
+        _iguales(
+            corte.filas("cronograma", clave_q, clave_meta),
+            _con_mascara(crono, **{"Clave Q": clave_q, "Clave de Meta": clave_meta}),
+        )
+
+    # Cumplimiento no trae Clave Q: se busca solo por Clave de Meta
+    cumplimiento = hojas["cumplimiento"]
+    for clave_meta in list(cumplimiento["Clave de Meta"].unique()) + ["M-NO-EXISTE"]:
+        esperadas = cumplimiento[cumplimiento["Clave de Meta"] == clave_meta]
+        _iguales(corte.filas("cumplimiento", clave_meta=clave_meta), esperadas)
+
+
+def test_filas_de_varios_proyectos(hojas):
+    corte = Corte(hojas)
+    claves_q = ["Q-NO-EXISTE"] + list(hojas["datos"]["Clave Q"].unique())[:3]
+    # En el orden de `claves_q`
+    crono = corte["cronograma"]
+    esperadas = pd.concat([crono[crono["Clave Q"] == clave_q] for clave_q in reversed(claves_q)])
+    _iguales(corte.filas_proyectos("cronograma", list(reversed(claves_q))), esperadas)
+    assert corte.filas_proyectos("cronograma", ["Q-NO-EXISTE"]).empty
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from carga import MESES
+from comparacion import comparativo_partidas, mensual_partidas
+from cubo_partidas import CuboPartidas
+
+
+def _partidas(filas):
+    # (Clave Q, Clave de Meta, Partida, monto mensual): el mismo monto los 12 meses
+    df = pd.DataFrame(filas, columns=["Clave Q", "Clave de Meta", "Partida", "Mensual"])
+    for mes in MESES:
+        df[f"Monto {mes}"] = df["Mensual"]
+    df["Monto Anual"] = df["Mensual"] * len(MESES)
+    return df.drop(columns="Mensual")
+
+
+def _corte(partidas):
+    datos = pd.DataFrame({"Clave Q": ["Q1"], "Dep Siglas": ["DEP"], "Eje": ["Eje 1"]})
+    return {"partidas": partidas, "datos": datos}
+
+
+def test_partida_en_blanco_igual_que_el_comparativo():
+    antes = _partidas([("Q1", "M1", 2000, 10.0), ("Q1", "M1", None, 5.0), ("Q1", "M2", 3000, 1.0)])
+    ahora = _partidas([("Q1", "M1", 2000, 12.0), ("Q1", "M1", None, 7.0), ("Q1", "M1", 5000, 2.0)])
+    cubo = CuboPartidas(_corte(antes), _corte(ahora))
+
+    antes_qm, ahora_qm = antes[antes["Clave de Meta"] == "M1"], ahora[ahora["Clave de Meta"] == "M1"]
+    esperado = comparativo_partidas(antes_qm, ahora_qm)
+    obtenido = cubo.por_partida("Meta", ("Q1", "M1"))
+    pd.testing.assert_frame_equal(
+        obtenido.astype({"Partida": "int64"}), esperado.astype({"Partida": "int64"}), check_dtype=False
+    )
+
+    # Los montos sin Partida cuentan en la serie mensual y en los niveles superiores
+    mensual = cubo.mensual("Meta", ("Q1", "M1"))
+    base = mensual_partidas(antes_qm, ahora_qm)
+    np.testing.assert_allclose(mensual[["Antes", "Ahora"]].to_numpy(), base[["Antes", "Ahora"]].to_numpy())
+    desglose = cubo.desglose("Clave Q", "Q1").set_index("Clave de Meta")
+    assert desglose.loc["M1", "Monto Anual (Antes)"] == 15.0 * len(MESES)
+    assert desglose.loc["M1", "Monto Anual (Ahora)"] == 21.0 * len(MESES)
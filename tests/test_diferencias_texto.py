@@ -0,0 +1,76 @@
+import re
+
+import pytest
+
+import diferencias_texto
+from diferencias_texto import (
+    ABRE_AGREGADO, ABRE_ELIMINADO, CIERRA_AGREGADO, CIERRA_ELIMINADO, MODOS, resaltar_diferencias, tokenizar,
+)
+
+
+def eliminado(texto):
+    return ABRE_ELIMINADO + texto + CIERRA_ELIMINADO
+
+
+def agregado(texto):
+    return ABRE_AGREGADO + texto + CIERRA_AGREGADO
+
+
+def sin_marcas(html_texto):
+    return re.sub(r"<[^>]+>", "", html_texto)
+
+
+@pytest.mark.parametrize("modo", list(MODOS))
+def test_tokens_reconstruyen_el_texto(modo):
+    texto = "Primera oración, con comas.  Segunda!\nTercera; sin punto"
+    assert "".join(tokenizar(texto, modo)) == texto
+
+
+def test_modo_palabra():
+    antes, ahora = resaltar_diferencias("el perro come", "el gato come", "palabra")
+    assert antes == "el " + eliminado("perro") + " come"
+    assert ahora == "el " + agregado("gato") + " come"
+
+
+def test_modo_caracter():
+    antes, ahora = resaltar_diferencias("casa", "cosa", "caracter")
+    assert antes == "c" + eliminado("a") + "sa"
+    assert ahora == "c" + agregado("o") + "sa"
+
+
+def test_modo_oracion():
+    antes, ahora = resaltar_diferencias("Uno. Dos. Tres.", "Uno. Dos y medio. Tres.", "oracion")
+    assert antes == "Uno. " + eliminado("Dos. ") + "Tres."
+    assert ahora == "Uno. " + agregado("Dos y medio. ") + "Tres."
+
+
+def test_textos_iguales_sin_marcas():
+    assert resaltar_diferencias("a < b", "a < b") == ("a &lt; b", "a &lt; b")
+
+
+def test_escapa_html():
+    antes, ahora = resaltar_diferencias("a < b & c", "a < b & d <script>", "palabra")
+    assert "<script>" not in ahora
+    assert sin_marcas(antes) == "a &lt; b &amp; c"
+    assert sin_marcas(ahora) == "a &lt; b &amp; d &lt;script&gt;"
+
+
+def test_sobre_el_limite_pasa_al_modo_mas_grueso(monkeypatch):
+    antes_texto, ahora_texto = "la casa roja. El perro.", "la cosa roja. El perro."
+    # "caracter" (23 × 23 tokens) no cabe; "palabra" sí
+    monkeypatch.setattr(diferencias_texto, "LIMITE_TRABAJO", 200)
+    antes, ahora = resaltar_diferencias(antes_texto, ahora_texto, "caracter")
+    assert antes == "la " + eliminado("casa") + " roja. El perro."
+    assert ahora == "la " + agregado("cosa") + " roja. El perro."
+
+    # Solo caben las oraciones
+    monkeypatch.setattr(diferencias_texto, "LIMITE_TRABAJO", 4)
+    antes, ahora = resaltar_diferencias(antes_texto, ahora_texto, "caracter")
+    assert antes == eliminado("la casa roja. ") + "El perro."
+
+
+def test_sin_modo_que_quepa_marca_el_bloque_completo(monkeypatch):
+    monkeypatch.setattr(diferencias_texto, "LIMITE_TRABAJO", 1)
+    antes, ahora = resaltar_diferencias("Uno. Dos & tres.", "Uno. Cuatro.", "palabra")
+    assert antes == eliminado("Uno. Dos &amp; tres.")
+    assert ahora == agregado("Uno. Cuatro.")
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+import almacen
+import exportacion
+from benchmarks.generar_libro import generar_libro
+from comparacion import ResumenMetas, diferencias_cronograma
+from corte import Corte, unir_jerarquias
+from cubo_partidas import CuboPartidas
+
+
+@pytest.fixture
+def cortes(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    resultado = []
+    for nombre, proyectos, variacion in (("antes", 5, 0.0), ("ahora", 6, 0.5)):
+        ruta = str(tmp_path / f"{nombre}.xlsx")
+        generar_libro(ruta, proyectos=proyectos, variacion=variacion)
+        with open(ruta, "rb") as f:
+            resultado.append(Corte(almacen.obtener_corte(f.read()), huella=nombre))
+    return resultado
+
+
+def test_libro_exportado_por_bloques(cortes, monkeypatch):
+    corte_antes, corte_ahora = cortes
+    # Varios bloques, el último incompleto
+    monkeypatch.setattr(exportacion, "PROYECTOS_POR_BLOQUE", 4)
+    jerarquia = unir_jerarquias(corte_antes.jerarquia, corte_ahora.jerarquia)
+    claves_q = exportacion.proyectos_alcance(jerarquia, exportacion.TODO_EL_CORTE)
+    resumen = ResumenMetas(corte_antes["metas"], corte_ahora["metas"])
+    cubo = CuboPartidas(corte_antes, corte_ahora)
+
+    avances = []
+    contenido = exportacion.exportar_a_bytes(
+        corte_antes, corte_ahora, claves_q, resumen, cubo, avance=lambda hechos, total: avances.append(hechos)
+    )
+    libro = load_workbook(io.BytesIO(contenido), read_only=True)
+    assert libro.sheetnames == exportacion.HOJAS_EXPORTACION
+    assert avances == [4, len(claves_q)]
+
+    def filas(nombre):
+        return sum(1 for _ in libro[nombre].iter_rows(min_row=2))
+
+    def con_mascara(corte, hoja):
+        df = corte[hoja]
+        return df[df["Clave Q"].isin(claves_q)]
+
+    metas = {
+        (clave_q, clave_meta)
+        for corte in cortes
+        for clave_q, clave_meta in zip(corte["metas"]["Clave Q"], corte["metas"]["Clave de Meta"])
+        if clave_meta == clave_meta
+    }
+    assert filas("Municipios") == len(resumen.municipios_proyectos(claves_q))
+    assert filas("Partidas") == len(cubo.partidas_proyectos(claves_q))
+    assert filas("Cronograma") == len(
+        diferencias_cronograma(con_mascara(corte_antes, "cronograma"), con_mascara(corte_ahora, "cronograma"))
+    )
+    assert filas("Cumplimiento") == 2 * len(metas)
+    assert [c.value for c in next(libro["Cumplimiento"].iter_rows(max_row=1))][:3] == ["Clave Q", "Clave de Meta", "Versión"]
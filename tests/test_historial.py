@@ -0,0 +1,55 @@
+import pandas as pd
+
+from carga import MESES
+from historial import COLUMNAS_MESES, Historial
+
+
+class CorteMinimo:
+    def __init__(self, huella, fecha, monto):
+        self.huella = huella
+        self.hojas = {
+            "datos": pd.DataFrame({"Fecha": [fecha]}),
+            "metas": pd.DataFrame({
+                "Clave Q": ["Q1", "Q1"], "Clave de Meta": [1, 2],
+                "Cantidad Total": [10, 20], "Monto Total": [monto, monto],
+            }),
+            "partidas": pd.DataFrame({
+                "Clave Q": ["Q1"], "Clave de Meta": [1], "Partida": [2000], "Monto Anual": [monto * 12],
+                **{f"Monto {mes}": [monto] for mes in MESES},
+            }),
+        }
+
+    def __getitem__(self, hoja):
+        return self.hojas[hoja]
+
+
+def test_cortes_con_montos_enteros_y_decimales(tmp_path):
+    historial = Historial(str(tmp_path))
+    # El primer corte solo tiene montos enteros (int64), el segundo decimales
+    assert historial.agregar(CorteMinimo("a", "31/01/2025", 100), nombre="enero.xlsx")
+    assert historial.agregar(CorteMinimo("b", "28/02/2025", 12.5), nombre="febrero.xlsx")
+
+    serie = historial.serie_proyecto("Q1")
+    assert serie["Monto Total"].tolist() == [200.0, 25.0]
+
+    metas = historial.serie_metas("Q1")
+    assert metas["Clave de Meta"].tolist() == ["1", "1", "2", "2"]
+
+    partidas = historial.serie_partidas("Q1", 1)
+    assert partidas[COLUMNAS_MESES[0]].tolist() == [100.0, 12.5]
+    assert partidas["Partida"].tolist() == ["2000", "2000"]
+
+
+def test_claves_numericas_leidas_como_float(tmp_path):
+    historial = Historial(str(tmp_path))
+    corte = CorteMinimo("a", "31/01/2025", 100)
+    # Claves numéricas que el Excel entrega como float
+    for hoja in ("metas", "partidas"):
+        corte.hojas[hoja]["Clave Q"] = 123.0
+        corte.hojas[hoja]["Clave de Meta"] = corte.hojas[hoja]["Clave de Meta"].astype(float)
+    assert historial.agregar(corte)
+
+    for clave_q in (123.0, 123, "123"):
+        assert historial.serie_metas(clave_q)["Clave de Meta"].tolist() == ["1", "2"]
+        assert len(historial.serie_partidas(clave_q, 1.0)) == 1
+    assert historial.serie_proyecto(123.0)["Monto Total"].tolist() == [200.0]
@@ -0,0 +1,39 @@
+import gc
+import tracemalloc
+
+from instrumentacion import Medidor
+
+
+def test_trazado_se_detiene_con_el_ultimo_medidor():
+    primero = Medidor(activo=True)
+    segundo = Medidor(activo=True)
+    primero.etapa("carga")
+    primero.finalizar()
+    # El otro medidor sigue midiendo
+    assert tracemalloc.is_tracing()
+
+    # Sin `finalizar` (p. ej. st.rerun): se suelta al descartarlo
+    del segundo
+    gc.collect()
+    assert not tracemalloc.is_tracing()
+
+
+def test_no_detiene_un_trazado_ajeno():
+    tracemalloc.start()
+    try:
+        Medidor(activo=True).finalizar()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_soltar_detiene_perfilador_y_trazado():
+    medidor = Medidor(activo=True, perfilar=True)
+    medidor.etapa("carga")
+    medidor.soltar()
+    assert not tracemalloc.is_tracing()
+    assert medidor._perfil is None
+    # Un segundo perfilador puede iniciarse en el mismo hilo
+    otro = Medidor(perfilar=True)
+    assert otro.finalizar()[1]
+    medidor.soltar()
@@ -0,0 +1,81 @@
+import pandas as pd
+
+import almacen
+import lote
+from benchmarks.generar_libro import generar_libro
+from corte import Corte
+from cubo_partidas import CuboPartidas
+
+
+def test_trabajador_sin_instantanea_lee_el_libro(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    monkeypatch.setattr(lote, "_cortes", {})
+    ruta = str(tmp_path / "corte.xlsx")
+    generar_libro(ruta, proyectos=2)
+    with open(ruta, "rb") as f:
+        huella = almacen.huella_contenido(f.read())
+
+    lote._iniciar_trabajador(((ruta, huella), (ruta, huella)))
+    assert lote._cortes["ahora"].huella == huella
+    assert not lote._cortes["ahora"]["metas"].empty
+    assert almacen.existe_instantanea(huella)
+
+
+def test_nombres_de_archivo_no_se_repiten():
+    nombres = lote._nombres_archivo(["A/B", "A_B", "a b", "DEP1"])
+    assert nombres["DEP1"] == "DEP1"
+    assert len({n.lower() for n in nombres.values()}) == 4
+
+
+def test_cronograma_del_reporte_conserva_las_fechas(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    ruta = str(tmp_path / "corte.xlsx")
+    generar_libro(ruta, proyectos=2)
+    with open(ruta, "rb") as f:
+        hojas = almacen.obtener_corte(f.read())
+    # Una actividad de un solo día: el Gantt le suma un día al término, el reporte no
+    crono = hojas["cronograma"]
+    crono.loc[crono.index[0], "Fecha de Termino"] = crono.loc[crono.index[0], "Fecha de Inicio"]
+    corte = Corte(hojas, huella="h")
+    clave_q = crono.loc[crono.index[0], "Clave Q"]
+
+    cronograma = lote.comparar_proyecto(corte, corte, clave_q)["Cronograma"]
+    esperado = corte.filas("cronograma", clave_q)
+    for version in ("Antes", "Ahora"):
+        filas = cronograma[cronograma["Versión"] == version]
+        assert len(filas) == len(esperado)
+        assert sorted(filas["Fecha de Termino"]) == sorted(esperado["Fecha de Termino"])
+
+
+def test_partidas_del_reporte_iguales_a_las_de_la_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "DIR_INSTANTANEAS", str(tmp_path / "instantaneas"))
+    ruta = str(tmp_path / "corte.xlsx")
+    generar_libro(ruta, proyectos=2)
+    with open(ruta, "rb") as f:
+        hojas = almacen.obtener_corte(f.read())
+    antes = {clave: df.copy() for clave, df in hojas.items()}
+    # Una partida capturada como texto en un corte y como número en el otro, y una en blanco
+    partidas = antes["partidas"]
+    partidas["Partida"] = partidas["Partida"].astype(object)
+    partidas.loc[partidas.index[0], "Partida"] = str(partidas.loc[partidas.index[0], "Partida"])
+    partidas.loc[partidas.index[1], "Partida"] = None
+    corte_antes, corte_ahora = Corte(antes, huella="a"), Corte(hojas, huella="b")
+    clave_q = partidas.loc[partidas.index[0], "Clave Q"]
+
+    reporte = lote.comparar_proyecto(corte_antes, corte_ahora, clave_q)
+    cubo = CuboPartidas(corte_antes, corte_ahora)
+    for clave_meta, tabla in reporte["Partidas"].groupby("Clave de Meta", sort=False):
+        app = cubo.por_partida("Meta", (clave_q, clave_meta))
+        pd.testing.assert_frame_equal(tabla.drop(columns="Clave de Meta").reset_index(drop=True), app)
+    for clave_meta, tabla in reporte["Partidas Mensual"].groupby("Clave de Meta", sort=False):
+        app = cubo.mensual("Meta", (clave_q, clave_meta))
+        pd.testing.assert_frame_equal(tabla.drop(columns="Clave de Meta").reset_index(drop=True), app)
+
+
+def test_html_con_clave_numerica_y_nombre_vacio():
+    comparacion = {hoja: pd.DataFrame() for hoja in lote.HOJAS_REPORTE}
+    comparacion["Datos Generales"] = pd.DataFrame(
+        [("Objetivo", "a < b", "a & b", True)], columns=["Campo", "Antes", "Ahora", "Modificado"]
+    )
+    texto = lote._html_proyecto(123.0, float("nan"), comparacion, "palabra")
+    assert "<h2 id='123'>123 - </h2>" in texto
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from carga import COLUMNA_FECHAS_INVALIDAS, MESES
+from validacion import REGLAS, resumen_hallazgos, validar_corte
+
+
+def _corte_limpio():
+    # Una meta de 120: una partida de 10 al mes, 12 unidades de 1 al mes y una actividad de 120
+    return {
+        "metas": pd.DataFrame({"Clave Q": ["Q1"], "Clave de Meta": ["M1"], "Monto Total": [120.0]}),
+        "partidas": pd.DataFrame({
+            "Clave Q": ["Q1"], "Clave de Meta": ["M1"], "Partida": [2000], "Monto Anual": [120.0],
+            **{f"Monto {mes}": [10.0] for mes in MESES},
+        }),
+        "cumplimiento": pd.DataFrame({
+            "Clave de Meta": ["M1"], "Cantidad": [12.0], **{f"Cumplimiento {mes}": [1.0] for mes in MESES},
+        }),
+        "cronograma": pd.DataFrame({
+            "Clave Q": ["Q1"], "Clave de Meta": ["M1"], "Clave de Actividad /Hito": [1],
+            "Monto Actividad / Hito": [120.0], COLUMNA_FECHAS_INVALIDAS: [None],
+        }),
+    }
+
+
+def _romper_partida_mensual(corte):
+    corte["partidas"]["Monto Enero"] = 15.0
+    # El total de la partida sigue igual al de la meta
+    corte["partidas"]["Monto Febrero"] = 5.0
+    corte["partidas"]["Monto Marzo"] = 12.0
+
+
+def _romper_partidas_meta(corte):
+    corte["metas"]["Monto Total"] = 130.0
+    corte["cronograma"]["Monto Actividad / Hito"] = 130.0
+
+
+def _romper_cumplimiento(corte):
+    corte["cumplimiento"]["Cantidad"] = 20.0
+
+
+def _romper_cronograma(corte):
+    corte["cronograma"]["Monto Actividad / Hito"] = 100.0
+
+
+def _romper_fecha(corte):
+    corte["cronograma"][COLUMNA_FECHAS_INVALIDAS] = "Fecha de Inicio: 31/02/2025"
+
+
+def test_corte_limpio_sin_hallazgos():
+    hallazgos = validar_corte(_corte_limpio())
+    assert hallazgos.empty
+    assert resumen_hallazgos(hallazgos).sum() == 0
+
+
+def test_diferencias_dentro_de_la_tolerancia():
+    corte = _corte_limpio()
+    corte["partidas"]["Monto Enero"] = 10.4
+    assert validar_corte(corte).empty
+
+
+@pytest.mark.parametrize("regla, romper", [
+    (REGLAS[0], _romper_partida_mensual),
+    (REGLAS[1], _romper_partidas_meta),
+    (REGLAS[2], _romper_cumplimiento),
+    (REGLAS[3], _romper_cronograma),
+    (REGLAS[4], _romper_fecha),
+])
+def test_cada_regla_detecta_su_fila(regla, romper):
+    corte = _corte_limpio()
+    romper(corte)
+    hallazgos = validar_corte(corte)
+    assert list(hallazgos["Regla"]) == [regla]
+    assert list(hallazgos[["Clave Q", "Clave de Meta"]].iloc[0]) == ["Q1", "M1"]
+    assert resumen_hallazgos(hallazgos)[regla] == 1
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from carga import COLUMNA_FECHAS_INVALIDAS, MESES
+
+# ========== VALIDACIÓN DE CONSISTENCIA ENTRE HOJAS ==========
+# Todas las reglas sobre el corte completo con agrupaciones y operaciones por columna,
+# sin recorrer proyectos ni metas
+
+# Diferencia máxima aceptada (pesos o unidades), por redondeos del Excel
+TOLERANCIA = 0.5
+
+REGLAS = [
+    "Meses de la partida ≠ Monto Anual",
+    "Partidas ≠ Monto Total de la meta",
+    "Meses de cumplimiento ≠ Cantidad",
+    "Cronograma ≠ Monto Total de la meta",
+    "Fecha no reconocida en el cronograma",
+]
+
+COLUMNAS_HALLAZGOS = ["Clave Q", "Clave de Meta", "Regla", "Detalle", "Esperado", "Obtenido", "Diferencia"]
+
+LLAVES_META = ["Clave Q", "Clave de Meta"]
+
+
+def validar_corte(corte):
+    # Tabla de hallazgos (una fila por inconsistencia) ordenada por Clave Q / Clave de Meta
+    hallazgos = [
+        _partidas_mensuales(corte["partidas"]),
+        _partidas_contra_metas(corte["partidas"], corte["metas"]),
+        _cumplimiento_mensual(corte["cumplimiento"], corte["metas"]),
+        _cronograma_contra_metas(corte["cronograma"], corte["metas"]),
+        _fechas_invalidas(corte["cronograma"]),
+    ]
+    hallazgos = pd.concat([h for h in hallazgos if not h.empty] or [_vacio()], ignore_index=True)
+    return hallazgos.sort_values(LLAVES_META + ["Regla"], kind="mergesort", ignore_index=True)
+
+
+def resumen_hallazgos(hallazgos):
+    return hallazgos["Regla"].value_counts().reindex(REGLAS, fill_value=0).rename("Hallazgos")
+
+
+def _vacio():
+    return pd.DataFrame(columns=COLUMNAS_HALLAZGOS)
+
+
+def _sin_categorias(df):
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def _diferentes(llaves, regla, esperado, obtenido, detalle=None):
+    # Filas donde |obtenido - esperado| excede la tolerancia (los faltantes cuentan como 0)
+    esperado = pd.Series(esperado, index=llaves.index).astype("float64").fillna(0)
+    obtenido = pd.Series(obtenido, index=llaves.index).astype("float64").fillna(0)
+    diferencia = obtenido - esperado
+    malas = (diferencia.abs() > TOLERANCIA).to_numpy()
+
+    resultado = _sin_categorias(llaves.loc[malas, [c for c in LLAVES_META if c in llaves.columns]])
+    resultado["Regla"] = regla
+    resultado["Detalle"] = detalle[malas] if detalle is not None else ""
+    resultado["Esperado"] = esperado[malas]
+    resultado["Obtenido"] = obtenido[malas]
+    resultado["Diferencia"] = diferencia[malas]
+    return resultado.reindex(columns=COLUMNAS_HALLAZGOS)
+
+
+def _totales_por_meta(df, columna):
+    return (
+        df.groupby(LLAVES_META, observed=True)[columna].sum(min_count=1)
+        .reset_index().pipe(_sin_categorias).set_index(LLAVES_META)[columna]
+    )
+
+
+def _partidas_mensuales(partidas):
+    meses = partidas[[f"Monto {mes}" for mes in MESES]].sum(axis=1)
+    detalle = ("Partida " + partidas["Partida"].astype(str)).to_numpy()
+    return _diferentes(partidas, REGLAS[0], partidas["Monto Anual"], meses, detalle)
+
+
+def _partidas_contra_metas(partidas, metas):
+    unidas = pd.concat(
+        [_totales_por_meta(metas, "Monto Total").rename("Meta"),
+         _totales_por_meta(partidas, "Monto Anual").rename("Partidas")],
+        axis=1
+    ).reset_index()
+    return _diferentes(unidas, REGLAS[1], unidas["Meta"], unidas["Partidas"])
+
+
+def _cumplimiento_mensual(cumplimiento, metas):
+    # Cumplimiento no trae Clave Q: se toma de la hoja de metas
+    claves_q = _sin_categorias(metas[LLAVES_META]).dropna().drop_duplicates("Clave de Meta")
+    cumplimiento = _sin_categorias(cumplimiento).merge(claves_q, on="Clave de Meta", how="left")
+    meses = cumplimiento[[f"Cumplimiento {mes}" for mes in MESES]].sum(axis=1)
+    return _diferentes(cumplimiento, REGLAS[2], cumplimiento["Cantidad"], meses)
+
+
+def _cronograma_contra_metas(cronograma, metas):
+    # Solo las metas cuyo cronograma trae montos
+    actividades = _totales_por_meta(cronograma, "Monto Actividad / Hito").dropna().rename("Cronograma")
+    unidas = pd.concat(
+        [_totales_por_meta(metas, "Monto Total").rename("Meta"), actividades], axis=1, join="inner"
+    ).reset_index()
+    return _diferentes(unidas, REGLAS[3], unidas["Meta"], unidas["Cronograma"])
+
+
+def _fechas_invalidas(cronograma):
+    if COLUMNA_FECHAS_INVALIDAS not in cronograma.columns:
+        return _vacio()
+    invalidas = cronograma[cronograma[COLUMNA_FECHAS_INVALIDAS].notna()]
+    resultado = _sin_categorias(invalidas[LLAVES_META])
+    resultado["Regla"] = REGLAS[4]
+    resultado["Detalle"] = (
+        "Actividad " + invalidas["Clave de Actividad /Hito"].astype(str) + " · " +
+        invalidas[COLUMNA_FECHAS_INVALIDAS].astype(str)
+    )
+    return resultado.reindex(columns=COLUMNAS_HALLAZGOS).assign(**{
+        "Esperado": np.nan, "Obtenido": np.nan, "Diferencia": np.nan
+    })